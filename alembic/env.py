@@ -5,7 +5,7 @@ from sqlalchemy import pool
 import os
 from alembic import context
 from dotenv import load_dotenv
-from app.models import Department, Semester, Subject, Student, Mark, User, SubjectOfferings, Teacher
+from app.models import Department, Semester, Subject, Student, Mark, User, SubjectOfferings, Teacher, TableRowCount, PendingImageDeletion
 
 
 # import models here so that alembic can find them
@@ -0,0 +1,95 @@
+"""partitioned audit logs by month
+
+Revision ID: a8c5e3f7b2d9
+Revises: f6b3d8e2c7a4
+Create Date: 2026-10-19 17:05:36.918447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c5e3f7b2d9'
+down_revision: Union[str, Sequence[str], None] = 'f6b3d8e2c7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_audit_logs_constraints_and_indexes(primary_key: list[str], log_viewer_indexes: bool):
+    op.create_primary_key('audit_logs_pkey', 'audit_logs', primary_key)
+    op.create_foreign_key('audit_logs_created_by_fkey', 'audit_logs', 'users', ['created_by'], ['id'])
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'], unique=False)
+
+    # admin log viewer: logs of a user / of a level, newest first
+    if log_viewer_indexes:
+        op.create_index('ix_audit_logs_created_by_created_at', 'audit_logs', ['created_by', 'created_at'], unique=False)
+        op.create_index('ix_audit_logs_level_created_at', 'audit_logs', ['level', 'created_at'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the id sequence must survive the drop of the old table
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_old")
+    op.execute("CREATE TABLE audit_logs (LIKE audit_logs_old INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    # rows of a month without a partition, ensure_audit_log_partition moves them out later
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    # one partition per calendar month (UTC). The advisory lock lets every worker call it at startup
+    op.execute("""
+        CREATE FUNCTION ensure_audit_log_partition(month_start TIMESTAMPTZ) RETURNS BOOLEAN LANGUAGE plpgsql AS $$
+        DECLARE
+            start_at TIMESTAMPTZ := date_trunc('month', month_start AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+            end_at TIMESTAMPTZ := (date_trunc('month', month_start AT TIME ZONE 'UTC') + INTERVAL '1 month') AT TIME ZONE 'UTC';
+            partition_name TEXT := 'audit_logs_' || to_char(month_start AT TIME ZONE 'UTC', 'YYYY_MM');
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('audit_logs_partitions'));
+
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN FALSE;
+            END IF;
+
+            EXECUTE format('CREATE TABLE %I (LIKE audit_logs INCLUDING DEFAULTS)', partition_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM audit_logs_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved', start_at, end_at, partition_name);
+            EXECUTE format('ALTER TABLE audit_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, start_at, end_at);
+            RETURN TRUE;
+        END $$
+    """)
+
+    # every month that has logs, up to two months ahead
+    op.execute("""
+        SELECT ensure_audit_log_partition(month)
+        FROM generate_series(
+            date_trunc('month', COALESCE((SELECT min(created_at) FROM audit_logs_old), now()) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+            now() + INTERVAL '2 months',
+            INTERVAL '1 month'
+        ) AS month
+    """)
+
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_old")
+    op.execute("DROP TABLE audit_logs_old")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+
+    # a partitioned table needs the partition key in its primary key
+    create_audit_logs_constraints_and_indexes(['id', 'created_at'], log_viewer_indexes=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS ensure_audit_log_partition(TIMESTAMPTZ)")
+
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_old")
+    op.execute("CREATE TABLE audit_logs (LIKE audit_logs_old INCLUDING DEFAULTS)")
+    # archived (detached) months are not brought back
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_old")
+    op.execute("DROP TABLE audit_logs_old")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+
+    create_audit_logs_constraints_and_indexes(['id'], log_viewer_indexes=False)
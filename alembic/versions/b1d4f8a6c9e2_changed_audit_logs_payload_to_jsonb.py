@@ -0,0 +1,41 @@
+"""changed audit logs payload to jsonb
+
+Revision ID: b1d4f8a6c9e2
+Revises: a8c5e3f7b2d9
+Create Date: 2026-10-19 17:41:52.336019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1d4f8a6c9e2'
+down_revision: Union[str, Sequence[str], None] = 'a8c5e3f7b2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # applied to every partition of audit_logs
+    op.alter_column('audit_logs', 'payload',
+                    existing_type=sa.JSON(),
+                    type_=postgresql.JSONB(astext_type=sa.Text()),
+                    existing_nullable=True,
+                    postgresql_using='payload::jsonb')
+    # default jsonb_ops: supports both containment (@>) and key existence (?) filters
+    op.create_index('ix_audit_logs_payload', 'audit_logs', ['payload'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audit_logs_payload', table_name='audit_logs', postgresql_using='gin')
+    op.alter_column('audit_logs', 'payload',
+                    existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                    type_=sa.JSON(),
+                    existing_nullable=True,
+                    postgresql_using='payload::json')
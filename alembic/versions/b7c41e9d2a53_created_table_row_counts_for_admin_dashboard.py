@@ -0,0 +1,126 @@
+"""created table row counts for admin dashboard
+
+Revision ID: b7c41e9d2a53
+Revises: 106287b22b90
+Create Date: 2026-10-19 11:02:47.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c41e9d2a53'
+down_revision: Union[str, Sequence[str], None] = '106287b22b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# tables whose row count is shown on the admin dashboard
+COUNTED_TABLES = [
+    "users", "teachers", "students", "departments",
+    "semesters", "subjects", "subject_offerings", "marks",
+]
+
+ADMIN_ROLES = "('admin', 'super_admin')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('table_row_counts',
+    sa.Column('counter_name', sa.String(length=50), nullable=False),
+    sa.Column('row_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('counter_name')
+    )
+
+    # seed with the current counts, the triggers keep them in sync from here on
+    for table in COUNTED_TABLES:
+        op.execute(
+            f"INSERT INTO table_row_counts (counter_name, row_count) SELECT '{table}', count(*) FROM {table}")
+    op.execute(
+        f"INSERT INTO table_row_counts (counter_name, row_count) SELECT 'admins', count(*) FROM users WHERE role IN {ADMIN_ROLES}")
+
+    # statement level triggers with transition tables: one counter update per statement, not per row.
+    # TG_ARGV[0] is the counter name
+    op.execute("""
+        CREATE FUNCTION count_inserted_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE table_row_counts SET row_count = row_count + (SELECT count(*) FROM new_rows)
+            WHERE counter_name = TG_ARGV[0];
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE FUNCTION count_deleted_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE table_row_counts SET row_count = row_count - (SELECT count(*) FROM old_rows)
+            WHERE counter_name = TG_ARGV[0];
+            RETURN NULL;
+        END $$
+    """)
+
+    # admins are users with an admin role, so inserts, deletes and role changes move the counter
+    op.execute(f"""
+        CREATE FUNCTION count_admin_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            delta BIGINT := 0;
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                delta := delta + (SELECT count(*) FROM new_rows WHERE role IN {ADMIN_ROLES});
+            END IF;
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                delta := delta - (SELECT count(*) FROM old_rows WHERE role IN {ADMIN_ROLES});
+            END IF;
+            IF delta <> 0 THEN
+                UPDATE table_row_counts SET row_count = row_count + delta
+                WHERE counter_name = 'admins';
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+
+    for table in COUNTED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION count_inserted_rows('{table}')
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION count_deleted_rows('{table}')
+        """)
+
+    # transition tables need one trigger per event
+    op.execute("""
+        CREATE TRIGGER users_admin_count_insert AFTER INSERT ON users
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_admin_rows()
+    """)
+    op.execute("""
+        CREATE TRIGGER users_admin_count_update AFTER UPDATE ON users
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_admin_rows()
+    """)
+    op.execute("""
+        CREATE TRIGGER users_admin_count_delete AFTER DELETE ON users
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_admin_rows()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS users_admin_count_{event} ON users")
+
+    for table in COUNTED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_count_insert ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_count_delete ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS count_admin_rows()")
+    op.execute("DROP FUNCTION IF EXISTS count_deleted_rows()")
+    op.execute("DROP FUNCTION IF EXISTS count_inserted_rows()")
+    op.drop_table('table_row_counts')
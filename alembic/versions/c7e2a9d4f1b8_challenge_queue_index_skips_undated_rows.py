@@ -0,0 +1,38 @@
+"""challenge queue index skips undated rows
+
+Revision ID: c7e2a9d4f1b8
+Revises: b1d4f8a6c9e2
+Create Date: 2026-10-19 19:12:40.215903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9d4f1b8'
+down_revision: Union[str, Sequence[str], None] = 'b1d4f8a6c9e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # challenges set by an admin/teacher had no date: queue them as of now
+    op.execute("""
+        UPDATE marks SET challenged_at = COALESCE(challenge_payment_time, now())
+        WHERE result_challenge_status = 'challenged' AND challenged_at IS NULL
+    """)
+
+    op.drop_index('ix_marks_open_challenges', table_name='marks')
+    op.create_index('ix_marks_open_challenges', 'marks', ['challenged_at', 'id'], unique=False,
+                    postgresql_where=sa.text("result_challenge_status = 'challenged' AND challenged_at IS NOT NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_marks_open_challenges', table_name='marks')
+    op.create_index('ix_marks_open_challenges', 'marks', ['challenged_at', 'id'], unique=False,
+                    postgresql_where=sa.text("result_challenge_status = 'challenged'"))
@@ -0,0 +1,76 @@
+"""added department id and session to marks
+
+Revision ID: d9f2b6c4a8e1
+Revises: c3e8a5f1d6b7
+Create Date: 2026-10-19 15:08:42.217935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f2b6c4a8e1'
+down_revision: Union[str, Sequence[str], None] = 'c3e8a5f1d6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('marks', sa.Column('department_id', sa.Integer(), nullable=True))
+    op.add_column('marks', sa.Column('session', sa.String(length=50), nullable=True))
+    op.create_foreign_key('marks_department_id_fkey', 'marks', 'departments', ['department_id'], ['id'], ondelete='SET NULL')
+
+    # backfill from the students before the index is built
+    op.execute("""
+        UPDATE marks SET department_id = students.department_id, session = students.session
+        FROM students WHERE students.id = marks.student_id
+    """)
+
+    op.create_index('ix_marks_cohort', 'marks', ['semester_id', 'department_id', 'session', 'result_status'],
+                    unique=False, postgresql_include=['id'])
+
+    # the student is the source of truth: every new mark copies its department and session
+    op.execute("""
+        CREATE FUNCTION copy_student_cohort_to_mark() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            SELECT department_id, session INTO NEW.department_id, NEW.session
+            FROM students WHERE id = NEW.student_id;
+            RETURN NEW;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER marks_copy_student_cohort BEFORE INSERT OR UPDATE OF student_id ON marks
+        FOR EACH ROW EXECUTE FUNCTION copy_student_cohort_to_mark()
+    """)
+
+    # a student moving to another department or session moves all of their marks
+    op.execute("""
+        CREATE FUNCTION sync_student_cohort_to_marks() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE marks SET department_id = NEW.department_id, session = NEW.session
+            WHERE student_id = NEW.id;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER students_sync_cohort_to_marks AFTER UPDATE OF department_id, session ON students
+        FOR EACH ROW
+        WHEN (OLD.department_id IS DISTINCT FROM NEW.department_id OR OLD.session IS DISTINCT FROM NEW.session)
+        EXECUTE FUNCTION sync_student_cohort_to_marks()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS students_sync_cohort_to_marks ON students")
+    op.execute("DROP TRIGGER IF EXISTS marks_copy_student_cohort ON marks")
+    op.execute("DROP FUNCTION IF EXISTS sync_student_cohort_to_marks()")
+    op.execute("DROP FUNCTION IF EXISTS copy_student_cohort_to_mark()")
+    op.drop_index('ix_marks_cohort', table_name='marks')
+    op.drop_constraint('marks_department_id_fkey', 'marks', type_='foreignkey')
+    op.drop_column('marks', 'session')
+    op.drop_column('marks', 'department_id')
@@ -0,0 +1,34 @@
+"""added partial indexes on marks
+
+Revision ID: e4a7c1d9b3f5
+Revises: d9f2b6c4a8e1
+Create Date: 2026-10-19 15:47:19.850362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c1d9b3f5'
+down_revision: Union[str, Sequence[str], None] = 'd9f2b6c4a8e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_marks_published_student_semester', 'marks', ['student_id', 'semester_id'], unique=False,
+                    postgresql_where=sa.text("result_status = 'published'"))
+    op.create_index('ix_marks_open_challenges', 'marks', ['challenged_at', 'id'], unique=False,
+                    postgresql_where=sa.text("result_challenge_status = 'challenged'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_marks_open_challenges', table_name='marks',
+                  postgresql_where=sa.text("result_challenge_status = 'challenged'"))
+    op.drop_index('ix_marks_published_student_semester', table_name='marks',
+                  postgresql_where=sa.text("result_status = 'published'"))
@@ -0,0 +1,125 @@
+"""sharded table row counts
+
+Revision ID: e8d3a6b1c5f2
+Revises: c7e2a9d4f1b8
+Create Date: 2026-10-19 21:04:18.552731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8d3a6b1c5f2'
+down_revision: Union[str, Sequence[str], None] = 'c7e2a9d4f1b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# rows per counter: concurrent writers of the same table add to different rows (the count is their SUM)
+ROW_COUNT_SHARDS = 16
+
+ADMIN_ROLES = "('admin', 'super_admin')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('table_row_counts', sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    op.drop_constraint('table_row_counts_pkey', 'table_row_counts', type_='primary')
+    op.create_primary_key('table_row_counts_pkey', 'table_row_counts', ['counter_name', 'shard'])
+
+    # one shard per transaction (txid), so a transaction locks a single row of each counter it moves
+    op.execute(f"""
+        CREATE FUNCTION add_to_row_count(counter TEXT, delta BIGINT) RETURNS void LANGUAGE plpgsql AS $$
+        BEGIN
+            IF delta <> 0 THEN
+                INSERT INTO table_row_counts (counter_name, shard, row_count)
+                VALUES (counter, txid_current() % {ROW_COUNT_SHARDS}, delta)
+                ON CONFLICT (counter_name, shard)
+                DO UPDATE SET row_count = table_row_counts.row_count + EXCLUDED.row_count;
+            END IF;
+        END $$
+    """)
+
+    # same trigger functions, the existing triggers pick them up
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_inserted_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM add_to_row_count(TG_ARGV[0], (SELECT count(*) FROM new_rows));
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_deleted_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM add_to_row_count(TG_ARGV[0], -(SELECT count(*) FROM old_rows));
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION count_admin_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            delta BIGINT := 0;
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                delta := delta + (SELECT count(*) FROM new_rows WHERE role IN {ADMIN_ROLES});
+            END IF;
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                delta := delta - (SELECT count(*) FROM old_rows WHERE role IN {ADMIN_ROLES});
+            END IF;
+            PERFORM add_to_row_count('admins', delta);
+            RETURN NULL;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_inserted_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE table_row_counts SET row_count = row_count + (SELECT count(*) FROM new_rows)
+            WHERE counter_name = TG_ARGV[0];
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_deleted_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE table_row_counts SET row_count = row_count - (SELECT count(*) FROM old_rows)
+            WHERE counter_name = TG_ARGV[0];
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION count_admin_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            delta BIGINT := 0;
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                delta := delta + (SELECT count(*) FROM new_rows WHERE role IN {ADMIN_ROLES});
+            END IF;
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                delta := delta - (SELECT count(*) FROM old_rows WHERE role IN {ADMIN_ROLES});
+            END IF;
+            IF delta <> 0 THEN
+                UPDATE table_row_counts SET row_count = row_count + delta
+                WHERE counter_name = 'admins';
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("DROP FUNCTION IF EXISTS add_to_row_count(TEXT, BIGINT)")
+
+    # fold the shards back into shard 0
+    op.execute("""
+        UPDATE table_row_counts SET row_count = totals.row_count
+        FROM (SELECT counter_name, sum(row_count) AS row_count FROM table_row_counts GROUP BY counter_name) AS totals
+        WHERE table_row_counts.counter_name = totals.counter_name AND table_row_counts.shard = 0
+    """)
+    op.execute("DELETE FROM table_row_counts WHERE shard <> 0")
+    op.drop_constraint('table_row_counts_pkey', 'table_row_counts', type_='primary')
+    op.create_primary_key('table_row_counts_pkey', 'table_row_counts', ['counter_name'])
+    op.drop_column('table_row_counts', 'shard')
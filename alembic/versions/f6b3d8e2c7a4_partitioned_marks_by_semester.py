@@ -0,0 +1,117 @@
+"""partitioned marks by semester
+
+Revision ID: f6b3d8e2c7a4
+Revises: e4a7c1d9b3f5
+Create Date: 2026-10-19 16:32:11.402876
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b3d8e2c7a4'
+down_revision: Union[str, Sequence[str], None] = 'e4a7c1d9b3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_marks_constraints_and_indexes(primary_key: list[str]):
+    # same names as the unpartitioned table. On a partitioned table every unique constraint
+    # must contain the partition key, unique_mark_record already does
+    op.create_primary_key('marks_pkey', 'marks', primary_key)
+    op.create_unique_constraint('unique_mark_record', 'marks', ['student_id', 'subject_id', 'semester_id'])
+    op.create_foreign_key('marks_semester_id_fkey', 'marks', 'semesters', ['semester_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('marks_student_id_fkey', 'marks', 'students', ['student_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('marks_subject_id_fkey', 'marks', 'subjects', ['subject_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('marks_department_id_fkey', 'marks', 'departments', ['department_id'], ['id'], ondelete='SET NULL')
+
+    op.create_index('ix_marks_id', 'marks', ['id'], unique=False)
+    op.create_index('ix_marks_query_perf', 'marks', ['semester_id', 'result_status'], unique=False)
+    op.create_index('ix_marks_cohort', 'marks', ['semester_id', 'department_id', 'session', 'result_status'],
+                    unique=False, postgresql_include=['id'])
+    op.create_index('ix_marks_published_student_semester', 'marks', ['student_id', 'semester_id'], unique=False,
+                    postgresql_where=sa.text("result_status = 'published'"))
+    op.create_index('ix_marks_open_challenges', 'marks', ['challenged_at', 'id'], unique=False,
+                    postgresql_where=sa.text("result_challenge_status = 'challenged'"))
+
+    # triggers of the table_row_counts and marks cohort migrations
+    op.execute("""
+        CREATE TRIGGER marks_count_insert AFTER INSERT ON marks
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_inserted_rows('marks')
+    """)
+    op.execute("""
+        CREATE TRIGGER marks_count_delete AFTER DELETE ON marks
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION count_deleted_rows('marks')
+    """)
+    op.execute("""
+        CREATE TRIGGER marks_copy_student_cohort BEFORE INSERT OR UPDATE OF student_id ON marks
+        FOR EACH ROW EXECUTE FUNCTION copy_student_cohort_to_mark()
+    """)
+
+
+def replace_marks_table(partition_by: str | None):
+    # the id sequence must survive the drop of the old table
+    op.execute("ALTER SEQUENCE marks_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE marks RENAME TO marks_old")
+
+    # LIKE keeps the column order and the defaults (id keeps nextval('marks_id_seq'))
+    op.execute(f"CREATE TABLE marks (LIKE marks_old INCLUDING DEFAULTS) {partition_by or ''}")
+
+    if partition_by:
+        # rows of a semester without a partition (eg: created before ensure_marks_partition ran)
+        op.execute("CREATE TABLE marks_default PARTITION OF marks DEFAULT")
+        op.execute("""
+            DO $$
+            DECLARE
+                semester RECORD;
+            BEGIN
+                FOR semester IN SELECT id FROM semesters LOOP
+                    EXECUTE format('CREATE TABLE %I PARTITION OF marks FOR VALUES IN (%s)',
+                                   'marks_semester_' || semester.id, semester.id);
+                END LOOP;
+            END $$
+        """)
+
+    # no triggers on the new table yet: the counters and the cohort columns stay as they are
+    op.execute("INSERT INTO marks SELECT * FROM marks_old")
+    op.execute("DROP TABLE marks_old")
+    op.execute("ALTER SEQUENCE marks_id_seq OWNED BY marks.id")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    replace_marks_table("PARTITION BY LIST (semester_id)")
+    create_marks_constraints_and_indexes(['id', 'semester_id'])
+
+    # new semesters get their partition from app/db/partitions.py. Rows of the semester that
+    # already landed in the default partition are moved into the new one
+    op.execute("""
+        CREATE FUNCTION ensure_marks_partition(target_semester_id INTEGER) RETURNS BOOLEAN LANGUAGE plpgsql AS $$
+        DECLARE
+            partition_name TEXT := 'marks_semester_' || target_semester_id;
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN FALSE;
+            END IF;
+
+            EXECUTE format('CREATE TABLE %I (LIKE marks INCLUDING DEFAULTS)', partition_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM marks_default WHERE semester_id = %s RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved', target_semester_id, partition_name);
+            EXECUTE format('ALTER TABLE marks ATTACH PARTITION %I FOR VALUES IN (%s)',
+                           partition_name, target_semester_id);
+            RETURN TRUE;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS ensure_marks_partition(INTEGER)")
+    replace_marks_table(None)
+    create_marks_constraints_and_indexes(['id'])
@@ -23,10 +23,77 @@ class Settings(BaseSettings):
     SUPER_ADMIN_EMAIL: str
     SUPER_ADMIN_PASSWORD: str
 
+    # Reference data cache (departments, semesters, subjects)
+    REFERENCE_CACHE_TTL_SECONDS: int = 300  # safety net if a change notification is missed
+    REFERENCE_CACHE_LISTEN: bool = True  # LISTEN/NOTIFY needs a direct (session mode) connection
+
+    # Admin dashboard counters
+    DASHBOARD_COUNTS_MODE: str = "exact"  # "exact" (trigger maintained counters) or "estimate" (pg_class.reltuples)
+    DASHBOARD_COUNTS_CACHE_TTL_SECONDS: int = 30
+
+    # Response compression (brotli is used only if the package is installed)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes, smaller bodies are sent as they are
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 256  # compressed bodies kept per worker for responses with an ETag, 0 disables
+
+    # SQL statements per request (Server-Timing header, N+1 detection, query budget)
+    QUERY_STATS_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 10  # same statement this many times in one request is logged as a possible N+1
+    QUERY_BUDGET_PER_REQUEST: int = 0  # 0 disables
+    QUERY_BUDGET_STRICT: bool = False  # raise instead of logging a warning (for tests)
+
+    # Prometheus metrics (/api/server/metrics)
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: str = ""  # shared folder for gunicorn workers, empty means single process
+    METRICS_SNAPSHOT_INTERVAL_SECONDS: float = 5
+    METRICS_BEARER_TOKEN: str = ""  # scrapes must send "Authorization: Bearer <token>", required unless the database is local
+
+    # Slow query log
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    SLOW_QUERY_LOG_FILE: str = ""  # eg: logs/slow_queries.log, empty logs to stdout only
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0  # 0.0 - 1.0 of the slow SELECTs get an EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_QUERY_EXPLAIN_MAX_PENDING: int = 2  # EXPLAINs running at the same time (each one re-runs the query)
+    SLOW_QUERY_PLAN_DIR: str = "logs/query_plans"
+
+    # Event loop monitor
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.25
+    LOOP_BLOCK_THRESHOLD_MS: int = 200
+    LOOP_BLOCK_STACKS_ENABLED: bool = False  # debug: log the stack of the code that blocks the loop (watchdog thread)
+
+    # Sampling profiler (/api/server/profile)
+    PROFILING_INTERVAL_MS: float = 5
+    PROFILING_MAX_SECONDS: int = 60
+    PROFILING_OUTPUT_DIR: str = "logs/profiles"
+    REQUEST_PROFILING_ENABLED: bool = False  # "X-Profile: 1" header for super_admin, the middleware is not added otherwise
+
+    # Deletion queue of replaced Cloudinary images
+    IMAGE_DELETION_ENABLED: bool = True
+    IMAGE_DELETION_BACKEND: str = "cloudinary"  # "cloudinary" or "stub" (keeps the ids in memory, for tests)
+    IMAGE_DELETION_INTERVAL_SECONDS: float = 10
+    IMAGE_DELETION_BATCH_SIZE: int = 100  # delete_resources accepts at most 100 ids
+    IMAGE_DELETION_MAX_ATTEMPTS: int = 8  # then the row is logged and dropped
+    IMAGE_DELETION_CLAIM_SECONDS: float = 300  # claimed rows are skipped by the other workers for this long
+    IMAGE_DELETION_RETRY_BASE_SECONDS: float = 30
+    IMAGE_DELETION_RETRY_MAX_SECONDS: float = 3600
+
+    # Audit log partitions (one per month) and retention
+    AUDIT_LOG_PARTITIONS_AHEAD: int = 2  # months created in advance at startup
+    AUDIT_LOG_RETENTION_MONTHS: int = 12  # older months are exported and dropped by "python -m app.db.partitions audit-retention"
+    AUDIT_LOG_ARCHIVE_DIR: str = "logs/audit_archive"
+
+    # Read replicas for the heavy GET endpoints (reports, results, dashboard)
+    DATABASE_REPLICA_URLS: Any = []  # async URLs like DATABASE_URL, comma separated. Empty sends every read to the primary
+    REPLICA_MAX_LAG_SECONDS: float = 5  # replicas further behind the primary are skipped
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5
+    REPLICA_MAX_SILENCE_SECONDS: float = 60  # no message from the primary for this long counts as not streaming (keepalives come every wal_sender_timeout / 2)
+    READ_YOUR_WRITES_SECONDS: int = 10  # after a successful write the client reads from the primary for this long (cookie)
+
     # This reads the string and splits it into a list
     CORS_ORIGINS: Any = []  # Default fallback
 
-    @field_validator("CORS_ORIGINS", mode="before")
+    @field_validator("CORS_ORIGINS", "DATABASE_REPLICA_URLS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, value: Any) -> List[str]:
         # Handle string input from ENV
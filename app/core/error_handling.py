@@ -0,0 +1,114 @@
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from typing import Any
+from fastapi import HTTPException, Request, status
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.exceptions import DomainIntegrityError
+from app.core.integrity_error_parser import parse_integrity_error
+from app.core.metrics import APP_ERRORS_TOTAL
+from app.utils.mask_sensitive_data import sanitize_payload
+
+
+def _error_name(error: BaseException) -> str:
+    # the driver exception is the most specific one (eg: UniqueViolationError, ForeignKeyViolationError)
+    orig = getattr(error, "orig", None)
+    cause = getattr(orig, "__cause__", None) or orig or error
+    return type(cause).__name__
+
+
+def _integrity_error_payload(
+    raw_error: str,
+    readable_error: str,
+    data: BaseModel | None,
+    exclude_unset: bool,
+    exclude: Any,
+) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "raw_error": raw_error,
+        "readable_error": readable_error,
+    }
+    if data is not None:
+        payload["data"] = sanitize_payload(
+            data.model_dump(mode="json", exclude_unset=exclude_unset, exclude=exclude))
+    return payload
+
+
+def resolve_audit_payload(request: Request) -> dict[str, Any] | None:
+    # payloads may be attached as a callable, they are only built when the audit log is written
+    payload = getattr(request.state, "audit_payload", None)
+    return payload() if callable(payload) else payload
+
+
+@asynccontextmanager
+async def integrity_errors(
+    db: AsyncSession,
+    request: Request | None,
+    operation: str,
+    data: BaseModel | None = None,
+    exclude_unset: bool = False,
+    exclude: Any = None,
+):
+    """
+    Wraps the write (and commit) of a service method:
+        async with integrity_errors(db, request, "creating department", department_data):
+            ...
+            await db.commit()
+    On IntegrityError: rollback, readable message, audit payload and error metric, then DomainIntegrityError
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
+        await db.rollback()
+
+        # generally the PostgreSQL's error message will be in e.orig.args
+        raw_error_message = str(e.orig) if e.orig else str(e)
+        readable_error = parse_integrity_error(e)
+
+        logger.error(f"Integrity error while {operation}: {e}")
+        logger.error(f"Readable Error: {readable_error}")
+        APP_ERRORS_TOTAL.inc(operation=operation, kind="integrity", error=_error_name(e))
+
+        # the request data is dumped only if the audit middleware writes the log
+        if request:
+            request.state.audit_payload = partial(
+                _integrity_error_payload, raw_error_message, readable_error, data, exclude_unset, exclude)
+
+        raise DomainIntegrityError(
+            error_message=readable_error, raw_error=raw_error_message
+        ) from e
+
+
+@contextmanager
+def route_errors(request: Request | None, operation: str):
+    """
+    Wraps the service call of a route:
+        with route_errors(request, "Create department"):
+            return await DepartmentService.create_department(department_data, db, request)
+    DomainIntegrityError -> 400, HTTPException as it is, anything else -> audit payload, error metric and 500
+    """
+    try:
+        yield
+    except DomainIntegrityError as de:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=de.error_message
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.critical(f"{operation} unexpected error: {e}")
+        APP_ERRORS_TOTAL.inc(operation=operation, kind="unexpected", error=type(e).__name__)
+
+        # attach audit payload
+        if request:
+            request.state.audit_payload = {
+                "raw_error": str(e),
+                "exception_type": type(e).__name__,
+            }
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
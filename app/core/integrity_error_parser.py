@@ -1,68 +1,66 @@
 import re
+from app.models.constraint_messages import constraint_message
 
 
-def parse_integrity_error(error_msg: str) -> str:
-    """
-    Parse/Extract readable message from PostgreSQL IntegrityError
-    example: 'Key (registration)=(213313316) already exists' 
-    output: 'Registration 213313316 already exists'
-    """
-    # constraint name checks
+DEFAULT_MESSAGE = "A data integrity error has occurred. Please check your input and try again."
 
-    # --- Student Tables Constraints ---
-    if "students_registration_key" in error_msg:
-        # get the value using Regex
-        match = re.search(r"Key \(registration\)=\((.*?)\)", error_msg)
-        val = match.group(1) if match else ""
-        return f"Registration number '{val}' already exists in our records."
+# fallbacks for plain error strings (or a driver that does not expose the constraint name)
+_CONSTRAINT_NAME = re.compile(r'constraint "(?P<name>[^"]+)"')
+_KEY_DETAIL = re.compile(r"Key \((?P<columns>.*?)\)=\((?P<value>.*?)\)")
 
-    if "students_user_id_key" in error_msg:
-        return "This user is already assigned to another student profile."
 
-    # --- User Tables Constraints ---
-    if "users_username_key" in error_msg:
-        match = re.search(r"Key \(username\)=\((.*?)\)", error_msg)
-        val = match.group(1) if match else ""
-        return f"The username '{val}' is already registered."
+def _driver_error_fields(error: BaseException) -> tuple[str | None, str | None]:
+    """
+    Constraint name and detail straight from the driver error, no string parsing.
+    asyncpg: IntegrityError.orig.__cause__.constraint_name / .detail
+    psycopg2 (audit log engine): IntegrityError.orig.diag.constraint_name / .message_detail
+    """
+    orig = getattr(error, "orig", None)
 
-    if "users_email_key" in error_msg:
-        match = re.search(r"Key \(email\)=\((.*?)\)", error_msg)
-        val = match.group(1) if match else ""
-        return f"The email address '{val}' is already registered."
+    for candidate in (error, orig, getattr(orig, "__cause__", None)):
+        if candidate is None:
+            continue
 
-    if "users_mobile_number_key" in error_msg or "mobile_number" in error_msg.lower():
-        return "This mobile number is already used for another user."
+        name = getattr(candidate, "constraint_name", None)
+        if name:
+            return name, getattr(candidate, "detail", None)
 
-    # --- Teacher Tables Constraints ---
-    if "teachers_user_id_key" in error_msg:
-        return "This user is already assigned to another teacher profile."
+        diag = getattr(candidate, "diag", None)
+        if diag is not None and getattr(diag, "constraint_name", None):
+            return diag.constraint_name, diag.message_detail
 
-    # --- Department Tables Constraints ---
-    if "departments_department_name_key" in error_msg:
-        match = re.search(r"Key \(department_name\)=\((.*?)\)", error_msg)
-        val = match.group(1) if match else ""
-        return f"A department named '{val}' already exists."
+    return None, None
 
-    # --- Semester Tables Constraints ---
-    if "semesters_semester_name_key" in error_msg:
-        match = re.search(r"Key \(semester_name\)=\((.*?)\)", error_msg)
-        val = match.group(1) if match else ""
-        return f"Semester name '{val}' already exists."
 
-    if "semesters_semester_number_key" in error_msg:
-        match = re.search(r"Key \(semester_number\)=\((.*?)\)", error_msg)
-        val = match.group(1) if match else ""
-        return f"Semester number '{val}' is already assigned."
+def parse_integrity_error(error: BaseException | str) -> str:
+    """
+    Readable message of a PostgreSQL IntegrityError, looked up by constraint name
+    in the registry of app/models/constraint_messages.py
+    example: unique violation of "users_email_key", Key (email)=(a@b.com) already exists
+    output: "The email address 'a@b.com' is already registered."
+    """
+    if isinstance(error, BaseException):
+        name, detail = _driver_error_fields(error)
+        orig = getattr(error, "orig", None)
+        error_msg = str(orig) if orig else str(error)
+    else:
+        name, detail, error_msg = None, None, error
+
+    if name is None:
+        match = _CONSTRAINT_NAME.search(error_msg)
+        name = match.group("name") if match else None
 
-    # --- Subject Tables Constraints ---
-    if "subjects_subject_code_key" in error_msg:
-        match = re.search(r"Key \(subject_code\)=\((.*?)\)", error_msg)
-        val = match.group(1) if match else ""
-        return f"A subject with code '{val}' already exists."
+    message = constraint_message(name)
+    # the detail is only parsed when it is needed: unknown name or a message with the value
+    key = None
+    if message is None or "{value}" in message:
+        text = detail or error_msg
+        key = _KEY_DETAIL.search(text) if "Key (" in text else None
 
-    # --- Mark Tables Constraints ---
-    if "unique_mark_record" in error_msg:
-        return "A mark entry already exists for this student in the selected subject and semester."
+    if message is None and key:
+        message = constraint_message(
+            None, tuple(column.strip() for column in key.group("columns").split(",")))
+    if message is None:
+        return DEFAULT_MESSAGE
 
-    # If no constraint name found (default message)
-    return "A data integrity error has occurred. Please check your input and try again."
+    return message.format(value=key.group("value") if key else "")
@@ -3,6 +3,7 @@ from types import FrameType
 from typing import Optional
 from loguru import logger
 import sys
+from app.core.config import settings
 
 
 class InterceptHandler(logging.Handler):
@@ -48,4 +49,15 @@ def setup_logging():
     # For SQLAlchemy's Query (should use echo=False in engine creation)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
 
+    # slow queries (app/db/slow_query_log.py) also go to their own file as json lines
+    if settings.SLOW_QUERY_LOG_FILE:
+        logger.add(
+            settings.SLOW_QUERY_LOG_FILE,
+            filter=lambda record: record["extra"].get("slow_query", False),
+            serialize=True,
+            rotation="50 MB",
+            retention=5,
+            enqueue=True,  # file writes happen in a background thread
+        )
+
     return logger
@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from loguru import logger
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_BLOCKS_TOTAL, EVENT_LOOP_LAG_SECONDS
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag: a task sleeps for a fixed interval and records how late it wakes up.
+    Anything that runs on the loop without awaiting (FPDF, password hashing, sync db calls) shows up as lag.
+
+    With LOOP_BLOCK_STACKS_ENABLED a watchdog thread also checks the heartbeat of that task, and when
+    the loop is stuck longer than LOOP_BLOCK_THRESHOLD_MS it logs the stack of the loop thread,
+    which is the code that is blocking it.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: int | None = None
+        self._last_beat = time.monotonic()
+
+    async def _measure(self, interval: float, threshold: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(interval)
+
+            lag = max(0.0, loop.time() - expected)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            if lag >= threshold:
+                EVENT_LOOP_BLOCKS_TOTAL.inc()
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms")
+
+    def _watch(self, interval: float, threshold: float):
+        reported_beat = None
+        while not self._stopped.wait(interval / 2):
+            beat = self._last_beat
+            blocked_for = time.monotonic() - beat - interval
+
+            # one stack per blocking episode
+            if blocked_for < threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=30))
+            logger.warning(
+                f"Event loop blocked for more than {blocked_for * 1000:.0f} ms, running:\n{stack}")
+
+    def start(self):
+        if self._task is not None:
+            return
+
+        interval = settings.LOOP_MONITOR_INTERVAL_SECONDS
+        threshold = settings.LOOP_BLOCK_THRESHOLD_MS / 1000
+
+        self._task = asyncio.create_task(self._measure(interval, threshold))
+
+        if settings.LOOP_BLOCK_STACKS_ENABLED:
+            self._loop_thread_id = threading.get_ident()
+            self._stopped.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, args=(interval, threshold), name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,344 @@
+import asyncio
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable
+import anyio.to_thread
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# counters and histograms of the workers that exited, kept so the sums never go down
+ARCHIVE_FILE = "archived.json"
+ARCHIVE_LOCK_FILE = "archived.lock"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    # HELP lines only escape backslash and newline, quotes stay as they are
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: "MetricsRegistry | None" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], Any] = {}
+        # listeners run on the event loop and in the threadpool
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(key), value if not isinstance(value, list) else list(value)]
+                    for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, multiprocess_mode: str = "sum", **kwargs):
+        # how the values of the workers are combined: "sum", "max" or "all" (one series per pid)
+        self.multiprocess_mode = multiprocess_mode
+        super().__init__(*args, **kwargs)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(*args, **kwargs)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # [count per bucket (not cumulative)..., sum, count]
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+
+class MetricsRegistry:
+    """
+    In-process metrics in the Prometheus text format.
+    With METRICS_MULTIPROC_DIR set, every gunicorn worker writes its snapshot to <dir>/<pid>.json
+    and the worker that answers the scrape merges all of them, so the numbers cover every worker.
+    The counters and histograms of a worker that exited are added to <dir>/archived.json
+    (its gauges are dropped), a restarted worker does not look like a counter reset.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric):
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        # called right before a snapshot, for values that are read instead of counted (eg: threadpool usage)
+        self._collectors.append(collector)
+
+    def collect(self):
+        for collector in self._collectors:
+            collector()
+
+    def snapshot(self) -> dict[str, list]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def write_snapshot(self, directory: str):
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"pid": os.getpid(), "time": time.time(),
+                      "metrics": self.snapshot()}, file)
+        # atomic, a scrape never reads a half written file
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def _read_json(path: str) -> dict | None:
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _archive_dead_worker(self, directory: str, path: str, snapshot: dict):
+        # scrapes of several workers may find the same dead pid, the lock makes the read-add-write atomic
+        with open(os.path.join(directory, ARCHIVE_LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if not os.path.exists(path):
+                return  # already archived by another worker
+
+            archive_path = os.path.join(directory, ARCHIVE_FILE)
+            archived = self._read_json(archive_path) or {"metrics": {}}
+            # gauges describe a live process (in progress requests, threadpool), they go away with it
+            dead = {"pid": snapshot["pid"], "metrics": {
+                name: samples for name, samples in snapshot["metrics"].items()
+                if not isinstance(self._metrics.get(name), Gauge)}}
+            merged = self._merge([archived, dead])
+
+            temp_path = f"{archive_path}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump({"time": time.time(), "metrics": {
+                    name: [[list(key), value] for key, value in values.items()]
+                    for name, values in merged.items() if values}}, file)
+            os.replace(temp_path, archive_path)
+            os.remove(path)
+
+    def _read_snapshots(self, directory: str) -> list[dict]:
+        snapshots = []
+        for file_name in os.listdir(directory):
+            if not file_name.endswith(".json") or file_name == ARCHIVE_FILE:
+                continue
+            path = os.path.join(directory, file_name)
+            snapshot = self._read_json(path)
+            if snapshot is None:
+                continue
+
+            if not self._pid_alive(snapshot["pid"]):
+                self._archive_dead_worker(directory, path, snapshot)
+                continue
+
+            snapshots.append(snapshot)
+
+        archived = self._read_json(os.path.join(directory, ARCHIVE_FILE))
+        if archived is not None:
+            snapshots.append(archived)
+        return snapshots
+
+    def _merge(self, snapshots: list[dict]) -> dict[str, dict[tuple, Any]]:
+        merged: dict[str, dict[tuple, Any]] = {
+            name: {} for name in self._metrics}
+
+        for snapshot in snapshots:
+            for name, samples in snapshot["metrics"].items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged[name]
+
+                for key, value in samples:
+                    key = tuple(key)
+                    if isinstance(metric, Gauge):
+                        if metric.multiprocess_mode == "all":
+                            values[key + (str(snapshot["pid"]),)] = value
+                        elif metric.multiprocess_mode == "max":
+                            values[key] = max(values.get(key, value), value)
+                        else:
+                            values[key] = values.get(key, 0) + value
+                    elif isinstance(metric, Histogram):
+                        current = values.get(key)
+                        values[key] = value if current is None else [
+                            a + b for a, b in zip(current, value)]
+                    else:
+                        values[key] = values.get(key, 0) + value
+        return merged
+
+    def render(self, directory: str = "") -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        Does file IO when a directory is given, call it from a thread.
+        """
+        if directory:
+            self.write_snapshot(directory)
+            snapshots = self._read_snapshots(directory)
+        else:
+            snapshots = [{"pid": os.getpid(), "metrics": self.snapshot()}]
+
+        merged = self._merge(snapshots)
+        lines: list[str] = []
+
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+
+            labelnames = metric.labelnames
+            if isinstance(metric, Gauge) and metric.multiprocess_mode == "all":
+                labelnames = labelnames + ("pid",)
+
+            for key, value in sorted(merged[name].items()):
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value):
+                        cumulative += count
+                        labels = _format_labels(
+                            labelnames + ("le",), key + (_format_value(bound),))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(labelnames, key)
+                    lines.append(f"{name}_sum{labels} {_format_value(value[-2])}")
+                    lines.append(f"{name}_count{labels} {value[-1]}")
+                else:
+                    lines.append(
+                        f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+# HTTP
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests_total", "Finished HTTP requests", ("method", "route", "status"))
+HTTP_REQUEST_DURATION_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response headers are sent", ("method", "route"))
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ("method",))
+
+# Database
+DB_STATEMENT_DURATION_SECONDS = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time")
+DB_CONNECTION_ACQUIRE_SECONDS = Histogram(
+    "db_connection_acquire_seconds", "Time to get a database connection (a new connection with NullPool)")
+DB_SESSIONS_TOTAL = Counter(
+    "db_sessions_total", "Request database sessions, used=\"false\" when no statement was needed", ("used",))
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "db_replica_lag_seconds", "Replication lag of each read replica, -1 when it is not reachable",
+    ("replica",), multiprocess_mode="max")
+
+# Audit log
+AUDIT_LOG_PENDING_WRITES = Gauge(
+    "audit_log_pending_writes", "Audit log rows being written")
+AUDIT_LOG_WRITE_DURATION_SECONDS = Histogram(
+    "audit_log_write_duration_seconds", "Time to write one audit log row")
+
+# Errors handled by the service and route layers (app/core/error_handling.py)
+APP_ERRORS_TOTAL = Counter(
+    "app_errors_total", "Handled integrity and unexpected errors", ("operation", "kind", "error"))
+
+# Event loop (app/core/loop_monitor.py)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds", "Delay between when a callback was due and when the event loop ran it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+EVENT_LOOP_BLOCKS_TOTAL = Counter(
+    "event_loop_blocks_total", "Times the event loop was blocked longer than LOOP_BLOCK_THRESHOLD_MS")
+
+# Worker threadpool (sync dependencies, run_in_threadpool, asyncio.to_thread is separate)
+THREADPOOL_IN_USE = Gauge(
+    "worker_threadpool_in_use", "Busy threads of the worker threadpool", multiprocess_mode="all")
+THREADPOOL_SIZE = Gauge(
+    "worker_threadpool_size", "Size of the worker threadpool", multiprocess_mode="all")
+
+
+def collect_threadpool_usage():
+    # must run on the event loop
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+
+
+REGISTRY.add_collector(collect_threadpool_usage)
+
+
+async def write_snapshots_periodically(directory: str, interval_seconds: float):
+    # keeps the snapshot of this worker fresh for scrapes answered by the other workers
+    os.makedirs(directory, exist_ok=True)
+    try:
+        while True:
+            REGISTRY.collect()
+            await asyncio.to_thread(REGISTRY.write_snapshot, directory)
+            await asyncio.sleep(interval_seconds)
+    finally:
+        # on shutdown: the last counts are archived with the rest once this worker is gone
+        REGISTRY.write_snapshot(directory)
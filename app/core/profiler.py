@@ -0,0 +1,93 @@
+import asyncio
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from types import FrameType
+from app.core.config import settings
+
+
+# one profiler at a time per worker (/api/server/profile and the X-Profile requests),
+# sampling twice would double the overhead
+profiling_lock = asyncio.Lock()
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    # relative to the project so the flamegraph labels stay short
+    filename = os.path.relpath(code.co_filename) if code.co_filename.startswith(os.getcwd()) else os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: FrameType | None, root: str) -> str:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    # collapsed stacks go from the root to the leaf, separated by ";"
+    names.append(root)
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Stdlib sampling profiler: a thread reads sys._current_frames() every interval and counts the stacks.
+    Costs nothing while it is not running. The output is the collapsed stack format
+    ("root;caller;callee <samples>" per line) understood by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval_seconds: float, thread_ids: set[int] | None = None):
+        self.interval_seconds = interval_seconds
+        # None samples every thread of the worker (event loop and threadpool)
+        self.thread_ids = thread_ids
+        self.samples: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval_seconds):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                root = thread_names.get(thread_id, str(thread_id)).replace(" ", "_")
+                self.samples[collapse_stack(frame, root)] += 1
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        # joins the sampling thread (up to one interval), call it with asyncio.to_thread from async code
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.samples
+
+
+def render_collapsed(samples: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+def save_profile(samples: Counter[str], profile_id: str | None = None) -> str:
+    # stored as a file so that any worker on the host can return it
+    profile_id = profile_id or uuid.uuid4().hex
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    with open(os.path.join(settings.PROFILING_OUTPUT_DIR, f"{profile_id}.collapsed"), "w") as file:
+        file.write(render_collapsed(samples))
+    return profile_id
+
+
+def load_profile(profile_id: str) -> str | None:
+    # ids are uuid4 hex, anything else could be a path
+    if len(profile_id) != 32 or not all(char in "0123456789abcdef" for char in profile_id):
+        return None
+    try:
+        with open(os.path.join(settings.PROFILING_OUTPUT_DIR, f"{profile_id}.collapsed")) as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Any, Mapping
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(response_type: Any) -> TypeAdapter:
+    """
+    Build the validator/serializer of a response type only once per process.
+    example: get_type_adapter(list[SemesterWiseAllSubjectsMarksWithPopulatedDataResponseSchema])
+    """
+    return TypeAdapter(response_type)
+
+
+def fast_json_response(
+    response_type: Any,
+    data: Any,
+    trusted: bool = False,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """
+    Validate (from ORM objects or dicts) and serialize straight to JSON bytes in one pass.
+    FastAPI does not touch a returned Response, so the response_model of the route is only used for docs.
+
+    trusted=True skips validation when data is already made of response schema instances.
+    """
+    adapter = get_type_adapter(response_type)
+
+    if not trusted:
+        data = adapter.validate_python(data, from_attributes=True)
+
+    return Response(
+        content=adapter.dump_json(data),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -1,48 +1,108 @@
-import ssl
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from contextlib import asynccontextmanager
+from typing import Callable
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from app.core import settings
+from app.core.metrics import DB_SESSIONS_TOTAL
 from sqlalchemy.pool import NullPool
 
-# Determine if we need SSL (Neon/Supabase need it, local usually doesn't)
-# We can check if local db name "edutrack_db" or "db" (Docker) is in the URL
-is_local = "edutrack_db" in settings.DATABASE_URL or "@db:" in settings.DATABASE_URL
 
-# This is the critical fix for Transaction Mode, Highly recommended for Supabase/Render to avoid stale connections
-connect_args = {
-    "statement_cache_size": 0,
-    "prepared_statement_cache_size": 0,
-}
+def is_local_url(database_url: str) -> bool:
+    # Determine if we need SSL (Neon/Supabase need it, local usually doesn't)
+    # We can check if local db name "edutrack_db" or "db" (Docker) is in the URL
+    return "edutrack_db" in database_url or "@db:" in database_url
 
-# Only add SSL if we aren't local
-if not is_local:
-    connect_args["ssl"] = True
 
-# create engine and database session
-engine = create_async_engine(
-    settings.DATABASE_URL,  # Async DB URL
-    poolclass=NullPool,
-    connect_args=connect_args,
-    future=True,  # enables sqlalchemy 2.0
-    echo=False,  # False because we will use Logger to print sql queries
+is_local = is_local_url(settings.DATABASE_URL)
 
-)
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    expire_on_commit=False,
-    # autoflush=False # pending changes are not sent to db (default True), why do we need this?
-    # doesn't commit to db without calling session.commit()/db.commit() , default False
-    autocommit=False
-)
+def create_engine_for(database_url: str) -> AsyncEngine:
+    # This is the critical fix for Transaction Mode, Highly recommended for Supabase/Render to avoid stale connections
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
+
+    # Only add SSL if we aren't local
+    if not is_local_url(database_url):
+        connect_args["ssl"] = True
+
+    return create_async_engine(
+        database_url,  # Async DB URL
+        poolclass=NullPool,
+        connect_args=connect_args,
+        future=True,  # enables sqlalchemy 2.0
+        echo=False,  # False because we will use Logger to print sql queries
+    )
+
+
+def create_sessionmaker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind,
+        expire_on_commit=False,
+        # autoflush=False # pending changes are not sent to db (default True), why do we need this?
+        # doesn't commit to db without calling session.commit()/db.commit() , default False
+        autocommit=False
+    )
+
+
+# create engine and database session (primary: every write goes here)
+engine = create_engine_for(settings.DATABASE_URL)
+AsyncSessionLocal = create_sessionmaker(engine)
+
+# read replicas, routed by app/db/replicas.py
+replica_engines = [create_engine_for(url) for url in settings.DATABASE_REPLICA_URLS]
+
+
+class LazyAsyncSession:
+    """
+    Stands in for the AsyncSession of a request. The session is only created when it is
+    first used (db.execute, db.add, ...), so requests answered from a cache or rejected
+    before the first query never create one. Everything is forwarded to the real session.
+    """
+
+    __slots__ = ("_session_factory", "_session")
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    @property
+    def used(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
+
+    async def release(self, rollback: bool = False):
+        DB_SESSIONS_TOTAL.inc(used="true" if self.used else "false")
+
+        # no open transaction means no connection to give back (never used, or already committed)
+        if self._session is None or not self._session.in_transaction():
+            return
+        if rollback:
+            await self._session.rollback()
+        await self._session.close()
+
+
+@asynccontextmanager
+async def lazy_db_session(session_factory: Callable[[], AsyncSession]):
+    db = LazyAsyncSession(session_factory)
+    failed = True
+    try:
+        yield db
+        failed = False
+    finally:
+        # also runs on CancelledError / GeneratorExit (client disconnect), the connection is never left to the gc
+        await db.release(rollback=failed)
 
 
 # dependency for db session
 async def get_db_session():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    async with lazy_db_session(AsyncSessionLocal) as session:
+        yield session
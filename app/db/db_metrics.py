@@ -0,0 +1,30 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.metrics import DB_CONNECTION_ACQUIRE_SECONDS, DB_STATEMENT_DURATION_SECONDS
+from app.db.statement_timing import add_statement_observer
+
+
+def _observe_statement(conn, statement, parameters, context, executemany, duration):
+    DB_STATEMENT_DURATION_SECONDS.observe(duration)
+
+
+def _do_connect(dialect, connection_record, cargs, cparams):
+    # runs right before the driver opens the connection, returning None keeps the default connect
+    connection_record.info["connect_start_time"] = time.perf_counter()
+
+
+def _on_connect(dbapi_connection, connection_record):
+    start_time = connection_record.info.pop("connect_start_time", None)
+    if start_time is not None:
+        DB_CONNECTION_ACQUIRE_SECONDS.observe(time.perf_counter() - start_time)
+
+
+def install_db_metrics(engine: Engine):
+    # pass engine.sync_engine for the async engine
+    if event.contains(engine, "do_connect", _do_connect):
+        return
+    add_statement_observer(engine, _observe_statement)
+    # the engine uses NullPool, so acquiring a connection means opening a new one
+    event.listen(engine, "do_connect", _do_connect)
+    event.listen(engine, "connect", _on_connect)
@@ -0,0 +1,147 @@
+import asyncio
+from contextlib import suppress
+from datetime import timedelta
+from loguru import logger
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import settings
+from app.db.db import AsyncSessionLocal
+from app.models import PendingImageDeletion
+from app.utils.cloudinary import DELETED_STATUSES, get_image_backend
+
+
+def queue_image_deletion(db: AsyncSession, public_id: str):
+    """
+    Call before db.commit(). The row is part of the same transaction, so the image is
+    deleted only if the change that replaced it is actually committed.
+    """
+    db.add(PendingImageDeletion(public_id=public_id))
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    # 1x, 2x, 4x ... the base delay, capped
+    return min(settings.IMAGE_DELETION_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+               settings.IMAGE_DELETION_RETRY_MAX_SECONDS)
+
+
+class ImageDeletionWorker:
+    """
+    Background task that deletes the queued Cloudinary images in batches. Every worker process
+    runs one, a batch is claimed (FOR UPDATE SKIP LOCKED, then a lease) so they share the queue
+    without deleting an image twice. The Cloudinary call runs in a thread, outside of any transaction.
+    Rows that fail IMAGE_DELETION_MAX_ATTEMPTS times are logged and removed from the queue.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_image_backend()
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+
+    def wake(self):
+        # new deletions were committed in this worker, do not wait for the next interval
+        self._wake.set()
+
+    @staticmethod
+    async def _claim_batch() -> list:
+        # FOR UPDATE SKIP LOCKED only while claiming: the lease (next_attempt_at moved forward) keeps the
+        # other workers away during the Cloudinary call, and frees the rows again if this worker dies
+        claimable = (
+            select(PendingImageDeletion.id)
+            .where(PendingImageDeletion.next_attempt_at <= func.now())
+            .order_by(PendingImageDeletion.id)
+            .limit(settings.IMAGE_DELETION_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(PendingImageDeletion)
+                .where(PendingImageDeletion.id.in_(claimable.scalar_subquery()))
+                .values(next_attempt_at=func.now() + timedelta(seconds=settings.IMAGE_DELETION_CLAIM_SECONDS))
+                .returning(PendingImageDeletion.id, PendingImageDeletion.public_id, PendingImageDeletion.attempts)
+            )
+            rows = result.all()
+            await db.commit()
+        return rows
+
+    async def process_batch(self) -> int:
+        rows = await self._claim_batch()
+        if not rows:
+            return 0
+
+        # no transaction (nor connection) is open during the network call
+        public_ids = list(dict.fromkeys(row.public_id for row in rows))
+        error = None
+        try:
+            statuses = await asyncio.to_thread(self.backend.delete_many, public_ids)
+        except Exception as e:
+            statuses = {}
+            error = str(e)
+            logger.warning(f"Cloudinary batch deletion failed: {e}")
+
+        done_ids = []
+        deleted = 0
+        async with AsyncSessionLocal() as db:
+            for row in rows:
+                status = statuses.get(row.public_id)
+                if status in DELETED_STATUSES:
+                    done_ids.append(row.id)
+                    deleted += 1
+                    continue
+
+                attempts = row.attempts + 1
+                last_error = error or f"Cloudinary status: {status}"
+                if attempts >= settings.IMAGE_DELETION_MAX_ATTEMPTS:
+                    # the row is dropped, this log line is the only trace of the orphaned image
+                    logger.error(
+                        f"Giving up on deleting image {row.public_id} after {attempts} attempts: {last_error}")
+                    done_ids.append(row.id)
+                    continue
+
+                await db.execute(
+                    update(PendingImageDeletion)
+                    .where(PendingImageDeletion.id == row.id)
+                    .values(
+                        attempts=attempts,
+                        last_error=last_error,
+                        next_attempt_at=func.now() + timedelta(seconds=retry_delay_seconds(attempts))
+                    )
+                )
+
+            if done_ids:
+                await db.execute(
+                    delete(PendingImageDeletion).where(PendingImageDeletion.id.in_(done_ids)))
+            await db.commit()
+
+        if deleted:
+            logger.success(f"{deleted} image(s) deleted from Cloudinary")
+        return len(rows)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Image deletion queue error: {e}")
+                processed = 0
+
+            # a full batch means more rows are probably waiting
+            if processed >= settings.IMAGE_DELETION_BATCH_SIZE:
+                continue
+
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), settings.IMAGE_DELETION_INTERVAL_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+image_deletion_worker = ImageDeletionWorker()
@@ -0,0 +1,189 @@
+"""
+Partitions of the marks and audit_logs tables.
+
+marks is LIST partitioned by semester_id, one partition per semester. The semester service
+creates the partition of a new semester in the same transaction.
+audit_logs is RANGE partitioned by month on created_at. Every worker creates the coming months
+at startup, months older than AUDIT_LOG_RETENTION_MONTHS are exported to gzipped CSV, then detached and dropped.
+Rows without a partition land in the default partition, creating the partition later moves them in
+(see the ensure_*_partition functions in the migrations).
+
+examples:
+    python -m app.db.partitions list
+    python -m app.db.partitions sync              # create the missing partitions of every semester
+    python -m app.db.partitions detach 3          # keep semester 3 as a standalone table (archive, vacuum)
+    python -m app.db.partitions audit-retention   # run it monthly (eg: cron)
+"""
+import argparse
+import asyncio
+import gzip
+import os
+from datetime import datetime, timezone
+from loguru import logger
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import settings
+from app.db.db import AsyncSessionLocal
+from app.models import Semester
+
+
+def marks_partition_name(semester_id: int) -> str:
+    return f"marks_semester_{int(semester_id)}"
+
+
+async def ensure_marks_partition(db: AsyncSession, semester_id: int) -> bool:
+    """
+    Create the marks partition of a semester if it does not exist (True when created).
+    DDL is transactional in postgres, call it before db.commit()
+    """
+    return bool(await db.scalar(select(func.ensure_marks_partition(semester_id))))
+
+
+async def detach_marks_partition(db: AsyncSession, semester_id: int):
+    """
+    The detached table keeps its rows and indexes, marks of that semester are no longer visible through marks.
+    DETACH fires no delete trigger, so the dashboard counter is corrected in the same transaction.
+    """
+    name = marks_partition_name(semester_id)
+    detached_rows = await db.scalar(text(f"SELECT count(*) FROM {name}"))
+    await db.execute(text(f"ALTER TABLE marks DETACH PARTITION {name}"))
+    await db.execute(
+        text("SELECT add_to_row_count('marks', -CAST(:rows AS BIGINT))"),
+        {"rows": detached_rows})
+
+
+async def list_partitions(db: AsyncSession, table: str) -> list[dict]:
+    result = await db.execute(text("""
+        SELECT child.relname AS name,
+               pg_get_expr(child.relpartbound, child.oid) AS bound,
+               child.reltuples AS estimated_rows,
+               pg_total_relation_size(child.oid) AS total_bytes
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+        ORDER BY child.relname
+    """), {"table": table})
+    return [dict(row._mapping) for row in result]
+
+
+async def sync_marks_partitions(db: AsyncSession) -> list[int]:
+    semester_ids = (await db.scalars(select(Semester.id).order_by(Semester.id))).all()
+    created = [semester_id for semester_id in semester_ids
+               if await ensure_marks_partition(db, semester_id)]
+    await db.commit()
+    return created
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    # first day of the month, months later (negative for earlier)
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+async def ensure_audit_log_partitions(db: AsyncSession, months_ahead: int) -> list[str]:
+    # this month and the next months_ahead ones
+    now = datetime.now(timezone.utc)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(now, offset)
+        if await db.scalar(select(func.ensure_audit_log_partition(month))):
+            created.append(f"audit_logs_{month:%Y_%m}")
+    await db.commit()
+    return created
+
+
+async def archive_audit_log_partitions(db: AsyncSession, retention_months: int, archive_dir: str) -> list[str]:
+    """
+    Export the monthly partitions older than the retention to gzipped CSV, then detach and drop them.
+    The export reads the attached partition (no lock on audit_logs, so the audit log writes go on),
+    only the DETACH + DROP takes the ACCESS EXCLUSIVE lock, in a short transaction of its own.
+    A failed export leaves that partition attached.
+    """
+    cutoff = add_months(datetime.now(timezone.utc), -retention_months)
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = []
+
+    for partition in await list_partitions(db, "audit_logs"):
+        name = partition["name"]
+        try:
+            month = datetime.strptime(name, "audit_logs_%Y_%m").replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue  # audit_logs_default
+        if month >= cutoff:
+            continue
+
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        temporary_path = f"{path}.tmp"
+        try:
+            # COPY the partition itself straight from the asyncpg connection. Rows of a past
+            # month are never inserted again, so the export is complete
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            with gzip.open(temporary_path, "wb") as file:
+                async def write(chunk: bytes):
+                    file.write(chunk)
+
+                await raw_connection.driver_connection.copy_from_table(
+                    name, output=write, format="csv", header=True)
+            await db.commit()
+            os.replace(temporary_path, path)
+        except Exception as e:
+            await db.rollback()
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            logger.error(f"Could not export {name}: {e}")
+            continue
+
+        try:
+            await db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+            await db.execute(text(f"DROP TABLE {name}"))
+            await db.commit()
+        except Exception as e:
+            # the export is kept, the next run exports the partition again and retries the drop
+            await db.rollback()
+            logger.error(f"Exported {name} to {path} but could not drop it: {e}")
+            continue
+
+        logger.success(f"Archived {name} ({max(int(partition['estimated_rows']), 0)} rows) to {path}")
+        archived.append(name)
+
+    return archived
+
+
+async def run(args: argparse.Namespace):
+    async with AsyncSessionLocal() as db:
+        if args.command == "sync":
+            created = await sync_marks_partitions(db)
+            logger.success(f"Created {len(created)} partition(s): {created}")
+        elif args.command == "detach":
+            await detach_marks_partition(db, args.semester_id)
+            await db.commit()
+            logger.success(f"Detached {marks_partition_name(args.semester_id)}")
+        elif args.command == "audit-retention":
+            created = await ensure_audit_log_partitions(db, settings.AUDIT_LOG_PARTITIONS_AHEAD)
+            archived = await archive_audit_log_partitions(
+                db, settings.AUDIT_LOG_RETENTION_MONTHS, settings.AUDIT_LOG_ARCHIVE_DIR)
+            logger.success(f"Created {created}, archived {archived}")
+        else:
+            for table in ("marks", "audit_logs"):
+                for partition in await list_partitions(db, table):
+                    print(f"{partition['name']:<25} {partition['bound']:<70} "
+                          f"~{max(int(partition['estimated_rows']), 0):>10} rows "
+                          f"{partition['total_bytes'] / 1024 / 1024:>8.1f} MiB")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list")
+    subparsers.add_parser("sync")
+    detach = subparsers.add_parser("detach")
+    detach.add_argument("semester_id", type=int)
+    subparsers.add_parser("audit-retention")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,126 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from loguru import logger
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.db.statement_timing import add_statement_observer
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, query_count: int, budget: int, label: str = ""):
+        self.query_count = query_count
+        self.budget = budget
+        super().__init__(
+            f"{label or 'Block'} ran {query_count} SQL statements, budget is {budget}")
+
+
+@dataclass
+class QueryStats:
+    # request (eg: "GET /api/marks/results") or block name, used in the logs
+    label: str = ""
+    count: int = 0
+    total_seconds: float = 0.0
+    # statement text -> times executed. The text of a lazy load is the same for every row (only params change)
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, times) for statement, times in self.statements.most_common()
+                if times >= threshold]
+
+
+# stats of the current request (or query_budget block). SQLAlchemy runs the cursor events
+# in a greenlet that shares the context of the awaiting task, so the listeners see it too
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current_stats.get()
+
+
+def _record_statement(conn, statement, parameters, context, executemany, duration):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_seconds += duration
+        stats.statements[statement] += 1
+
+
+def install_query_listeners(engine: Engine):
+    # pass engine.sync_engine for the async engine
+    add_statement_observer(engine, _record_statement)
+
+
+@contextmanager
+def track_queries(label: str = ""):
+    stats = QueryStats(label=label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = ""):
+    """
+    Fail when the block runs more SQL statements than max_queries. Meant for tests and scripts.
+    example:
+        with query_budget(3, "get_all_marks_with_filters"):
+            await MarksService.get_all_marks_with_filters(db, user)
+    """
+    with track_queries(label) as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(stats.count, max_queries, label)
+
+
+def report_query_stats(stats: QueryStats, label: str):
+    for statement, times in stats.repeated_statements(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            f"Possible N+1 in {label}: statement ran {times} times: {statement[:300]}")
+
+    budget = settings.QUERY_BUDGET_PER_REQUEST
+    if budget and stats.count > budget:
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(stats.count, budget, label)
+        logger.warning(
+            f"{label} ran {stats.count} SQL statements, budget is {budget}")
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements and DB time of every request and sends them as a Server-Timing header.
+    eg: Server-Timing: db;dur=12.4;desc="5 queries"
+    Queries that run after the headers are sent (streaming bodies) are not included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope.get('method', '')} {scope.get('path', '')}"
+
+        with track_queries(label) as stats:
+            async def send_with_server_timing(message: Message):
+                if message["type"] == "http.response.start":
+                    # raises in strict mode, the server then answers 500 (used to fail tests)
+                    report_query_stats(stats, label)
+
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries"'
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_server_timing)
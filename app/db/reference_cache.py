@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any
+import asyncpg
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import settings
+from app.db.db import AsyncSessionLocal, is_local
+from app.models import Department, Semester, Subject
+from app.schemas.department_schema import DepartmentOutSchema
+from app.schemas.semester_schema import SemesterOutSchema
+from app.schemas.subject_schema import SubjectReferenceSchema
+
+
+# postgres channel used to tell the other workers that a reference table changed
+REFERENCE_DATA_CHANNEL = "reference_data_changed"
+
+# table name -> (model, snapshot schema, ordering used by the list endpoints)
+REFERENCE_TABLES: dict[str, tuple[Any, type[BaseModel], Any]] = {
+    "departments": (Department, DepartmentOutSchema, Department.department_name),
+    "semesters": (Semester, SemesterOutSchema, Semester.semester_number),
+    "subjects": (Subject, SubjectReferenceSchema, Subject.id),
+}
+
+
+class ReferenceDataCache:
+    """
+    In-process copy of the small, rarely changing tables (departments, semesters, subjects).
+    Every table has a version number that is bumped on invalidation. Writes in this worker
+    invalidate directly after commit, writes in other workers arrive through LISTEN/NOTIFY.
+    The TTL is only a safety net for when the listener connection is not available.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict[int, BaseModel]] = {}
+        self._versions: dict[str, int] = {table: 0 for table in REFERENCE_TABLES}
+        self._loaded_at: dict[str, float] = {}
+        # content hash of each loaded table, same data gives the same digest in every worker
+        self._digests: dict[str, str] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._listener: asyncpg.Connection | None = None
+
+    @staticmethod
+    def table_of(model) -> str | None:
+        table = getattr(model, "__tablename__", None)
+        return table if table in REFERENCE_TABLES else None
+
+    def version(self, table: str) -> int:
+        return self._versions[table]
+
+    def invalidate(self, table: str):
+        # unknown tables (eg: a payload from a newer deployment) reset everything
+        tables = [table] if table in REFERENCE_TABLES else list(REFERENCE_TABLES)
+
+        for name in tables:
+            self._versions[name] += 1
+            self._entries.pop(name, None)
+
+    def _is_fresh(self, table: str) -> bool:
+        if table not in self._entries:
+            return False
+        return time.monotonic() - self._loaded_at[table] < settings.REFERENCE_CACHE_TTL_SECONDS
+
+    async def _ensure_loaded(self, db: AsyncSession, table: str) -> dict[int, BaseModel]:
+        if self._is_fresh(table):
+            return self._entries[table]
+
+        lock = self._locks.setdefault(table, asyncio.Lock())
+        async with lock:
+            # another request may have loaded it while we were waiting
+            if self._is_fresh(table):
+                return self._entries[table]
+
+            version_before = self._versions[table]
+            model, schema, ordering = REFERENCE_TABLES[table]
+
+            result = await db.execute(select(model).order_by(ordering))
+            entries = {
+                row.id: schema.model_validate(row) for row in result.scalars().all()
+            }
+
+            # do not keep the rows if an invalidation arrived during the load
+            if self._versions[table] == version_before:
+                self._entries[table] = entries
+                self._loaded_at[table] = time.monotonic()
+                self._digests[table] = self._compute_digest(entries)
+
+            return entries
+
+    @staticmethod
+    def _compute_digest(entries: dict[int, BaseModel]) -> str:
+        content = json.dumps(
+            [entry.model_dump(mode="json") for entry in entries.values()],
+            separators=(",", ":")
+        )
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    async def digest(self, db: AsyncSession, table: str) -> str:
+        entries = await self._ensure_loaded(db, table)
+        # the digest of a load that raced with an invalidation was not stored, hash it on the fly
+        if self._entries.get(table) is entries:
+            return self._digests[table]
+        return self._compute_digest(entries)
+
+    async def get_all(self, db: AsyncSession, table: str) -> list[BaseModel]:
+        entries = await self._ensure_loaded(db, table)
+        return list(entries.values())
+
+    async def get(self, db: AsyncSession, table: str, row_id: int) -> BaseModel | None:
+        entries = await self._ensure_loaded(db, table)
+        return entries.get(row_id)
+
+    @staticmethod
+    async def publish_change(db: AsyncSession, table: str):
+        """
+        Call before db.commit(). NOTIFY is transactional, so the other workers
+        are told only if the write is actually committed.
+        """
+        await db.execute(select(func.pg_notify(REFERENCE_DATA_CHANNEL, table)))
+
+    def _on_notification(self, connection, pid, channel, payload):
+        logger.info(f"Reference data changed in another worker: {payload}")
+        self.invalidate(payload)
+
+    def _on_listener_terminated(self, connection):
+        # notifications may be lost from now on, so nothing cached can be trusted
+        logger.warning("Reference data listener connection closed")
+        self._listener = None
+        for table in REFERENCE_TABLES:
+            self.invalidate(table)
+
+    async def start(self):
+        # warm up all tables at startup so the first requests are served from memory
+        try:
+            async with AsyncSessionLocal() as session:
+                for table in REFERENCE_TABLES:
+                    await self._ensure_loaded(session, table)
+            logger.success("Reference data cache loaded")
+        except Exception as e:
+            logger.error(f"Could not warm up reference data cache: {e}")
+
+        if not settings.REFERENCE_CACHE_LISTEN:
+            return
+
+        try:
+            # asyncpg does not understand the sqlalchemy driver suffix
+            dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+            self._listener = await asyncpg.connect(dsn, ssl=None if is_local else True)
+            await self._listener.add_listener(REFERENCE_DATA_CHANNEL, self._on_notification)
+            self._listener.add_termination_listener(self._on_listener_terminated)
+            logger.success("Listening for reference data changes")
+        except Exception as e:
+            # LISTEN does not work through transaction mode poolers, the TTL still applies
+            logger.warning(f"Reference data listener not started: {e}")
+            self._listener = None
+
+    async def stop(self):
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            try:
+                await listener.remove_listener(REFERENCE_DATA_CHANNEL, self._on_notification)
+                await listener.close()
+            except Exception as e:
+                logger.error(f"Error closing reference data listener: {e}")
+
+
+reference_cache = ReferenceDataCache()
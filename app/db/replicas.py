@@ -0,0 +1,113 @@
+import asyncio
+import itertools
+import math
+from contextlib import suppress
+from fastapi import Request
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from app.core import settings
+from app.core.metrics import DB_REPLICA_LAG_SECONDS
+from app.db.db import AsyncSessionLocal, create_sessionmaker, lazy_db_session, replica_engines
+
+
+# set by ReadYourWritesMiddleware after a successful write, reads of that client stay on the primary
+READ_PRIMARY_COOKIE = "read_primary"
+
+# seconds the replica is behind: 0 when it has replayed everything it received, NULL when it is not
+# streaming from the primary (a disconnected or stalled WAL receiver has nothing left to replay,
+# that is not "caught up"). The status columns need pg_read_all_stats for the replica role.
+# (pg_last_xact_replay_timestamp alone keeps growing while the primary is idle)
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver
+            WHERE status = 'streaming'
+              AND last_msg_receipt_time > now() - make_interval(secs => :max_silence_seconds)
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Picks a read replica for the read-only dependencies. Every worker checks the lag of each replica
+    in the background, replicas behind by more than REPLICA_MAX_LAG_SECONDS (or not reachable, or not
+    streaming) are skipped and the reads fall back to the primary. Until the first check every read
+    goes to the primary.
+    """
+
+    def __init__(self, engines: list[AsyncEngine]):
+        self.engines = engines
+        self.sessionmakers = [create_sessionmaker(replica) for replica in engines]
+        self.lags = [math.inf] * len(engines)
+        self._next = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    def pick(self) -> async_sessionmaker[AsyncSession] | None:
+        # round robin over the replicas that are close enough, None means the primary
+        healthy = [index for index, lag in enumerate(self.lags)
+                   if lag <= settings.REPLICA_MAX_LAG_SECONDS]
+        if not healthy:
+            return None
+        return self.sessionmakers[healthy[next(self._next) % len(healthy)]]
+
+    async def check_lag(self, index: int) -> float:
+        try:
+            async with self.engines[index].connect() as connection:
+                lag = await connection.scalar(
+                    REPLICA_LAG_QUERY, {"max_silence_seconds": settings.REPLICA_MAX_SILENCE_SECONDS})
+        except Exception as e:
+            if self.lags[index] != math.inf:
+                logger.warning(f"Read replica {index} is not reachable, reads go to the primary: {e}")
+            lag = math.inf
+        else:
+            if lag is None:
+                if self.lags[index] != math.inf:
+                    logger.warning(f"Read replica {index} is not streaming from the primary, skipping it")
+                lag = math.inf
+            lag = float(lag)
+
+        max_lag = settings.REPLICA_MAX_LAG_SECONDS
+        if math.isfinite(lag) and lag > max_lag >= self.lags[index]:
+            logger.warning(f"Read replica {index} is {lag:.1f}s behind, skipping it")
+        elif lag <= max_lag < self.lags[index]:
+            logger.info(f"Read replica {index} is in use ({lag:.1f}s behind)")
+        self.lags[index] = lag
+        DB_REPLICA_LAG_SECONDS.set(lag if lag != math.inf else -1, replica=str(index))
+        return lag
+
+    async def _run(self):
+        while True:
+            await asyncio.gather(*(self.check_lag(index) for index in range(len(self.engines))))
+            await asyncio.sleep(settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS)
+
+    def start(self):
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+replica_router = ReplicaRouter(replica_engines)
+
+
+# dependency for read-only endpoints: a replica session, or the primary right after a write of this client
+async def get_read_db_session(request: Request):
+    read_primary = bool(request.cookies.get(READ_PRIMARY_COOKIE))
+
+    def create_session() -> AsyncSession:
+        # the replica is picked on first use, with the latest lag check
+        sessionmaker = None if read_primary else replica_router.pick()
+        return (sessionmaker or AsyncSessionLocal)()
+
+    async with lazy_db_session(create_session) as session:
+        yield session
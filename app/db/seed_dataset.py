@@ -0,0 +1,320 @@
+"""
+Synthetic dataset for local performance work (never run it against production).
+
+Creates departments, semesters, subjects, subject offerings, teachers, students and their marks
+with COPY, which is orders of magnitude faster than ORM inserts. Every run uses a tag in
+usernames, codes and names, so it can be run more than once on the same database.
+
+examples:
+    python -m app.db.seed_dataset                                   # ~250k marks
+    python -m app.db.seed_dataset --students-per-department 10000   # ~1.6M marks
+
+A manifest (tag, password, ids, sample registrations) is written for benchmarks/load_test.py.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+import asyncpg
+from loguru import logger
+from app.core import settings
+from app.core.pw_hash import hash_password
+from app.db.db import is_local
+from app.services.marks_service import MarksService
+
+
+SEMESTER_NAMES = ["1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th"]
+
+# rows per COPY call, keeps the memory flat for millions of marks
+COPY_CHUNK_SIZE = 50_000
+
+
+class IdAllocator:
+    # COPY does not return ids, so they are given here (after the current max) and the sequence is moved after
+    def __init__(self, start: int):
+        self.next_id = start + 1
+
+    def take(self) -> int:
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+
+async def allocator_for(connection: asyncpg.Connection, table: str) -> IdAllocator:
+    return IdAllocator(await connection.fetchval(f"SELECT COALESCE(MAX(id), 0) FROM {table}"))
+
+
+async def copy_rows(connection: asyncpg.Connection, table: str, columns: list[str], rows) -> int:
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= COPY_CHUNK_SIZE:
+            await connection.copy_records_to_table(table, records=chunk, columns=columns)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        await connection.copy_records_to_table(table, records=chunk, columns=columns)
+        total += len(chunk)
+
+    logger.info(f"{table}: {total} rows copied")
+    return total
+
+
+async def ensure_semesters(connection: asyncpg.Connection, count: int) -> dict[int, int]:
+    # semesters are unique by number, existing ones are reused
+    for number in range(1, count + 1):
+        await connection.execute(
+            """
+            INSERT INTO semesters (semester_name, semester_number) VALUES ($1, $2)
+            ON CONFLICT DO NOTHING
+            """,
+            SEMESTER_NAMES[number - 1] if number <= len(SEMESTER_NAMES) else f"{number}th",
+            number,
+        )
+
+    rows = await connection.fetch(
+        "SELECT id, semester_number FROM semesters WHERE semester_number <= $1", count)
+    return {row["semester_number"]: row["id"] for row in rows}
+
+
+def compute_marks(rng: random.Random) -> tuple[float, float, float, float, float, float]:
+    mark = SimpleNamespace(
+        assignment_mark=float(rng.randint(8, 20)),
+        class_test_mark=float(rng.randint(8, 20)),
+        midterm_mark=float(rng.randint(6, 20)),
+        final_exam_mark=float(rng.randint(20, 80)),
+    )
+    # same formula as the api
+    MarksService.compute_total_marks_and_gpa(mark)
+    return (mark.assignment_mark, mark.class_test_mark, mark.midterm_mark,
+            mark.final_exam_mark, mark.total_mark, mark.GPA)
+
+
+async def seed(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.random_seed)
+    tag = args.tag or uuid.uuid4().hex[:6]
+    now = datetime.now(timezone.utc)
+    current_year = now.year
+
+    # asyncpg does not understand the sqlalchemy driver suffix
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    connection = await asyncpg.connect(dsn, ssl=None if is_local else True)
+
+    started = time.perf_counter()
+    hashed_password = hash_password(args.password)  # hashing is slow, every seeded user shares it
+
+    try:
+        async with connection.transaction():
+            # a crash only loses the last commit of a throwaway dataset
+            await connection.execute("SET LOCAL synchronous_commit TO OFF")
+
+            semester_ids = await ensure_semesters(connection, args.semesters)
+            # marks are partitioned by semester, COPY into the right partition instead of marks_default
+            for semester_id in semester_ids.values():
+                await connection.execute("SELECT ensure_marks_partition($1)", semester_id)
+
+            # departments
+            department_ids = []
+            department_rows = []
+            department_alloc = await allocator_for(connection, "departments")
+            for index in range(args.departments):
+                department_id = department_alloc.take()
+                department_ids.append(department_id)
+                department_rows.append(
+                    (department_id, f"Department {index + 1} ({tag})"))
+            await copy_rows(connection, "departments", ["id", "department_name"], department_rows)
+
+            # subjects: subjects_per_semester for every department and semester, one offering each
+            subject_alloc = await allocator_for(connection, "subjects")
+            subject_rows = []
+            # (department_id, semester_number) -> subject ids
+            offered: dict[tuple[int, int], list[int]] = {}
+            for department_id in department_ids:
+                for number, semester_id in semester_ids.items():
+                    for index in range(args.subjects_per_semester):
+                        subject_id = subject_alloc.take()
+                        offered.setdefault((department_id, number), []).append(subject_id)
+                        subject_rows.append((
+                            subject_id,
+                            f"Subject {number}{index + 1:02d} of department {department_id}",
+                            f"{tag}-{subject_id}",
+                            rng.choice([2.0, 3.0, 3.0, 4.0]),
+                            index == 0,  # one general subject per semester
+                            semester_id,
+                        ))
+            await copy_rows(connection, "subjects",
+                            ["id", "subject_title", "subject_code", "credits", "is_general", "semester_id"],
+                            subject_rows)
+
+            # users (admin, teachers, students)
+            user_alloc = await allocator_for(connection, "users")
+            user_rows = []
+
+            admin_username = f"{tag}.admin@seed.local"
+            user_rows.append((user_alloc.take(), admin_username, admin_username,
+                              hashed_password, True, "admin"))
+
+            teacher_rows = []
+            teacher_alloc = await allocator_for(connection, "teachers")
+            teachers_by_department: dict[int, list[int]] = {}
+            for department_id in department_ids:
+                for index in range(args.teachers_per_department):
+                    user_id = user_alloc.take()
+                    username = f"{tag}.teacher{user_id}@seed.local"
+                    user_rows.append((user_id, username, username,
+                                      hashed_password, True, "teacher"))
+                    teacher_id = teacher_alloc.take()
+                    teachers_by_department.setdefault(department_id, []).append(teacher_id)
+                    teacher_rows.append((teacher_id, f"Teacher {teacher_id}", department_id, user_id,
+                                         f"House {index}, Road {department_id}", "", None, "", ""))
+
+            student_rows = []
+            student_alloc = await allocator_for(connection, "students")
+            # students of a later semester started earlier: semester 1 -> this year's session
+            students: list[tuple[int, int, int, str]] = []
+            for department_id in department_ids:
+                for index in range(args.students_per_department):
+                    number = rng.randint(1, args.semesters)
+                    start_year = current_year - (number - 1) // 2
+                    session = f"{start_year}-{str(start_year + 1)[-2:]}"
+
+                    user_id = user_alloc.take()
+                    username = f"{tag}.student{user_id}@seed.local"
+                    user_rows.append((user_id, username, username,
+                                      hashed_password, True, "student"))
+
+                    student_id = student_alloc.take()
+                    registration = f"{tag}{student_id:08d}"
+                    students.append((student_id, department_id, number, session))
+                    student_rows.append((
+                        student_id, f"Student {student_id}", registration, session,
+                        department_id, semester_ids[number], user_id, "", "",
+                        date(start_year - 19, rng.randint(1, 12), rng.randint(1, 28)), "", "",
+                    ))
+
+            await copy_rows(connection, "users",
+                            ["id", "username", "email", "hashed_password", "is_active", "role"],
+                            user_rows)
+            await copy_rows(connection, "teachers",
+                            ["id", "name", "department_id", "user_id",
+                             "present_address", "permanent_address", "date_of_birth",
+                             "photo_url", "photo_public_id"],
+                            teacher_rows)
+            await copy_rows(connection, "students",
+                            ["id", "name", "registration", "session", "department_id",
+                             "semester_id", "user_id", "present_address", "permanent_address",
+                             "date_of_birth", "photo_url", "photo_public_id"],
+                            student_rows)
+
+            # offerings
+            offering_alloc = await allocator_for(connection, "subject_offerings")
+            offering_rows = [
+                (offering_alloc.take(), rng.choice(teachers_by_department[department_id])
+                 if teachers_by_department.get(department_id) else None, subject_id, department_id)
+                for (department_id, number), subject_ids in offered.items()
+                for subject_id in subject_ids
+            ]
+            await copy_rows(connection, "subject_offerings",
+                            ["id", "taught_by_id", "subject_id", "department_id"], offering_rows)
+
+            # marks: every finished semester is published, the current one is partly marked and unpublished
+            mark_alloc = await allocator_for(connection, "marks")
+
+            def mark_rows():
+                for student_id, department_id, current_number, session in students:
+                    for number in range(1, current_number + 1):
+                        is_current = number == current_number
+                        for subject_id in offered[(department_id, number)]:
+                            if is_current and rng.random() > args.current_semester_marked:
+                                continue
+                            challenged = not is_current and rng.random() < args.challenge_rate
+                            yield (
+                                mark_alloc.take(), *compute_marks(rng),
+                                "unpublished" if is_current else "published",
+                                "challenged" if challenged else "none",
+                                now - timedelta(days=rng.randint(1, 30)) if challenged else None,
+                                student_id, subject_id, semester_ids[number],
+                            )
+
+            mark_count = await copy_rows(connection, "marks",
+                                         ["id", "assignment_mark", "class_test_mark", "midterm_mark",
+                                          "final_exam_mark", "total_mark", "GPA", "result_status",
+                                          "result_challenge_status", "challenged_at",
+                                          "student_id", "subject_id", "semester_id"],
+                                         mark_rows())
+
+            # move the sequences after the ids given above
+            for table in ("departments", "subjects", "users", "teachers",
+                          "students", "subject_offerings", "marks"):
+                await connection.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+
+        # fresh statistics, otherwise the planner still thinks the tables are empty
+        await connection.execute("ANALYZE")
+    finally:
+        await connection.close()
+
+    logger.success(
+        f"Seeded {len(students)} students and {mark_count} marks in {time.perf_counter() - started:.1f}s (tag: {tag})")
+
+    sample_students = rng.sample(students, min(200, len(students)))
+    registrations = {student_id: f"{tag}{student_id:08d}" for student_id, *_ in sample_students}
+
+    return {
+        "tag": tag,
+        "password": args.password,
+        "admin_username": admin_username,
+        "department_ids": department_ids,
+        "semester_ids": semester_ids,
+        "students": [
+            {
+                "registration": registrations[student_id],
+                "department_id": department_id,
+                "semester_id": semester_ids[number],
+                # the previous semester is finished and published, first semester students have no result yet
+                **({"result_semester_id": semester_ids[number - 1]} if number > 1 else {}),
+                "session": session,
+            }
+            for student_id, department_id, number, session in sample_students
+        ],
+        "student_usernames": [
+            row[1] for row in user_rows if row[5] == "student"][:200],
+        "counts": {"students": len(students), "marks": mark_count},
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--departments", type=int, default=6)
+    parser.add_argument("--semesters", type=int, default=8)
+    parser.add_argument("--subjects-per-semester", type=int, default=6)
+    parser.add_argument("--teachers-per-department", type=int, default=40)
+    parser.add_argument("--students-per-department", type=int, default=1500)
+    parser.add_argument("--current-semester-marked", type=float, default=0.5,
+                        help="share of the current semester subjects that already have a mark")
+    parser.add_argument("--challenge-rate", type=float, default=0.01)
+    parser.add_argument("--password", default="seedpassword",
+                        help="password of every seeded user")
+    parser.add_argument("--tag", default="", help="defaults to a random tag")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--manifest", default="benchmarks/seed_manifest.json")
+    return parser.parse_args()
+
+
+async def run():
+    args = parse_args()
+    manifest = await seed(args)
+
+    with open(args.manifest, "w") as file:
+        json.dump(manifest, file, indent=2)
+    logger.info(f"Manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+import random
+import re
+from datetime import datetime, timezone
+from typing import Any
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+from app.db.query_stats import current_query_stats
+from app.db.statement_timing import add_statement_observer
+from app.utils.mask_sensitive_data import sanitize_payload
+
+
+# bind names get a numeric suffix when a column is used more than once (eg: hashed_password_1)
+_BIND_SUFFIX = re.compile(r"_\d+$")
+
+# EXPLAIN ANALYZE runs the statement, so only plain reads are explained
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+# keeps a reference to the running EXPLAIN tasks (asyncio only keeps weak references)
+_explain_tasks: set[asyncio.Task] = set()
+
+_explain_engine: AsyncEngine | None = None
+
+
+def _short(value: Any, limit: int = 200) -> Any:
+    # base64 images/pdfs and long texts would flood the log
+    if isinstance(value, (str, bytes)) and len(value) > limit:
+        return f"{value[:limit]!r}... ({len(value)} chars)"
+    if isinstance(value, (int, float, bool, str)) or value is None:
+        return value
+    return str(value)
+
+
+def sanitize_parameters(context, parameters, executemany: bool = False) -> Any:
+    if executemany:
+        # the first rows are enough to reproduce the statement
+        return [sanitize_parameters(context, row) for row in parameters[:3]]
+
+    if isinstance(parameters, dict):
+        named = parameters
+    else:
+        # asyncpg is positional ($1, $2), the compiled statement knows the bind names
+        names = getattr(getattr(context, "compiled", None), "positiontup", None)
+        if names and len(names) == len(parameters):
+            named = dict(zip(names, parameters))
+        else:
+            named = {f"${index}": value for index, value in enumerate(parameters, start=1)}
+
+    return {
+        name: sanitize_payload({_BIND_SUFFIX.sub("", name): _short(value)})[_BIND_SUFFIX.sub("", name)]
+        for name, value in named.items()
+    }
+
+
+def _log_slow_statement(conn, statement, parameters, context, executemany, duration):
+    duration_ms = duration * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    stats = current_query_stats()
+    route = stats.label if stats is not None and stats.label else "-"
+    sanitized = sanitize_parameters(context, parameters, executemany)
+
+    # slow_query in extra sends the record to the slow query sink too (see setup_logging)
+    logger.bind(slow_query=True, duration_ms=round(duration_ms, 1), route=route).warning(
+        f"Slow query ({duration_ms:.0f} ms) in {route}: {statement} | params: {sanitized}")
+
+    if (
+        settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE > 0
+        and not executemany
+        and _EXPLAINABLE.match(statement)
+        and len(_explain_tasks) < settings.SLOW_QUERY_EXPLAIN_MAX_PENDING
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+    ):
+        _schedule_explain(statement, parameters, duration_ms, route)
+
+
+def _schedule_explain(statement: str, parameters, duration_ms: float, route: str):
+    try:
+        # the cursor events of the async engine run in a greenlet on the event loop thread
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    task = loop.create_task(_explain(statement, parameters, duration_ms, route))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+async def _explain(statement: str, parameters, duration_ms: float, route: str):
+    if _explain_engine is None:
+        return
+
+    try:
+        # own connection and a read only transaction that is always rolled back
+        async with _explain_engine.connect() as connection:
+            await connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            await connection.rollback()
+    except Exception as e:
+        logger.warning(f"Could not EXPLAIN slow query: {e}")
+        return
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    record = {
+        "time": datetime.now(timezone.utc).isoformat(),
+        "route": route,
+        "duration_ms": round(duration_ms, 1),
+        "statement": statement,
+        "plan": plan,
+    }
+    await asyncio.to_thread(_store_plan, record)
+
+
+def _store_plan(record: dict):
+    # one json line per plan, one file per day
+    os.makedirs(settings.SLOW_QUERY_PLAN_DIR, exist_ok=True)
+    path = os.path.join(settings.SLOW_QUERY_PLAN_DIR,
+                        f"plans-{record['time'][:10]}.jsonl")
+    with open(path, "a") as file:
+        file.write(json.dumps(record, default=str) + "\n")
+
+
+def install_slow_query_log(engine: AsyncEngine):
+    global _explain_engine
+
+    # the first engine (the primary) runs the EXPLAINs, also for the statements of the read replicas
+    if _explain_engine is None:
+        _explain_engine = engine
+    add_statement_observer(engine.sync_engine, _log_slow_statement)
@@ -0,0 +1,41 @@
+import time
+from typing import Any, Callable
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+
+# called after every statement with the duration in seconds:
+# observer(conn, statement, parameters, context, executemany, duration)
+StatementObserver = Callable[[Connection, str, Any, Any, bool, float], None]
+
+# observers of each engine (query stats, DB metrics, slow query log)
+_observers: dict[Engine, list[StatementObserver]] = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("statement_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    for observer in _observers.get(conn.engine, ()):
+        observer(conn, statement, parameters, context, executemany, duration)
+
+
+def add_statement_observer(engine: Engine, observer: StatementObserver):
+    """
+    One before/after_cursor_execute pair per engine times every statement once,
+    the observers get the duration instead of timing the statement themselves.
+    pass engine.sync_engine for the async engine
+    """
+    observers = _observers.setdefault(engine, [])
+    if observer not in observers:
+        observers.append(observer)
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
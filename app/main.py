@@ -1,18 +1,83 @@
 # this project is using python 3.12 interpreter
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 import uvicorn
+from loguru import logger
 from app.core.logging_config import setup_logging
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware.audit_log_middleware import AuditMiddleware
+from app.middleware.compression_middleware import CompressionMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.profiling_middleware import RequestProfilingMiddleware
 from app.middleware.inject_token import TokenInjectionFromCookieToHeaderMiddleware
-from app.routes import department_routes, heath_check, login_logout, mark_routes, semester_routes, student_routes, subject_offering_route, subject_routes, user_routes, teacher_routes, admin_dashboard_routes
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.routes import department_routes, heath_check, login_logout, mark_routes, semester_routes, student_routes, subject_offering_route, subject_routes, user_routes, teacher_routes, admin_dashboard_routes, audit_log_routes
 from app.core.config import settings
+from app.db.reference_cache import reference_cache
+from app.db.image_deletion_queue import image_deletion_worker
+from app.db.partitions import ensure_audit_log_partitions
+from app.db.db import AsyncSessionLocal, engine, replica_engines
+from app.db.replicas import replica_router
+from app.db.query_stats import QueryStatsMiddleware, install_query_listeners
+from app.db.db_metrics import install_db_metrics
+from app.db.slow_query_log import install_slow_query_log
+from app.core.metrics import write_snapshots_periodically
+from app.core.loop_monitor import loop_monitor
 
 # setup logging
 setup_logging()
 
+
+# runs once per worker: code before yield on startup, code after yield on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load departments, semesters, subjects in memory and listen for changes from other workers
+    await reference_cache.start()
+
+    # audit log partitions of the coming months, so new logs never land in the default partition
+    if settings.AUDIT_LOG_PARTITIONS_AHEAD > 0:
+        try:
+            async with AsyncSessionLocal() as session:
+                await ensure_audit_log_partitions(session, settings.AUDIT_LOG_PARTITIONS_AHEAD)
+        except Exception as e:
+            logger.error(f"Could not create the audit log partitions: {e}")
+
+    # replication lag of the read replicas (no-op without DATABASE_REPLICA_URLS)
+    replica_router.start()
+
+    # event loop lag metric (and blocking stacks in debug)
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+    # share this worker's metrics with the other gunicorn workers
+    snapshot_task = None
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROC_DIR:
+        snapshot_task = asyncio.create_task(write_snapshots_periodically(
+            settings.METRICS_MULTIPROC_DIR, settings.METRICS_SNAPSHOT_INTERVAL_SECONDS))
+
+    # deletes replaced profile pictures from Cloudinary in the background
+    if settings.IMAGE_DELETION_ENABLED:
+        image_deletion_worker.start()
+
+    yield
+
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await snapshot_task
+    await image_deletion_worker.stop()
+    await replica_router.stop()
+    await loop_monitor.stop()
+    await reference_cache.stop()
+
+
 app = FastAPI(
-    swagger_ui_parameters={"withCredentials": True}
+    swagger_ui_parameters={"withCredentials": True},
+    # orjson renders the response_model output much faster than the stdlib json
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -28,12 +93,35 @@ app.add_middleware(
 # 1 when request IN
 app.add_middleware(TokenInjectionFromCookieToHeaderMiddleware)
 app.add_middleware(AuditMiddleware)  # 2 when request IN
+# per request profiling for super_admin, not added at all when disabled
+if settings.REQUEST_PROFILING_ENABLED:
+    app.add_middleware(RequestProfilingMiddleware)
+# count SQL statements per request (the audit log uses the sync engine, it is not counted)
+if settings.QUERY_STATS_ENABLED:
+    for database_engine in (engine, *replica_engines):
+        install_query_listeners(database_engine.sync_engine)
+    app.add_middleware(QueryStatsMiddleware)
+# log statements slower than SLOW_QUERY_THRESHOLD_MS (0 disables)
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    for database_engine in (engine, *replica_engines):
+        install_slow_query_log(database_engine)
+# request count, latency and in-flight requests per route
+if settings.METRICS_ENABLED:
+    for database_engine in (engine, *replica_engines):
+        install_db_metrics(database_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+# reads of a client that just wrote stay on the primary for READ_YOUR_WRITES_SECONDS
+if replica_engines:
+    app.add_middleware(ReadYourWritesMiddleware)
+# added last so it is the outermost: compresses the final response body
+app.add_middleware(CompressionMiddleware)
 # response comes here and follows the middlewares bottom to top (router -> middleware -> res)
 
 # add the routes
 app.include_router(heath_check.router, prefix="/api")
 app.include_router(login_logout.router, prefix="/api")
 app.include_router(admin_dashboard_routes.router, prefix="/api")
+app.include_router(audit_log_routes.router, prefix="/api")
 app.include_router(user_routes.router, prefix="/api")
 app.include_router(teacher_routes.router, prefix="/api")
 app.include_router(student_routes.router, prefix="/api")
@@ -1,8 +1,11 @@
+import time
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.models.audit_log_model import LogLevel, AuditLog
 from app.utils.audit_level_set import level_from_status
 from app.db.sync_db import SyncSessionLocal
+from app.core.error_handling import resolve_audit_payload
+from app.core.metrics import AUDIT_LOG_PENDING_WRITES, AUDIT_LOG_WRITE_DURATION_SECONDS
 
 
 class AuditMiddleware(BaseHTTPMiddleware):
@@ -42,7 +45,7 @@ class AuditMiddleware(BaseHTTPMiddleware):
             level = level_from_status(status)
 
         # attach payload from service functions integrity error, routers exceptions
-        payload = getattr(request.state, "audit_payload", None)
+        payload = resolve_audit_payload(request)
         # user_id is attached from get_current_user
         user_id = getattr(request.state, "user_id", None)
 
@@ -63,11 +66,18 @@ class AuditMiddleware(BaseHTTPMiddleware):
             payload=payload,
         )
 
-        with SyncSessionLocal() as session:
-            try:
-                session.add(log)
-                session.commit()
-            except Exception:
-                session.rollback()
+        AUDIT_LOG_PENDING_WRITES.inc()
+        start_time = time.perf_counter()
+        try:
+            with SyncSessionLocal() as session:
+                try:
+                    session.add(log)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+        finally:
+            AUDIT_LOG_PENDING_WRITES.dec()
+            AUDIT_LOG_WRITE_DURATION_SECONDS.observe(
+                time.perf_counter() - start_time)
 
         return response
@@ -0,0 +1,209 @@
+import gzip
+import zlib
+from collections import OrderedDict
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+# brotli is optional: used when the package is installed, gzip otherwise
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson",
+                      "text/", "application/javascript", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    # "gzip, deflate, br;q=0.9" -> {"gzip": 1.0, "deflate": 1.0, "br": 0.9}
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class StreamCompressor:
+    # compresses a streaming body chunk by chunk, every chunk is flushed so NDJSON lines arrive without delay
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(
+                quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits 16 + MAX_WBITS writes the gzip header and trailer
+            self._compressor = zlib.compressobj(
+                settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies for responses that have an ETag (reference data, results with PDF).
+    Same path + same ETag means the same bytes, so they are compressed only once per worker.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+
+    def get(self, key: tuple[str, str, str]) -> bytes | None:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: tuple[str, str, str], body: bytes):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+compressed_body_cache = CompressedBodyCache(settings.COMPRESSION_CACHE_MAX_ENTRIES)
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli response compression.
+    A pure ASGI middleware (not BaseHTTPMiddleware) so that streaming responses are compressed
+    chunk by chunk instead of being collected in memory first.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(
+            self.app, encoding, scope.get("path", ""))
+        await responder(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, path: str):
+        self.app = app
+        self.encoding = encoding
+        self.path = path
+        self.send: Send
+        self.start_message: Message | None = None
+        self.compress = False
+        self.stream: StreamCompressor | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # hold the headers back until the first body chunk tells us the size
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.compress = (
+                message["status"] >= 200
+                and message["status"] not in (204, 304)
+                and "content-encoding" not in headers
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            self.start_message = message
+            if not self.compress:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or not self.compress:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        # first body chunk
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start_message["headers"])
+
+            if not more_body:
+                # small responses are not worth the cpu time
+                if len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+                    self.compress = False
+                    await self.send(start_message)
+                    await self.send(message)
+                    return
+
+                compressed = self.compressed_full_body(
+                    body, headers.get("etag"))
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(compressed))
+                headers.add_vary_header("Accept-Encoding")
+                await self.send(start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # streaming response: the total size is unknown, compress every chunk as it comes
+            self.stream = StreamCompressor(self.encoding)
+            del headers["Content-Length"]
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            await self.send(start_message)
+
+        if self.stream is None:
+            await self.send(message)
+            return
+
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def compressed_full_body(self, body: bytes, etag: str | None) -> bytes:
+        if etag is None:
+            return compress_body(body, self.encoding)
+
+        key = (self.path, etag, self.encoding)
+        compressed = compressed_body_cache.get(key)
+        if compressed is None:
+            compressed = compress_body(body, self.encoding)
+            compressed_body_cache.set(key, compressed)
+        return compressed
@@ -0,0 +1,46 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import HTTP_REQUEST_DURATION_SECONDS, HTTP_REQUESTS_IN_PROGRESS, HTTP_REQUESTS_TOTAL
+
+
+class MetricsMiddleware:
+    """
+    Request count, latency and in-flight requests per route template.
+    The template (eg: /api/marks/{mark_id}) keeps the number of series small, unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        start_time = time.perf_counter()
+        status_code = 500
+        duration = None
+
+        async def send_with_metrics(message: Message):
+            nonlocal status_code, duration
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration = time.perf_counter() - start_time
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec(method=method)
+
+            # the router puts the matched route in the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+
+            HTTP_REQUESTS_TOTAL.inc(
+                method=method, route=route_path, status=str(status_code))
+            HTTP_REQUEST_DURATION_SECONDS.observe(
+                duration if duration is not None else time.perf_counter() - start_time,
+                method=method, route=route_path)
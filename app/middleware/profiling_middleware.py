@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import uuid
+from fastapi import HTTPException
+from sqlalchemy import select
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.jwt import decode_access_token
+from app.core.profiler import SamplingProfiler, profiling_lock, save_profile
+from app.db.db import AsyncSessionLocal
+from app.models import User
+
+
+async def is_super_admin_request(headers: Headers) -> bool:
+    """
+    Resolves the role from the access token (Authorization header or access_token cookie)
+    before anything is profiled. The token only has the username, so the role is one query.
+    """
+    authorization = headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    else:
+        token = cookie_parser(headers.get("cookie", "")).get("access_token")
+
+    if not token or token == "undefined":
+        return False
+
+    try:
+        payload = decode_access_token(token)
+    except HTTPException:
+        return False  # expired or invalid
+
+    username = payload.get("sub") if payload else None
+    if not username:
+        return False
+
+    async with AsyncSessionLocal() as db:
+        role = await db.scalar(select(User.role).where(User.username == str(username)))
+    return role is not None and role.value == "super_admin"
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles a single request when it has the "X-Profile: 1" header and the user is a super_admin.
+    The profile id is returned in the X-Profile-Id header, get it from /api/server/profile/{profile_id}.
+    Only added to the app when REQUEST_PROFILING_ENABLED is set, so there is no cost otherwise.
+
+    The caller is checked before the sampler starts: requests without a valid super_admin token
+    are never sampled and cannot hold the profiling slot of the worker. The slot (profiling_lock)
+    is shared with /api/server/profile, a request is not profiled while a worker profile runs.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or profiling_lock.locked():
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        # another profile may have taken the slot while the role was looked up
+        if headers.get("x-profile") != "1" or not await is_super_admin_request(headers) or profiling_lock.locked():
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        # the lock is free, acquiring it does not yield to the loop
+        async with profiling_lock:
+            # only the event loop thread: the code of this request and whatever else runs on the loop
+            profiler = SamplingProfiler(
+                settings.PROFILING_INTERVAL_MS / 1000, {threading.get_ident()})
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                samples = await asyncio.to_thread(profiler.stop)
+
+        await asyncio.to_thread(save_profile, samples, profile_id)
@@ -0,0 +1,37 @@
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core import settings
+from app.db.replicas import READ_PRIMARY_COOKIE
+
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write, the client gets a short lived cookie that keeps its reads on the
+    primary (see get_read_db_session), so it never reads a replica that has not caught up yet.
+    Only added when read replicas are configured.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # same attributes as the auth cookies: the frontend is on another site
+        cookie = Response()
+        cookie.set_cookie(
+            READ_PRIMARY_COOKIE, "1", max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True, samesite="none", secure=True)
+        self.set_cookie_header = cookie.headers["set-cookie"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", self.set_cookie_header)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
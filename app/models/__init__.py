@@ -9,3 +9,5 @@ from .subject_offerings_model import SubjectOfferings
 from .user_model import User, UserRole
 from .teacher_model import Teacher
 from .audit_log_model import AuditLog
+from .table_row_count_model import TableRowCount
+from .pending_image_deletion_model import PendingImageDeletion
@@ -2,7 +2,8 @@ import enum
 from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import datetime
-from sqlalchemy import Integer, String, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Index, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy import Enum as sqlEnum
 from app.models.timestamp import TimestampMixin
 
@@ -14,9 +15,19 @@ class LogLevel(enum.Enum):
     CRITICAL = "critical"
 
 
+# RANGE partitioned by month on created_at (see the partitioned_audit_logs migration and app/db/partitions.py).
+# the primary key in the database is (id, created_at), id alone is still unique (one sequence)
 class AuditLog(Base, TimestampMixin):
     __tablename__ = "audit_logs"
 
+    __table_args__ = (
+        # admin log viewer: logs of a user / of a level, newest first
+        Index("ix_audit_logs_created_by_created_at", "created_by", "created_at"),
+        Index("ix_audit_logs_level_created_at", "level", "created_at"),
+        # payload filters (@> containment and ? key existence)
+        Index("ix_audit_logs_payload", "payload", postgresql_using="gin"),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
     created_by: Mapped[int] = mapped_column(
@@ -47,4 +58,4 @@ class AuditLog(Base, TimestampMixin):
 
     details: Mapped[str] = mapped_column(Text, nullable=True)  # Summary
 
-    payload: Mapped[dict] = mapped_column(JSON, nullable=True)  # Request body
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=True)  # Request body
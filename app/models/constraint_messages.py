@@ -0,0 +1,29 @@
+# readable messages of the database constraints, used by app/core/integrity_error_parser.py.
+# every model module registers its own constraints next to the columns they protect
+
+
+# constraint (or unique index) name -> message. "{value}" is replaced with the value from the error detail
+CONSTRAINT_MESSAGES: dict[str, str] = {}
+
+# column names of the error detail -> message. For constraints whose name is not stable,
+# eg: a unique violation on a partitioned table reports the index of the partition
+CONSTRAINT_MESSAGES_BY_COLUMNS: dict[tuple[str, ...], str] = {}
+
+
+def register_constraint(*names: str, message: str, columns: tuple[str, ...] | None = None):
+    """
+    example: register_constraint("users_email_key", message="The email address '{value}' is already registered.")
+    More than one name is allowed (eg: an old unique constraint and the unique index that replaced it)
+    """
+    for name in names:
+        CONSTRAINT_MESSAGES[name] = message
+    if columns:
+        CONSTRAINT_MESSAGES_BY_COLUMNS[columns] = message
+
+
+def constraint_message(name: str | None, columns: tuple[str, ...] | None = None) -> str | None:
+    if name and name in CONSTRAINT_MESSAGES:
+        return CONSTRAINT_MESSAGES[name]
+    if columns:
+        return CONSTRAINT_MESSAGES_BY_COLUMNS.get(columns)
+    return None
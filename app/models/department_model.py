@@ -1,6 +1,7 @@
 from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy import Integer, String
+from app.models.constraint_messages import register_constraint
 from app.models.timestamp import TimestampMixin
 
 
@@ -22,3 +23,8 @@ class Department(Base, TimestampMixin):
     # many subjects can belong to many department
     subject_offerings: Mapped[list["SubjectOfferings"]] = relationship(  # type: ignore
         "SubjectOfferings", back_populates="department")
+
+
+register_constraint(
+    "departments_department_name_key",
+    message="A department named '{value}' already exists.")
@@ -1,9 +1,10 @@
 from datetime import datetime
 from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import Index, Integer, Float, ForeignKey, UniqueConstraint, Boolean, DateTime
+from sqlalchemy import Index, Integer, Float, ForeignKey, String, UniqueConstraint, Boolean, DateTime, text
 import enum
 from sqlalchemy import Enum as sqlEnum
+from app.models.constraint_messages import register_constraint
 from app.models.timestamp import TimestampMixin
 
 
@@ -18,6 +19,8 @@ class ResultChallengeStatus(enum.Enum):
     NONE = "none"
 
 
+# LIST partitioned by semester_id (see the partitioned_marks migration and app/db/partitions.py).
+# the primary key is (id, semester_id) like in the database, id alone is still unique (one sequence)
 class Mark(Base, TimestampMixin):
     __tablename__ = "marks"
 
@@ -33,10 +36,35 @@ class Mark(Base, TimestampMixin):
             "ix_marks_query_perf",
             "semester_id",
             "result_status"
+        ),
+        # cohort filters (semester + department + session) without joining students.
+        # id is included so counts and the batch publish lookup are index only scans
+        Index(
+            "ix_marks_cohort",
+            "semester_id",
+            "department_id",
+            "session",
+            "result_status",
+            postgresql_include=["id"]
+        ),
+        # partial indexes: only the rows the query can return are indexed, so they stay small
+        # published result of a student for a semester (generate_results)
+        Index(
+            "ix_marks_published_student_semester",
+            "student_id",
+            "semester_id",
+            postgresql_where=text("result_status = 'published'")
+        ),
+        # challenge queue, oldest challenge first (keyset pagination on challenged_at, id)
+        Index(
+            "ix_marks_open_challenges",
+            "challenged_at",
+            "id",
+            postgresql_where=text("result_challenge_status = 'challenged' AND challenged_at IS NOT NULL")
         )
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, index=True)
 
     assignment_mark: Mapped[float | None] = mapped_column(Float, default=None)
 
@@ -109,6 +137,13 @@ class Mark(Base, TimestampMixin):
     student: Mapped["Student"] = relationship(  # type: ignore
         back_populates="marks")
 
+    # copies of the student's department and session, set by a database trigger on insert
+    # and updated when the student changes department or session (see the marks_cohort migration)
+    department_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("departments.id", ondelete="SET NULL"), nullable=True)
+
+    session: Mapped[str | None] = mapped_column(String(50), nullable=True)
+
     # relationship with subject
     subject_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("subjects.id", ondelete="CASCADE"))
@@ -118,7 +153,14 @@ class Mark(Base, TimestampMixin):
 
     # relationship with semester
     semester_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("semesters.id", ondelete="CASCADE"))
+        Integer, ForeignKey("semesters.id", ondelete="CASCADE"), primary_key=True)
 
     semester: Mapped["Semester"] = relationship(  # type: ignore
         back_populates="marks")
+
+
+# marks is partitioned, a violation reports the unique index of the partition, so the columns are registered too
+register_constraint(
+    "unique_mark_record",
+    message="A mark entry already exists for this student in the selected subject and semester.",
+    columns=("student_id", "subject_id", "semester_id"))
@@ -0,0 +1,26 @@
+from datetime import datetime
+from app.db.base import Base
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import DateTime, Integer, String, Text, func
+
+
+# cloudinary images that are no longer used (eg: replaced profile pictures).
+# a row is added in the same transaction as the update, so only committed changes delete an image
+class PendingImageDeletion(Base):
+    __tablename__ = "pending_image_deletions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    public_id: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    # failed deletions are retried with exponential backoff until IMAGE_DELETION_MAX_ATTEMPTS (then dropped)
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0")
+
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now())
@@ -1,6 +1,7 @@
 from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy import Integer, String
+from app.models.constraint_messages import register_constraint
 from app.models.timestamp import TimestampMixin
 
 
@@ -28,3 +29,11 @@ class Semester(Base, TimestampMixin):
     # many marks can belong to one semester
     marks: Mapped[list["Mark"]] = relationship(
         back_populates="semester")  # type: ignore
+
+
+register_constraint(
+    "semesters_semester_name_key",
+    message="Semester name '{value}' already exists.")
+register_constraint(
+    "semesters_semester_number_key",
+    message="Semester number '{value}' is already assigned.")
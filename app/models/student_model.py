@@ -2,6 +2,7 @@ from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy import Date, Integer, String, ForeignKey, DateTime
 from datetime import datetime, date
+from app.models.constraint_messages import register_constraint
 from app.models.timestamp import TimestampMixin
 
 
@@ -66,3 +67,11 @@ class Student(Base, TimestampMixin):
     photo_public_id: Mapped[str] = mapped_column(
         String(300), nullable=False, default=""
     )
+
+
+register_constraint(
+    "ix_students_registration", "students_registration_key",
+    message="Registration number '{value}' already exists in our records.")
+register_constraint(
+    "students_user_id_key",
+    message="This user is already assigned to another student profile.")
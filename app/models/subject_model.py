@@ -1,6 +1,7 @@
 from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy import Integer, String, Float, ForeignKey, Boolean
+from app.models.constraint_messages import register_constraint
 from app.models.timestamp import TimestampMixin
 
 
@@ -37,3 +38,8 @@ class Subject(Base, TimestampMixin):
     # many subject can belong to many departments
     subject_offerings: Mapped[list["SubjectOfferings"]] = relationship(  # type: ignore
         back_populates="subject")
+
+
+register_constraint(
+    "ix_subjects_subject_code", "subjects_subject_code_key",
+    message="A subject with code '{value}' already exists.")
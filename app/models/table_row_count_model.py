@@ -0,0 +1,19 @@
+from app.db.base import Base
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import BigInteger, SmallInteger, String
+
+
+# exact row counts used by the admin dashboard, the count of a counter is the SUM of its shards.
+# maintained by statement level triggers (see the table_row_counts migrations), never written by the app
+class TableRowCount(Base):
+    __tablename__ = "table_row_counts"
+
+    # table name (eg: "marks") or a derived counter (eg: "admins")
+    counter_name: Mapped[str] = mapped_column(String(50), primary_key=True)
+
+    # txid % shards of the writing transaction, concurrent writers do not wait on one row
+    shard: Mapped[int] = mapped_column(
+        SmallInteger, primary_key=True, default=0, server_default="0")
+
+    row_count: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0")
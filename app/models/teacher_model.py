@@ -2,6 +2,7 @@ from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy import Date, Integer, String, ForeignKey
 from datetime import date
+from app.models.constraint_messages import register_constraint
 from app.models.timestamp import TimestampMixin
 
 
@@ -50,3 +51,8 @@ class Teacher(Base, TimestampMixin):
     photo_public_id: Mapped[str] = mapped_column(
         String(300), nullable=False, default=""
     )
+
+
+register_constraint(
+    "teachers_user_id_key",
+    message="This user is already assigned to another teacher profile.")
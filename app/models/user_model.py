@@ -4,6 +4,7 @@ from sqlalchemy import Integer, String, Boolean
 from pydantic import EmailStr
 import enum
 from sqlalchemy import Enum as sqlEnum
+from app.models.constraint_messages import register_constraint
 from app.models.timestamp import TimestampMixin
 
 
@@ -60,3 +61,14 @@ class User(Base, TimestampMixin):
 
     teacher: Mapped["Teacher"] = relationship(  # type: ignore
         back_populates="user", uselist=False)  # for 1-1
+
+
+register_constraint(
+    "users_username_key",
+    message="The username '{value}' is already registered.")
+register_constraint(
+    "users_email_key",
+    message="The email address '{value}' is already registered.")
+register_constraint(
+    "users_mobile_number_key",
+    message="This mobile number is already used for another user.")
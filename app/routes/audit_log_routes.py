@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.error_handling import route_errors
+from app.db.db import AsyncSessionLocal
+from app.db.replicas import get_read_db_session, replica_router
+from app.models.audit_log_model import LogLevel
+from app.permissions import ensure_roles
+from app.schemas.audit_log_schema import AuditLogResponseSchema
+from app.schemas.pagination_schema import PageSchema
+from app.schemas.user_schema import UserOutSchema
+from app.services.audit_log_service import AuditLogService
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+router = APIRouter(
+    prefix="/audit-logs",
+    tags=["audit logs"]  # for swagger
+)
+
+
+# filters of the list and the export
+def audit_log_filters(
+    level: LogLevel | None = None,
+    created_by: int | None = None,
+    path: str | None = None,
+    method: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    payload_contains: str | None = Query(
+        None, description='JSON object the payload must contain, eg: {"exception_type": "KeyError"}'),
+    payload_key: str | None = Query(
+        None, description="key the payload must have, eg: raw_error"),
+):
+    return AuditLogService.build_query(
+        level.value if level else None, created_by, path, method,
+        created_from, created_to, payload_contains, payload_key
+    )
+
+
+# get audit logs: newest first with keyset pagination
+@router.get("/", response_model=PageSchema[AuditLogResponseSchema])
+async def get_audit_logs(
+    request: Request,
+    query=Depends(audit_log_filters),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db_session),
+    authorized_user: UserOutSchema = Depends(
+        ensure_roles(["super_admin", "admin"])),
+):
+    with route_errors(request, "Get audit logs"):
+        return await AuditLogService.get_audit_logs(db, query, cursor, limit, include_total)
+
+
+# export audit logs as NDJSON (oldest first) for incident investigations
+@router.get("/export")
+async def export_audit_logs(
+    query=Depends(audit_log_filters),
+    authorized_user: UserOutSchema = Depends(
+        ensure_roles(["super_admin", "admin"])),
+):
+    async def generate():
+        # own session: the body is streamed after the route function has returned
+        async with (replica_router.pick() or AsyncSessionLocal)() as db:
+            async for line in AuditLogService.stream_audit_logs(db, query):
+                yield line
+
+    filename = f"audit_logs_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from loguru import logger
+from fastapi import APIRouter, Depends, Request, Response
 from app.core.authenticated_user import get_current_user
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.permissions import ensure_roles
 from app.services.department_service import DepartmentService
 from app.schemas.department_schema import DepartmentCreateSchema, DepartmentOutSchema, DepartmentUpdateSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.db import get_db_session
+from app.db.reference_cache import reference_cache
+from app.utils.conditional_request import cache_control_for_role, is_not_modified, make_weak_etag, not_modified_response, set_cache_headers
 from app.schemas.user_schema import UserOutSchema
 
 
@@ -28,40 +29,28 @@ async def create_new_department(
     # attach action
     request.state.action = "CREATE DEPARTMENT"
 
-    try:
+    with route_errors(request, "Create department"):
         return await DepartmentService.create_department(department_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Create department Unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 # get all departments: used in Departments & Semester page to get all departments
 @router.get("/", response_model=list[DepartmentOutSchema])
 async def get_all_departments(
+    request: Request,
+    response: Response,
     current_user: UserOutSchema = Depends(get_current_user),
     db: AsyncSession = Depends(get_db_session),
 ):
 
-    try:
+    with route_errors(request, "Get all departments"):
+        cache_control = cache_control_for_role(current_user.role.value)
+        etag = make_weak_etag("departments", await reference_cache.digest(db, "departments"))
+
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, cache_control)
+
+        set_cache_headers(response, etag, cache_control)
         return await DepartmentService.get_departments(db)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
 
 # get single department
@@ -93,25 +82,8 @@ async def update_single_department(
     # attach action
     request.state.action = "UPDATE DEPARTMENT"
 
-    try:
+    with route_errors(request, "Update department"):
         return await DepartmentService.update_department(id, department_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Update department Unexpected Error:", e)
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(status_code=500, detail=str(e))
 
 
 # delete a department: used in Departments & Semester page to delete department by super admin
@@ -125,23 +97,5 @@ async def delete_single_department(
     # attach action
     request.state.action = "DELETE DEPARTMENT"
 
-    try:
+    with route_errors(request, "Delete department"):
         return await DepartmentService.delete_department(id, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Delete department Unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -1,11 +1,87 @@
-from fastapi import APIRouter
+import asyncio
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.profiler import SamplingProfiler, load_profile, profiling_lock, render_collapsed
+from app.db.db import is_local
+from app.permissions import ensure_roles
+from app.schemas.user_schema import UserOutSchema
 
 router = APIRouter(
     prefix="/server",
     tags=["server status check"]  # for swagger
 )
 
-
 @router.get("/health-check")
 async def check_health():
     return {"status": "online"}
+
+
+# prometheus scrape endpoint
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    # outside of local development the metrics are never public
+    if not settings.METRICS_BEARER_TOKEN and not is_local:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Metrics token is not configured")
+
+    if settings.METRICS_BEARER_TOKEN:
+        expected = f"Bearer {settings.METRICS_BEARER_TOKEN}"
+        if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+    # collectors read event loop state, the merge of the worker files runs in a thread
+    REGISTRY.collect()
+    body = await asyncio.to_thread(REGISTRY.render, settings.METRICS_MULTIPROC_DIR)
+
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# profile this worker for some seconds, returns collapsed stacks (flamegraph.pl, speedscope)
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(settings.PROFILING_INTERVAL_MS, ge=1, le=1000),
+    authorized_user: UserOutSchema = Depends(
+        ensure_roles(["super_admin", "admin"])),
+):
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profile duration can not be more than {settings.PROFILING_MAX_SECONDS} seconds")
+
+    if profiling_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="A profile is already running on this worker")
+
+    async with profiling_lock:
+        profiler = SamplingProfiler(interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            samples = await asyncio.to_thread(profiler.stop)
+
+    return PlainTextResponse(render_collapsed(samples))
+
+
+# profile of a request sent with the "X-Profile: 1" header
+@router.get("/profile/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    profile_id: str,
+    authorized_user: UserOutSchema = Depends(ensure_roles(["super_admin"])),
+):
+    profile = await asyncio.to_thread(load_profile, profile_id)
+
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    return PlainTextResponse(profile)
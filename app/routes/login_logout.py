@@ -1,8 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, Request, status
+from fastapi import APIRouter, Depends, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.services.user_login_logout import login_user, logout_user, refresh_access_token
 from app.db.db import get_db_session
 
@@ -22,27 +21,8 @@ async def login(
     # attach action
     request.state.action = "LOGIN USER"
 
-    try:
+    with route_errors(request, "Login"):
         return await login_user(db, form_data.username, form_data.password, response, request)
-    except DomainIntegrityError as de:
-        logger.error(f"Integrity error while login {str(de)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Unexpected Error: {e}")
-        logger.critical("LOGIN FAILED FROM ROUTER")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 @router.post("/refresh")
@@ -50,26 +30,8 @@ async def refresh_token(
     request: Request,
     response: Response
 ):
-    try:
+    with route_errors(request, "Refresh token"):
         return await refresh_access_token(request, response)
-    except DomainIntegrityError as de:
-        logger.error(f"Integrity error while refresh token {str(de)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Unexpected Error: {e}")
-        logger.critical("LOGIN FAILED FROM ROUTER")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 @router.post("/logout")
@@ -79,25 +41,5 @@ async def logout(
 ):
     # attach action
     request.state.action = "LOGOUT USER"
-    try:
+    with route_errors(request, "Logout"):
         return await logout_user(response)
-    except DomainIntegrityError as de:
-        logger.error(f"Integrity error while login {str(de)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical("Unexpected Error: ", e)
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        logger.critical("LOGIN FAILED FROM ROUTER")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
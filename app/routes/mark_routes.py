@@ -1,13 +1,18 @@
-from loguru import logger
-from app.core.exceptions import DomainIntegrityError
-from app.schemas.marks_schema import BatchResultPublishSchema, GenerateSingleStudentsSingleSemesterResultResponseSchema, MarksCreateSchema, MarksUpdateSchema, SemesterWiseAllSubjectsMarksWithPopulatedDataResponseSchema
+from typing import Literal
+from app.core.error_handling import route_errors
+from app.schemas.marks_schema import BatchResultPublishSchema, ChallengeQueueItemSchema, GenerateSingleStudentsSingleSemesterResultResponseSchema, MarksCreateSchema, MarksUpdateSchema, SemesterWiseAllSubjectsMarksWithPopulatedDataResponseSchema
+from app.schemas.pagination_schema import PageSchema
 from app.schemas.user_schema import UserOutSchema
 from app.services.marks_service import MarksService
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.db import get_db_session
+from app.db.replicas import get_read_db_session
 from app.permissions import ensure_roles
 from app.core.authenticated_user import get_current_user
+from app.core.serialization import fast_json_response
+from app.utils.conditional_request import is_not_modified, not_modified_response, set_cache_headers
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 router = APIRouter(
@@ -27,25 +32,8 @@ async def create_new_mark(
 ):
     # attach action
     request.state.action = "INSERT MARK"
-    try:
+    with route_errors(request, "Create mark"):
         return await MarksService.create_mark(db, mark_data, authorized_user, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Create mark unexpected Error: {e}")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # get result department wise with semester and session
@@ -61,22 +49,13 @@ async def get_all_filtered_marks(
     result_status: str | None = None,
     authorized_user: UserOutSchema = Depends(
         ensure_roles(["super_admin", "admin", "teacher"])),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ):
-    try:
-        return await MarksService.get_all_marks_with_filters(db, authorized_user, semester_id, department_id, session, result_status)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Get all marks unexpected Error: {e}")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    with route_errors(request, "Get all marks"):
+        marks = await MarksService.get_all_marks_with_filters(db, authorized_user, semester_id, department_id, session, result_status)
+
+        # large mark lists: validate once and dump to bytes, skipping the response_model round trip
+        return fast_json_response(list[SemesterWiseAllSubjectsMarksWithPopulatedDataResponseSchema], marks)
 
 
 # get all results with semester+department+session after publishing all the marks
@@ -91,23 +70,23 @@ async def generate_single_students_single_semester_result(
     department_id: int,
     authorized_user: UserOutSchema = Depends(ensure_roles(
         ["super_admin", "student", "admin", "teacher"])),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ):
-    try:
-        return await MarksService.generate_results(db, registration, semester_id, department_id, request)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Generate results unexpected Error: {e}")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
-        )
+    with route_errors(request, "Generate results"):
+        # results can change at any time (publish, challenge), so every role revalidates
+        cache_control = "private, no-cache"
+        etag = await MarksService.get_results_etag(db, registration, semester_id, department_id)
+
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, cache_control)
+
+        result = await MarksService.generate_results(db, registration, semester_id, department_id, request)
+
+        # a returned Response skips the injected response, so the cache headers go on it directly
+        fast_response = fast_json_response(
+            GenerateSingleStudentsSingleSemesterResultResponseSchema, result)
+        set_cache_headers(fast_response, etag, cache_control)
+        return fast_response
 
 
 # batch publish marks
@@ -119,26 +98,25 @@ async def batch_publish_marks(
         ensure_roles(["super_admin", "admin"])),
     db: AsyncSession = Depends(get_db_session),
 ):
-    try:
+    with route_errors(request, "Batch publish marks"):
         return await MarksService.batch_publish_marks(db, batch_publish_data, request)
-    except HTTPException:
-        raise
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except Exception as e:
-        logger.critical(f"Batch publish marks unexpected Error: {e}")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
-        )
+
+
+# challenge queue: open result challenges, oldest first
+@router.get("/challenges", response_model=PageSchema[ChallengeQueueItemSchema])
+async def get_challenge_queue(
+    request: Request,
+    payment_status: Literal["pending", "paid"] | None = None,
+    department_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    authorized_user: UserOutSchema = Depends(
+        ensure_roles(["super_admin", "admin", "teacher"])),
+    db: AsyncSession = Depends(get_db_session),
+):
+    with route_errors(request, "Get challenge queue"):
+        return await MarksService.get_challenge_queue(db, authorized_user, payment_status, department_id, cursor, limit, include_total)
 
 
 # update marks
@@ -153,25 +131,8 @@ async def update_a_mark(
 ):
     # attach action
     request.state.action = "UPDATE MARK"
-    try:
+    with route_errors(request, "Update mark"):
         return await MarksService.update_mark(db, mark_data, mark_id, authorized_user, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Update mark unexpected Error: {e}")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # delete mark
@@ -185,27 +146,8 @@ async def delete_a_mark(
     # attach action
     request.state.action = "DELETE MARK"
 
-    try:
+    with route_errors(request, "Delete mark"):
         return await MarksService.delete_mark(db, mark_id, request)
-    except HTTPException:
-        raise
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except Exception as e:
-        logger.critical(f"Mark delete unexpected error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # get all subjects marks for a student
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from loguru import logger
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.permissions import ensure_roles
 from app.services.semester_service import SemesterService
 from app.db.db import get_db_session
+from app.db.reference_cache import reference_cache
+from app.utils.conditional_request import cache_control_for_role, is_not_modified, make_weak_etag, not_modified_response, set_cache_headers
 from app.schemas.semester_schema import SemesterCreateSchema, SemesterOutSchema, SemesterUpdateSchema
 from app.schemas.user_schema import UserOutSchema
 
@@ -27,37 +28,27 @@ async def add__new_semester(
     # attach action
     request.state.action = "CREATE SEMESTER"
 
-    try:
+    with route_errors(request, "Create semester"):
         return await SemesterService.create_semester(semester_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Semester creation unexpected error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 # get all semester: used in Departments & Semester page to get all semester
 @router.get("/", response_model=list[SemesterOutSchema])
-async def get_all_semesters(db: AsyncSession = Depends(get_db_session)):
-    try:
+async def get_all_semesters(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_session)
+):
+    with route_errors(request, "Get all semesters"):
+        # public endpoint, no role
+        cache_control = cache_control_for_role(None)
+        etag = make_weak_etag("semesters", await reference_cache.digest(db, "semesters"))
+
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, cache_control)
+
+        set_cache_headers(response, etag, cache_control)
         return await SemesterService.get_semesters(db)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
 
 # get single semester
@@ -84,24 +75,8 @@ async def update_single_semester(
     # attach action
     request.state.action = "UPDATE SEMESTER"
 
-    try:
+    with route_errors(request, "Update semester"):
         return await SemesterService.update_semester(id, semester_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Semester update unexpected error: {e}")
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 # delete a semester: used in Departments & Semester page to delete semester by super admin
@@ -115,15 +90,5 @@ async def delete_single_semester(
     # attach action
     request.state.action = "DELETE SEMESTER"
 
-    try:
+    with route_errors(request, "Delete semester"):
         return await SemesterService.delete_semester(id, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Semester delete unexpected error: {e}")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -1,7 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from loguru import logger
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.services.student_service import StudentService
 from app.db.db import get_db_session
 from app.permissions import ensure_roles
@@ -26,28 +25,8 @@ async def create_student_record(
     # attach action
     request.state.action = "CREATE STUDENT"
 
-    try:
+    with route_errors(request, "Create student"):
         return await StudentService.create_student(student_data, db, request)
-    except DomainIntegrityError as de:
-        # DB Log
-        logger.error(f"Student created failed FROM ROUTER: {de}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Create student Unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 # get all students with minimal data for marks entry
@@ -62,28 +41,8 @@ async def get_all_students_with_minimal_data(
     db: AsyncSession = Depends(get_db_session)
 
 ):
-    try:
+    with route_errors(request, "Get all students with minimal data"):
         return await StudentService.get_all_student_with_minimal_data(db, search, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(
-            "get all student with minimal data unexpected Error: ", e)
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 # get all students
 # @router.get(
@@ -108,6 +67,7 @@ async def get_all_students_with_minimal_data(
 # get single student(profile page data)
 @router.get("/{user_id}", response_model=StudentProfileResponseSchemaNested)
 async def get_single_student(
+    request: Request,
     user_id: int,
     db: AsyncSession = Depends(get_db_session),
     authorized_user: UserOutSchema = Depends(
@@ -116,14 +76,8 @@ async def get_single_student(
     if authorized_user.id != user_id:
         raise HTTPException(
             status_code=400, detail="You are not authorized to view this record.")
-    try:
+    with route_errors(request, "Get single student"):
         return await StudentService.get_student(db, user_id)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected Error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # update a student (self)
@@ -178,26 +132,8 @@ async def update_single_student_by_admin(
     # attach action
     request.state.action = "UPDATE STUDENT BY ADMIN"
 
-    try:
+    with route_errors(request, "Update student by admin"):
         return await StudentService.update_student_by_admin(id, student_data, db, request)
-    except DomainIntegrityError as de:
-        # DB Log
-        logger.error(f"Student update failed FROM ROUTER: {de}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected Error: {e}")
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 # delete a student
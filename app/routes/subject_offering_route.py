@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from loguru import logger
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.db.db import get_db_session
 from app.permissions import ensure_roles
 from app.schemas.subject_offering_schema import AllSubjectOfferingsResponseSchema, SubjectOfferingCreateSchema, SubjectOfferingUpdateSchema, SubjectOfferingListForMarkingResponseSchema
 from app.schemas.user_schema import UserOutSchema
+from app.schemas.pagination_schema import PageSchema
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.services.subject_offering_service import SubjectOfferingService
 
 
@@ -26,61 +27,26 @@ async def create_new_subject_offering(
 ):
     # attach action
     request.state.action = "CREATE SUBJECT OFFERING"
-    try:
+    with route_errors(request, "Create subject offering"):
         return await SubjectOfferingService.create_subject_offering(sub_off_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Create subject offering unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # get all subject offerings: used in Assign Course page to update existing subject offering by admin, super admin
-@router.get("/", response_model=list[AllSubjectOfferingsResponseSchema])
+@router.get("/", response_model=PageSchema[AllSubjectOfferingsResponseSchema])
 async def get_all_subject_offerings(
     request: Request,
     order_by_filter: str | None = None,
     filter_by_department: int | None = None,
     search: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
     authorized_user: UserOutSchema = Depends(
         ensure_roles(["super_admin", "admin"])),
     db: AsyncSession = Depends(get_db_session)
 ):
-    try:
-        return await SubjectOfferingService.get_subject_offerings(db, order_by_filter, filter_by_department, search)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Get subject offering unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+    with route_errors(request, "Get subject offerings"):
+        return await SubjectOfferingService.get_subject_offerings(db, order_by_filter, filter_by_department, search, cursor, limit, include_total)
 
 
 # get offered subjects list for marking (Admin=All subjects, Teacher=subjects they teach)
@@ -88,6 +54,7 @@ async def get_all_subject_offerings(
             response_model=list[SubjectOfferingListForMarkingResponseSchema]
             )
 async def get_offered_subject_lists_for_marking(
+    request: Request,
     students_current_semester_id: int,
     students_department_id: int,
     current_teacher_id: int | None = None,
@@ -96,13 +63,8 @@ async def get_offered_subject_lists_for_marking(
     db: AsyncSession = Depends(get_db_session),
 ):
 
-    try:
+    with route_errors(request, "Get offered subjects for marking"):
         return await SubjectOfferingService.get_offered_subjects_for_marking(db, students_current_semester_id, students_department_id, authorized_user, current_teacher_id)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # @router.get("/{subject_offering_id}")
@@ -132,27 +94,8 @@ async def update_a_subject_offering(
 ):
     # attach action
     request.state.action = "UPDATE SUBJECT OFFERING "
-    try:
+    with route_errors(request, "Update subject offering"):
         return await SubjectOfferingService.update_subject_offering(subject_offering_id, update_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Update subject offering unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 @router.delete("/{subject_offering_id}")
@@ -164,23 +107,5 @@ async def delete_a_subject_offering(
 ):
     # attach action
     request.state.action = "DELETE SUBJECT OFFERING"
-    try:
+    with route_errors(request, "Delete subject offering"):
         return await SubjectOfferingService.delete_subject_offering(db, subject_offering_id, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Delete subject offering unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
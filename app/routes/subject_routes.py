@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from loguru import logger
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.authenticated_user import get_current_user
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.permissions import ensure_roles
 from app.services.subject_service import SubjectService
 from app.db.db import get_db_session
+from app.db.reference_cache import reference_cache
+from app.utils.conditional_request import cache_control_for_role, is_not_modified, make_weak_etag, not_modified_response, set_cache_headers
 from app.schemas.subject_schema import SubjectCreateSchema, SubjectUpdateSchema, SubjectWithSemesterResponseSchema
 from app.schemas.user_schema import UserOutSchema
+from app.schemas.pagination_schema import PageSchema
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 router = APIRouter(
@@ -28,48 +31,41 @@ async def create_new_subject(
     # attach action
     request.state.action = "CREATE SUBJECT"
 
-    try:
+    with route_errors(request, "Create subject"):
         return await SubjectService.create_subject(subject_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Create subject Unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 # get all subjects
-@router.get("/", response_model=list[SubjectWithSemesterResponseSchema])
+@router.get("/", response_model=PageSchema[SubjectWithSemesterResponseSchema])
 async def get_all_subjects(
+        request: Request,
+        response: Response,
         current_user: UserOutSchema = Depends(get_current_user),
         db: AsyncSession = Depends(get_db_session),
         subject_credits: float | None = None,
         semester_id: int | None = None,
         search: str | None = None,
-        order_by_filter: str | None = None
+        order_by_filter: str | None = None,
+        cursor: str | None = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        include_total: bool = False
 ):
 
-    try:
-        return await SubjectService.get_subjects(db, subject_credits, semester_id, search, order_by_filter)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Get all subject Unexpected Error: {e}")
+    with route_errors(request, "Get all subjects"):
+        # subjects are listed with their semester, both tables are in the reference data cache
+        cache_control = cache_control_for_role(current_user.role.value)
+        etag = make_weak_etag(
+            "subjects",
+            await reference_cache.digest(db, "subjects"),
+            await reference_cache.digest(db, "semesters"),
+            request.url.query
+        )
+
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, cache_control)
 
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+        set_cache_headers(response, etag, cache_control)
+        return await SubjectService.get_subjects(db, subject_credits, semester_id, search, order_by_filter, cursor, limit, include_total)
 
 
 # get single subject
@@ -120,24 +116,8 @@ async def update_subject_by_admin(
     # attach action
     request.state.action = "UPDATE SUBJECT BY ADMIN"
 
-    try:
+    with route_errors(request, "Update subject"):
         return await SubjectService.update_subject_by_admin(id, subject_update_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 # delete subject
@@ -151,21 +131,5 @@ async def delete_single_subject(
     # attach action
     request.state.action = "DELETE SUBJECT"
 
-    try:
+    with route_errors(request, "Delete subject"):
         return await SubjectService.delete_subject(id, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
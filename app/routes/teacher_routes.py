@@ -1,8 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from loguru import logger
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.authenticated_user import get_current_user
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.permissions import ensure_roles
 from app.db.db import get_db_session
 from app.schemas.teacher_schema import TeacherCreateSchema, TeacherResponseSchemaForSubjectOfferingSearch, TeacherUpdateByAdminSchema
@@ -24,27 +23,8 @@ async def create_teacher_record(
     # attach action
     request.state.action = "CREATE TEACHER"
 
-    try:
+    with route_errors(request, "Create teacher"):
         return await TeacherService.create_teacher(teacher_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical("Create teacher unexpected Error: ", e)
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
 #  get all teachers
@@ -72,28 +52,8 @@ async def get_all_teachers_with_minimal_data(
     db: AsyncSession = Depends(get_db_session)
 
 ):
-    try:
+    with route_errors(request, "Get all teachers with minimal data"):
         return await TeacherService.get_all_teachers_with_minimal_data(db, search, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(
-            "Get all teacher with minimal data unexpected Error: ", e)
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 # @router.get("/all_faculty", response_model=list[TeachersDepartmentWiseGroupResponse])
 # async def get_all_faculty(
@@ -176,28 +136,8 @@ async def update_teacher_by_admin(
     # attach action
     request.state.action = "UPDATE TEACHER BY ADMIN"
 
-    try:
+    with route_errors(request, "Update teacher by admin"):
         return await TeacherService.update_teacher_by_admin(id, teacher_update_data, db, request)
-    except DomainIntegrityError as de:
-        logger.error(f"Teacher update failed FROM ROUTER(by admin): {de}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"Update teacher by admin Unexpected Error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # delete teacher
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import get_current_user
-from app.core.exceptions import DomainIntegrityError
+from app.core.error_handling import route_errors
 from app.permissions import ensure_roles
 from app.services.user_service import UserService
 from app.db.db import get_db_session
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.schemas.pagination_schema import PageSchema
 from app.schemas.user_schema import AllUsersWithDetailsResponseSchema, UserCreateSchema, UserOutSchema, UserPasswordUpdateSchema, UserUpdateSchemaByAdmin
 
 
@@ -27,25 +29,8 @@ async def create_admin(
     # attach action
     request.state.action = "CREATE USER BY ADMIN"
 
-    try:
+    with route_errors(request, "Create user"):
         return await UserService.create_user(user_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"User creation unexpected error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 # get logged in user: used to fetch users details after login from AuthProvider
@@ -57,40 +42,36 @@ async def get_logged_in_user(
 
 
 # get all user: used in AllUser page. Show all users with populated data
-@router.get("/", response_model=list[AllUsersWithDetailsResponseSchema])
+@router.get("/", response_model=PageSchema[AllUsersWithDetailsResponseSchema])
 async def get_all_users(
+    request: Request,
     user_role: str | None = None,
     department_search: str | None = None,
     order_by_filter: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db_session),
     authorized_user: UserOutSchema = Depends(
         ensure_roles(["super_admin", "admin"]))
 ):
-    try:
-        users = await UserService.get_users(db, user_role, department_search, order_by_filter)
+    with route_errors(request, "Get all users"):
+        users = await UserService.get_users(db, user_role, department_search, order_by_filter, cursor, limit, include_total)
         return users
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
 
 # get single user details: used in SingleUserDetails page(admin panel). Show specific users all info(user table + teacher/student table data)
 @router.get("/{id}", response_model=AllUsersWithDetailsResponseSchema)
 async def get_single_user(
+    request: Request,
     id: int,
     authorized_user: UserOutSchema = Depends(
         ensure_roles(["super_admin", "admin"])),
     db: AsyncSession = Depends(get_db_session)
 ):
 
-    try:
+    with route_errors(request, "Get single user"):
         return await UserService.get_user(db, id)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # update single user by admin: used in singleUserDetails page to update user tables data by admin
@@ -106,25 +87,8 @@ async def update_single_user_by_admin(
     # attach action
     request.state.action = "UPDATE USER BY ADMIN"
 
-    try:
+    with route_errors(request, "Update user by admin"):
         return await UserService.update_user_by_admin(id, user_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"User update by admin unexpected error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 # TODO: create profile page to update the default password
@@ -144,25 +108,8 @@ async def update_single_user_by_self(
         raise HTTPException(
             status_code=400, detail="You are not authorized to update this record.")
 
-    try:
+    with route_errors(request, "Update password"):
         return await UserService.update_user_self(id, password_update_data, db, request)
-    except DomainIntegrityError as de:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=de.error_message
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.critical(f"User password update(self) unexpected error: {e}")
-
-        # attach audit payload
-        if request:
-            request.state.audit_payload = {
-                "raw_error": str(e),
-                "exception_type": type(e).__name__,
-            }
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 # delete single user: user in
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Any
+from pydantic import BaseModel, ConfigDict
+from app.models.audit_log_model import LogLevel
+
+
+# used in get_audit_logs and export_audit_logs router functions
+class AuditLogResponseSchema(BaseModel):
+    id: int
+    created_by: int | None = None
+    level: LogLevel
+    action: str
+    method: str
+    path: str
+    ip_address: str | None = None
+    details: str | None = None
+    payload: Any = None
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
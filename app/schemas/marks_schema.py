@@ -147,3 +147,27 @@ class BatchResultPublishSchema(BaseModel):
     semester_id: int
     department_id: int
     session: str
+
+
+# used in get_challenge_queue router function
+class ChallengeQueueStudentSchema(BaseModel):
+    id: int
+    name: str
+    registration: str
+    model_config = ConfigDict(from_attributes=True)
+
+
+# used in get_challenge_queue router function
+class ChallengeQueueItemSchema(BaseModel):
+    id: int
+    total_mark: float | None = None
+    GPA: float | None = None
+    semester_id: int
+    department_id: int | None = None
+    session: str | None = None
+    result_challenge_payment_status: bool | None = None
+    challenged_at: datetime
+    challenge_payment_time: datetime | None = None
+    student: ChallengeQueueStudentSchema
+    subject: MinimalSubjectResponseSchema
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,15 @@
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+# used in every paginated list router function. eg: PageSchema[AllUsersWithDetailsResponseSchema]
+class PageSchema(BaseModel, Generic[T]):
+    items: list[T]
+    # pass this value as ?cursor= to get the next page. None means this is the last page
+    next_cursor: str | None = None
+    limit: int
+    # planner estimate, only filled when include_total=true
+    total_estimate: int | None = None
@@ -45,6 +45,20 @@ class SubjectWithSemesterResponseSchema(SubjectBaseSchema):
     model_config = ConfigDict(from_attributes=True)
 
 
+# used by the reference data cache (app/db/reference_cache.py) to keep a plain copy of each subject
+class SubjectReferenceSchema(BaseModel):
+    id: int
+    subject_title: str
+    subject_code: str
+    credits: float
+    is_general: bool
+    semester_id: int | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # used in update_subject_by_admin router function
 _Partial_Subject = create_partial_model(SubjectBaseSchema)
 
@@ -1,16 +1,53 @@
-from typing import Any
-from loguru import logger
-from sqlalchemy import func, or_, select
+import time
+from sqlalchemy import column, func, select, table
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
-from app.models import User
-from app.models import Department, Mark, Semester, Student, Subject, SubjectOfferings, Teacher
-from sqlalchemy.exc import IntegrityError
+from app.core.error_handling import integrity_errors
+from app.core import settings
+from app.models import TableRowCount
 from fastapi import Request
 
 
+# dashboard label -> counter name in table_row_counts (the table name for everything except admins)
+DASHBOARD_COUNTERS = {
+    "users": "users",
+    "admins": "admins",
+    "teachers": "teachers",
+    "students": "students",
+    "departments": "departments",
+    "semesters": "semesters",
+    "subjects": "subjects",
+    "assigned courses": "subject_offerings",
+    "marks": "marks",
+}
+
+# minimal definitions of the postgres catalogs used by the estimate mode
+pg_class = table(
+    "pg_class",
+    column("oid"),
+    column("relname"),
+    column("reltuples"),
+    column("relkind"),
+    column("relnamespace"),
+    schema="pg_catalog",
+)
+pg_namespace = table(
+    "pg_namespace",
+    column("oid"),
+    column("nspname"),
+    schema="pg_catalog",
+)
+pg_inherits = table(
+    "pg_inherits",
+    column("inhrelid"),
+    column("inhparent"),
+    schema="pg_catalog",
+)
+
+
 class AdminDashboardService:
+    # counts are shared by every admin, cached per worker for DASHBOARD_COUNTS_CACHE_TTL_SECONDS
+    _cached_counts: dict[str, int] | None = None
+    _cached_at: float = 0.0
 
     @staticmethod
     async def get_all_table_data_count(
@@ -18,49 +55,59 @@ class AdminDashboardService:
         request: Request | None = None
     ):
 
-        try:
-            # 1. Build a single query that wraps multiple subqueries
-            query = select(
-                select(func.count(User.id)).scalar_subquery().label("users"),
-                select(func.count(User.id)).where(User.role.in_(
-                    ["admin", "super_admin"])).scalar_subquery().label("admins"),
-                select(func.count(Teacher.id)
-                       ).scalar_subquery().label("teachers"),
-                select(func.count(Student.id)
-                       ).scalar_subquery().label("students"),
-                select(func.count(Department.id)
-                       ).scalar_subquery().label("departments"),
-                select(func.count(Semester.id)
-                       ).scalar_subquery().label("semesters"),
-                select(func.count(Subject.id)
-                       ).scalar_subquery().label("subjects"),
-                select(func.count(SubjectOfferings.id)
-                       ).scalar_subquery().label("assigned_courses"),
-                select(func.count(Mark.id)).scalar_subquery().label("marks")
-            )
+        async with integrity_errors(db, request, "getting all table count"):
+            now = time.monotonic()
+            cached = AdminDashboardService._cached_counts
 
-            # 2. Execute the query
-            result = await db.execute(query)
-
-            # 3. Fetch the first row
-            row = result.fetchone()
-
-            # 4. Critical Check: If row is None, return zeros instead of crashing
-            if row is None:
-                return {k: 0 for k in ["users", "admins", "teachers", "students", "departments", "semesters", "subjects", "assigned courses", "marks"]}
-
-            # 5. Return the mapped data
-            return {
-                "users": row.users,
-                "admins": row.admins,
-                "teachers": row.teachers,
-                "students": row.students,
-                "departments": row.departments,
-                "semesters": row.semesters,
-                "subjects": row.subjects,
-                "assigned courses": row.assigned_courses,
-                "marks": row.marks
-            }
+            if cached is not None and now - AdminDashboardService._cached_at < settings.DASHBOARD_COUNTS_CACHE_TTL_SECONDS:
+                return cached
+
+            # 1. Read the trigger maintained counters (one small table, no scan of the counted tables), summing the shards
+            result = await db.execute(
+                select(TableRowCount.counter_name, func.sum(TableRowCount.row_count).label("row_count"))
+                .group_by(TableRowCount.counter_name)
+            )
+            counts = {row.counter_name: int(row.row_count) for row in result}
+
+            # 2. Fast mode: planner statistics, updated by (auto)vacuum and analyze.
+            # admins is not a table so it always comes from the counters
+            if settings.DASHBOARD_COUNTS_MODE == "estimate":
+                result = await db.execute(
+                    select(pg_class.c.relname, pg_class.c.reltuples).where(
+                        pg_class.c.relname.in_(
+                            [counter for counter in DASHBOARD_COUNTERS.values() if counter != "admins"]),
+                        pg_class.c.relkind.in_(["r", "p"]),
+                        pg_class.c.relnamespace == select(pg_namespace.c.oid).where(
+                            pg_namespace.c.nspname == "public").scalar_subquery()
+                    )
+                )
+                for row in result:
+                    # reltuples is -1 for a table that was never analyzed, keep the exact counter then
+                    if row.reltuples >= 0:
+                        counts[row.relname] = int(row.reltuples)
+
+                # partitioned tables (marks): autovacuum never analyzes the parent, add up the partitions
+                parent = pg_class.alias("parent")
+                child = pg_class.alias("child")
+                result = await db.execute(
+                    select(parent.c.relname, func.sum(func.greatest(child.c.reltuples, 0)).label("reltuples"))
+                    .select_from(pg_inherits)
+                    .join(parent, parent.c.oid == pg_inherits.c.inhparent)
+                    .join(child, child.c.oid == pg_inherits.c.inhrelid)
+                    .where(parent.c.relname.in_(list(counts)), parent.c.relkind == "p")
+                    .group_by(parent.c.relname)
+                )
+                for row in result:
+                    counts[row.relname] = int(row.reltuples)
+
+            # 3. Missing counters (eg: migration not applied yet) are shown as 0
+            data = {label: counts.get(counter, 0)
+                    for label, counter in DASHBOARD_COUNTERS.items()}
+
+            AdminDashboardService._cached_counts = data
+            AdminDashboardService._cached_at = now
+
+            return data
 
         # helper function to get count of any model/table
         # async def get_count(model):
@@ -96,29 +143,6 @@ class AdminDashboardService:
 
         # return counts
 
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while getting all table count: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
 
 # @staticmethod
@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+from typing import AsyncIterator
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import AuditLog
+from app.schemas.audit_log_schema import AuditLogResponseSchema
+from app.utils.pagination import paginate
+
+
+class AuditLogService:
+
+    @staticmethod  # filters shared by the list and the export
+    def build_query(
+        level: str | None = None,
+        created_by: int | None = None,
+        path: str | None = None,
+        method: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        payload_contains: str | None = None,
+        payload_key: str | None = None,
+    ) -> Select:
+        filters = []
+        if level:
+            filters.append(AuditLog.level == level)
+        if created_by is not None:
+            filters.append(AuditLog.created_by == created_by)
+        if path:
+            # prefix match, eg: /api/marks matches /api/marks/12
+            filters.append(AuditLog.path.startswith(path, autoescape=True))
+        if method:
+            filters.append(AuditLog.method == method.upper())
+        # a time range also prunes the monthly partitions
+        if created_from:
+            filters.append(AuditLog.created_at >= created_from)
+        if created_to:
+            filters.append(AuditLog.created_at < created_to)
+
+        # payload filters use the GIN index: payload @> '{"readable_error": "..."}' and payload ? 'raw_error'
+        if payload_contains:
+            try:
+                contains = json.loads(payload_contains)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="payload_contains must be a JSON object")
+            if not isinstance(contains, dict):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="payload_contains must be a JSON object")
+            filters.append(AuditLog.payload.contains(contains))
+        if payload_key:
+            filters.append(AuditLog.payload.has_key(payload_key))
+
+        query = select(AuditLog)
+        if filters:
+            query = query.where(and_(*filters))
+        return query
+
+    @staticmethod  # newest first, keyset pagination on (created_at, id)
+    async def get_audit_logs(
+        db: AsyncSession,
+        query: Select,
+        cursor: str | None = None,
+        limit: int | None = None,
+        include_total: bool = False
+    ):
+        return await paginate(
+            db,
+            query,
+            key_columns=[AuditLog.created_at, AuditLog.id],
+            cursor=cursor,
+            limit=limit,
+            descending=True,
+            include_total=include_total,
+            key_parsers=[datetime.fromisoformat, int]
+        )
+
+    @staticmethod  # one JSON document per line, rows are fetched with a server side cursor
+    async def stream_audit_logs(db: AsyncSession, query: Select) -> AsyncIterator[bytes]:
+        query = query.order_by(AuditLog.created_at, AuditLog.id).execution_options(yield_per=1000)
+
+        result = await db.stream_scalars(query)
+        async for log in result:
+            yield AuditLogResponseSchema.model_validate(log).model_dump_json().encode("utf-8") + b"\n"
@@ -1,13 +1,11 @@
-from typing import Any
 from fastapi import HTTPException, Request, status
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from app.core.error_handling import integrity_errors
+from app.db.reference_cache import reference_cache
 from app.models import Department
 from app.schemas.department_schema import DepartmentCreateSchema, DepartmentUpdateSchema
-from sqlalchemy.exc import IntegrityError
 
 
 class DepartmentService:
@@ -30,54 +28,24 @@ class DepartmentService:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Department already exist")
 
-        try:
+        async with integrity_errors(db, request, "creating department", department_data, exclude_unset=True):
             new_department = Department(
                 department_name=lowercase_department_name)
 
             db.add(new_department)  # add the new_department to db(session)
+            await reference_cache.publish_change(db, "departments")
             await db.commit()
+            reference_cache.invalidate("departments")
             await db.refresh(new_department)
 
             logger.success("New department created successfully")
             return {
                 "message": f"New Department created successfully. ID: {new_department.id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
 
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while creating department: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if department_data:
-                    payload["data"] = department_data.model_dump(
-                        mode="json",
-                        exclude_unset=True
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
-
-    @staticmethod  # get all departments
+    @staticmethod  # get all departments (served from the reference data cache, ordered by name)
     async def get_departments(db: AsyncSession):
-        statement = select(Department).order_by(Department.department_name)
-        result = await db.execute(statement)
-
-        return result.scalars().all()
+        return await reference_cache.get_all(db, "departments")
 
     # @staticmethod # get single department
     # async def get_department(db: AsyncSession, department_id: int):
@@ -101,47 +69,20 @@ class DepartmentService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Department not found")
 
-        try:
+        async with integrity_errors(db, request, "updating department", department_data, exclude_unset=True):
             lowercase_department_name = department_data.department_name.lower().strip()
 
             department.department_name = lowercase_department_name
 
+            await reference_cache.publish_change(db, "departments")
             await db.commit()
+            reference_cache.invalidate("departments")
             await db.refresh(department)
 
             logger.success("Department updated successfully")
             return {
                 "message": f"{department.department_name} department updated successfully. ID: {department.id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while updating department: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if department_data:
-                    payload["data"] = department_data.model_dump(
-                        mode="json",
-                        exclude_unset=True
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod  # delete department by super admin
     async def delete_department(
@@ -158,33 +99,12 @@ class DepartmentService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Department not found")
 
-        try:
+        async with integrity_errors(db, request, "deleting department"):
             await db.delete(department)
+            await reference_cache.publish_change(db, "departments")
             await db.commit()
+            reference_cache.invalidate("departments")
 
             logger.success("Department deleted successfully")
 
             return {"message": f"{department.department_name} department deleted successfully"}
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while deleting department: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
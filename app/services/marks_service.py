@@ -1,9 +1,8 @@
 from collections import defaultdict
-from typing import Annotated, Any
+from typing import Annotated
 from loguru import logger
 from sqlalchemy import and_, func, join, select, update
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from app.core.error_handling import integrity_errors
 from app.models import Mark, ResultStatus
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, Query, Request, status
@@ -16,10 +15,12 @@ from app.models.teacher_model import Teacher
 from app.models.user_model import User
 from app.schemas.marks_schema import BatchResultPublishSchema, MarksCreateSchema, MarksUpdateSchema
 from app.schemas.user_schema import UserOutSchema
-from app.utils import check_existence
+from app.db.reference_cache import reference_cache
+from app.utils import check_existence_many
+from app.utils.conditional_request import make_weak_etag
+from app.utils.pagination import paginate
 from sqlalchemy.orm import joinedload
 from datetime import datetime
-from sqlalchemy.exc import IntegrityError
 import base64
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
@@ -98,14 +99,12 @@ class MarksService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Mark for this subject+student+semester already exists.")
 
-        # check if the student exists, throws error if not
-        await check_existence(Student, db, mark_data.student_id, "Student")
-
-        # check if the subject exists, throws error if not
-        await check_existence(Subject, db, mark_data.subject_id, "Subject")
-
-        # check if the semester exists, throws error if not
-        await check_existence(Semester, db, mark_data.semester_id, "Semester")
+        # check if the student, subject and semester exist in one go, throws error if not
+        await check_existence_many(db, [
+            (Student, mark_data.student_id, "Student"),
+            (Subject, mark_data.subject_id, "Subject"),
+            (Semester, mark_data.semester_id, "Semester"),
+        ])
 
         # check if the person is a teacher and their subject is the same as the subject of the mark
         if current_user.role.value == "teacher":
@@ -130,41 +129,12 @@ class MarksService:
         # pass this new_mark object to the compute_total_marks_and_gpa function to get the total marks and gpa. It'll update the new_mark object
         MarksService.compute_total_marks_and_gpa(new_mark)
 
-        try:
+        async with integrity_errors(db, request, "inserting mark", mark_data):
             db.add(new_mark)
             await db.commit()
             await db.refresh(new_mark)
 
             return {"message": f"Mark inserted successfully. Total Mark: {new_mark.total_mark} GPA: {new_mark.GPA}"}
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while inserting mark: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if mark_data:
-                    mark_data.model_dump(
-                        mode="json"
-                    )
-                    payload["data"] = mark_data
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod  # group marks by semester
     def group_marks_by_category(marks):
@@ -208,8 +178,8 @@ class MarksService:
         session: str | None = None,
         result_status: str | None = None
     ):
-        # Base query with joins (Mark, Student, Subject table)
-        statement = select(Mark).join(Student).join(Subject)
+        # department and session are copied onto marks, the filters do not need to join students
+        statement = select(Mark)
 
         # options with joinedloads to reduce the number of queries/Database Hits
         statement = statement.options(
@@ -235,7 +205,7 @@ class MarksService:
                 SubjectOfferings,
                 and_(
                     SubjectOfferings.subject_id == Mark.subject_id,
-                    SubjectOfferings.department_id == Student.department_id,
+                    SubjectOfferings.department_id == Mark.department_id,
                 )
             ).where(SubjectOfferings.taught_by_id == teacher_id)
 
@@ -244,9 +214,9 @@ class MarksService:
         if target_semester_id:
             filters.append(Mark.semester_id == target_semester_id)
         if target_department_id:
-            filters.append(Student.department_id == target_department_id)
+            filters.append(Mark.department_id == target_department_id)
         if session:
-            filters.append(Student.session == session)
+            filters.append(Mark.session == session)
         if result_status:
             filters.append(Mark.result_status == result_status)
         if filters:
@@ -257,6 +227,65 @@ class MarksService:
 
         return MarksService.group_marks_by_category(marks)
 
+    @staticmethod  # open result challenges, oldest first. Uses the ix_marks_open_challenges partial index
+    async def get_challenge_queue(
+        db: AsyncSession,
+        current_user: UserOutSchema,
+        payment_status: str | None = None,
+        department_id: int | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+        include_total: bool = False
+    ):
+        # challenged_at is the pagination key, a row without it could not be paged through
+        query = select(Mark).where(
+            Mark.result_challenge_status == ResultChallengeStatus.CHALLENGED,
+            Mark.challenged_at.is_not(None)
+        ).options(
+            joinedload(Mark.student).load_only(
+                Student.name, Student.registration),
+            joinedload(Mark.subject).load_only(
+                Subject.subject_title, Subject.subject_code, Subject.credits)
+        )
+
+        # teachers only see the challenges of the subjects they teach
+        if current_user.role.value == "teacher":
+            teacher_id = await db.scalar(select(Teacher.id).where(Teacher.user_id == current_user.id))
+
+            if not teacher_id:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Teacher not found"
+                )
+            query = query.where(
+                select(SubjectOfferings.id).where(
+                    and_(
+                        SubjectOfferings.subject_id == Mark.subject_id,
+                        SubjectOfferings.department_id == Mark.department_id,
+                        SubjectOfferings.taught_by_id == teacher_id
+                    )
+                ).exists()
+            )
+
+        # pending: challenged but not paid yet, paid: ready to be resolved
+        if payment_status == "pending":
+            query = query.where(Mark.result_challenge_payment_status.is_not(True))
+        elif payment_status == "paid":
+            query = query.where(Mark.result_challenge_payment_status.is_(True))
+
+        if department_id is not None:
+            query = query.where(Mark.department_id == department_id)
+
+        return await paginate(
+            db,
+            query,
+            key_columns=[Mark.challenged_at, Mark.id],
+            cursor=cursor,
+            limit=limit,
+            include_total=include_total,
+            key_parsers=[datetime.fromisoformat, int]
+        )
+
     @staticmethod  # update a mark
     async def update_mark(
         db: AsyncSession,
@@ -344,6 +373,12 @@ class MarksService:
 
             # update result challenge status if provided
             if "result_challenge_status" in update_dict:
+                # newly challenged: the date puts it in the challenge queue
+                if (update_dict["result_challenge_status"] == ResultChallengeStatus.CHALLENGED
+                        and (mark.result_challenge_status != ResultChallengeStatus.CHALLENGED
+                             or mark.challenged_at is None)):
+                    mark.challenged_at = datetime.now()
+
                 mark.result_challenge_status = update_dict["result_challenge_status"]
 
                 # if the sent challenged status is Resolved, add the resolved date
@@ -383,39 +418,13 @@ class MarksService:
                     mark.result_challenge_status = ResultChallengeStatus.RESOLVED
                     mark.challenge_resolved_at = datetime.now()
 
-        try:
+        async with integrity_errors(db, request, "updating mark", update_data):
             await db.commit()
             await db.refresh(mark)
 
             return {
                 "message": f"Mark status updated",
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while updating mark: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if update_data:
-                    payload["data"] = update_data.model_dump(mode="json")
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod  # delete a mark
     async def delete_mark(
@@ -423,7 +432,7 @@ class MarksService:
         mark_id: int,
         request: Request | None = None,
     ):
-        try:
+        async with integrity_errors(db, request, "deleting a students mark"):
             mark = await db.scalar(select(Mark).where(Mark.id == mark_id))
 
             if not mark:
@@ -436,30 +445,149 @@ class MarksService:
             return {
                 "message": f"Mark deleted successfully for id: {mark_id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while deleting a students mark: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
 
-                request.state.audit_payload = payload
+    @staticmethod  # weak ETag of a students semester result, changes whenever anything shown in the result changes
+    async def get_results_etag(
+        db: AsyncSession,
+        registration: str,
+        semester_id: int,
+        department_id: int
+    ) -> str:
+        student_id = select(Student.id).where(
+            Student.registration == registration).scalar_subquery()
 
-                raise DomainIntegrityError(
-                    error_message=readable_error, raw_error=raw_error_message
-                )
+        student_marks = and_(Mark.student_id == student_id,
+                             Mark.semester_id == semester_id)
+
+        offerings = select(SubjectOfferings.id).join(Subject, SubjectOfferings.subject_id == Subject.id).where(
+            and_(
+                SubjectOfferings.department_id == department_id,
+                Subject.semester_id == semester_id
+            )
+        )
+
+        state = (await db.execute(select(
+            select(Student.updated_at).where(
+                Student.registration == registration).scalar_subquery(),
+            select(func.count(Mark.id)).where(
+                student_marks).scalar_subquery(),
+            select(func.max(Mark.updated_at)).where(
+                student_marks).scalar_subquery(),
+            select(func.count()).select_from(
+                offerings.subquery()).scalar_subquery(),
+        ))).one()
+
+        # department, semester and subject details come from the reference data cache
+        return make_weak_etag(
+            "results", registration, semester_id, department_id, *state,
+            await reference_cache.digest(db, "departments"),
+            await reference_cache.digest(db, "semesters"),
+            await reference_cache.digest(db, "subjects"),
+        )
+
+    @staticmethod  # result sheet of a student as a base64 pdf. Pure cpu work, no db access
+    def build_result_pdf(student_info, semester_info, department_info, result) -> str:
+        # create a pdf file
+        pdf = FPDF()
+        pdf.add_page()  # add a new page
+
+        pdf.set_fill_color(33, 37, 41)
+        pdf.set_text_color(0, 0, 0)
+
+        # font size of department name
+        pdf.set_font("Arial", "B", size=16)
+
+        # department name in center
+        pdf.cell(190, 10, text=f"{department_info.department_name.upper()}",
+                 new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+
+        # font size of semester name & session
+        pdf.set_font("Arial", "B", size=14)
+
+        # semester & session in center
+        pdf.cell(190, 8, text=f"{semester_info.semester_name.capitalize()} - (Session: {student_info.session})",
+                 new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+
+        pdf.ln(5)
+
+        # font size of result sheet text
+        pdf.set_font("Arial", "B", size=14)
+
+        pdf.set_text_color(44, 62, 80)
+
+        # result sheet in center
+        pdf.cell(200, 10, text="Result Sheet",
+                 new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+        pdf.set_draw_color(44, 62, 80)
+        pdf.line(85, 42, 125, 42)  # horizontal line under result sheet
+
+        pdf.ln(10)
+
+        # student info table design
+        # left = Labels and right = Data
+        info_data = [
+            ("Student Name", student_info.name),
+            ("Registration No.", student_info.registration),
+            ("Session", student_info.session),
+            ("Semester", str(semester_info.semester_number)),
+            ("Department", department_info.department_name)
+        ]
+
+        # font size of student info and student data
+        for label, value in info_data:
+            pdf.cell(40, 8, text=label, border="LTB")
+            pdf.cell(
+                150, 8, text=f": {value}", border="RTB", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        pdf.ln(10)
+
+        # Marks table headers
+        # colum width calculation (total 190)
+        w_sub = 65
+        w_code = 25
+        w_credits = 15
+        w_marks = 17  # assignment, class test, midterm, final
+        w_gpa = 15
+
+        # headers font size
+        pdf.set_font("Arial", size=10)
+        pdf.set_fill_color(240, 240, 240)
+
+        pdf.cell(w_sub, 10, "Subject", border=1, fill=True)
+        pdf.cell(w_code, 10, "Code", border=1, fill=True)
+        pdf.cell(w_credits, 10, "Credits", border=1, fill=True)
+        pdf.cell(w_marks, 10, "CT", border=1, fill=True)
+        pdf.cell(w_marks, 10, "Assn", border=1, fill=True)
+        pdf.cell(w_marks, 10, "Mid", border=1, fill=True)
+        pdf.cell(w_marks, 10, "Final", border=1, fill=True)
+        pdf.cell(w_gpa, 10, "GPA", border=1, fill=True,
+                 new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        # marks table data
+        pdf.set_font("Arial", size=10)
+        for mark in result:
+            pdf.cell(w_sub, 10, text=str(
+                mark.subject.subject_title)[:30], border=1)
+            pdf.cell(w_code, 10, text=str(
+                mark.subject.subject_code), border=1)
+            pdf.cell(w_credits, 10, text=str(
+                mark.subject.credits), border=1)
+            pdf.cell(w_marks, 10, text=str(mark.assignment_mark), border=1)
+            pdf.cell(w_marks, 10, text=str(mark.class_test_mark), border=1)
+            pdf.cell(w_marks, 10, text=str(mark.midterm_mark), border=1)
+            pdf.cell(w_marks, 10, text=str(mark.final_exam_mark), border=1)
+            pdf.cell(w_gpa, 10, text=str(mark.GPA), border=1,
+                     new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        # convert the pdf into base64
+        pdf_output = pdf.output()
+
+        #  if output is not bytearray
+        pdf_bytes = bytes(pdf_output) if isinstance(
+            pdf_output, bytearray) else pdf_output
+
+        # if pdf is generated, include the pdf in the response
+        return base64.b64encode(pdf_bytes).decode("utf-8")
 
     @staticmethod  # generate and show results to a student when all subjects are marked
     async def generate_results(
@@ -469,7 +597,7 @@ class MarksService:
         department_id: int,
         request: Request | None = None
     ):
-        try:
+        async with integrity_errors(db, request, "generating results"):
             # fetch student
             student_stmt = select(Student).where(
                 Student.registration == registration)
@@ -536,107 +664,9 @@ class MarksService:
             semester_info = first_record.semester
             department_info = first_record.student.department
 
-            # create a pdf file
-            pdf = FPDF()
-            pdf.add_page()  # add a new page
-
-            pdf.set_fill_color(33, 37, 41)
-            pdf.set_text_color(0, 0, 0)
-
-            # font size of department name
-            pdf.set_font("Arial", "B", size=16)
-
-            # department name in center
-            pdf.cell(190, 10, text=f"{department_info.department_name.upper()}",
-                     new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
-
-            # font size of semester name & session
-            pdf.set_font("Arial", "B", size=14)
-
-            # semester & session in center
-            pdf.cell(190, 8, text=f"{semester_info.semester_name.capitalize()} - (Session: {student_info.session})",
-                     new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
-
-            pdf.ln(5)
-
-            # font size of result sheet text
-            pdf.set_font("Arial", "B", size=14)
-
-            pdf.set_text_color(44, 62, 80)
-
-            # result sheet in center
-            pdf.cell(200, 10, text="Result Sheet",
-                     new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
-            pdf.set_draw_color(44, 62, 80)
-            pdf.line(85, 42, 125, 42)  # horizontal line under result sheet
-
-            pdf.ln(10)
-
-            # student info table design
-            # left = Labels and right = Data
-            info_data = [
-                ("Student Name", student_info.name),
-                ("Registration No.", student_info.registration),
-                ("Session", student_info.session),
-                ("Semester", str(semester_info.semester_number)),
-                ("Department", department_info.department_name)
-            ]
-
-            # font size of student info and student data
-            for label, value in info_data:
-                pdf.cell(40, 8, text=label, border="LTB")
-                pdf.cell(
-                    150, 8, text=f": {value}", border="RTB", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            pdf.ln(10)
-
-            # Marks table headers
-            # colum width calculation (total 190)
-            w_sub = 65
-            w_code = 25
-            w_credits = 15
-            w_marks = 17  # assignment, class test, midterm, final
-            w_gpa = 15
-
-            # headers font size
-            pdf.set_font("Arial", size=10)
-            pdf.set_fill_color(240, 240, 240)
-
-            pdf.cell(w_sub, 10, "Subject", border=1, fill=True)
-            pdf.cell(w_code, 10, "Code", border=1, fill=True)
-            pdf.cell(w_credits, 10, "Credits", border=1, fill=True)
-            pdf.cell(w_marks, 10, "CT", border=1, fill=True)
-            pdf.cell(w_marks, 10, "Assn", border=1, fill=True)
-            pdf.cell(w_marks, 10, "Mid", border=1, fill=True)
-            pdf.cell(w_marks, 10, "Final", border=1, fill=True)
-            pdf.cell(w_gpa, 10, "GPA", border=1, fill=True,
-                     new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            # marks table data
-            pdf.set_font("Arial", size=10)
-            for mark in result:
-                pdf.cell(w_sub, 10, text=str(
-                    mark.subject.subject_title)[:30], border=1)
-                pdf.cell(w_code, 10, text=str(
-                    mark.subject.subject_code), border=1)
-                pdf.cell(w_credits, 10, text=str(
-                    mark.subject.credits), border=1)
-                pdf.cell(w_marks, 10, text=str(mark.assignment_mark), border=1)
-                pdf.cell(w_marks, 10, text=str(mark.class_test_mark), border=1)
-                pdf.cell(w_marks, 10, text=str(mark.midterm_mark), border=1)
-                pdf.cell(w_marks, 10, text=str(mark.final_exam_mark), border=1)
-                pdf.cell(w_gpa, 10, text=str(mark.GPA), border=1,
-                         new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            # convert the pdf into base64
-            pdf_output = pdf.output()
-
-            #  if output is not bytearray
-            pdf_bytes = bytes(pdf_output) if isinstance(
-                pdf_output, bytearray) else pdf_output
-
-            # if pdf is generated, include the pdf in the response
-            pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
+            # create the result sheet pdf (base64)
+            pdf_base64 = MarksService.build_result_pdf(
+                student_info, semester_info, department_info, result)
 
             return {
                 "published_count": len(result),
@@ -647,30 +677,6 @@ class MarksService:
                 "result": result,
                 "pdf_base64": pdf_base64
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while creating student: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-            logger.error(f"PDF generation failed")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod  # batch publish marks
     async def batch_publish_marks(
@@ -678,7 +684,7 @@ class MarksService:
         batch_publish_data: BatchResultPublishSchema,
         request: Request | None = None
     ):
-        try:
+        async with integrity_errors(db, request, "publishing semester result in batches", batch_publish_data):
             # 1. check total students in the department for the current session
             total_student_stmt = select(func.count(Student.id)).where(
                 and_(
@@ -712,16 +718,13 @@ class MarksService:
                     detail="No subject offered in the department for the current semester."
                 )
 
-            # 3. check total inserted marks
-            total_inserted_marks_stmt = select(func.count(Mark.id))\
-                .join(Student, Mark.student_id == Student.id)\
-                .where(
-                    and_(
-                        Mark.semester_id == batch_publish_data.semester_id,
-                        Student.session == batch_publish_data.session,
-                        Student.department_id == batch_publish_data.department_id
-                    )
+            # 3. check total inserted marks (index only scan on ix_marks_cohort)
+            cohort_marks = and_(
+                Mark.semester_id == batch_publish_data.semester_id,
+                Mark.department_id == batch_publish_data.department_id,
+                Mark.session == batch_publish_data.session
             )
+            total_inserted_marks_stmt = select(func.count()).select_from(Mark).where(cohort_marks)
             total_inserted_marks = (await db.execute(total_inserted_marks_stmt)).scalar() or 0
             expected_total_marks = total_offered * total_student
 
@@ -735,17 +738,9 @@ class MarksService:
             update_stmt = (
                 update(Mark)
                 .where(
-                    Mark.id.in_(
-                        select(Mark.id)
-                        .join(Student, Mark.student_id == Student.id)
-                        .where(
-                            and_(
-                                Mark.semester_id == batch_publish_data.semester_id,
-                                Student.session == batch_publish_data.session,
-                                Student.department_id == batch_publish_data.department_id,
-                                Mark.result_status != ResultStatus.PUBLISHED
-                            )
-                        )
+                    and_(
+                        cohort_marks,
+                        Mark.result_status != ResultStatus.PUBLISHED
                     )
                 ).values(result_status=ResultStatus.PUBLISHED)
                 .execution_options(synchronize_session=False)
@@ -773,35 +768,6 @@ class MarksService:
             #     await db.commit()
             #     return {"detail": "Marks published successfully."}
 
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while publishing semester result in batches: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-           # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if batch_publish_data:
-                    payload["data"] = batch_publish_data.model_dump(
-                        mode="json"
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # @staticmethod  # get all marks for a subject with semester filtering, subject filtering
     # async def get_all_marks_for_a_student(
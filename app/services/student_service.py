@@ -1,10 +1,8 @@
-from typing import Any
 from loguru import logger
 from sqlalchemy import or_, select
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from app.core.error_handling import integrity_errors
 from app.core.pw_hash import hash_password
 from app.models.department_model import Department
 from app.models.semester_model import Semester
@@ -12,10 +10,8 @@ from app.models.student_model import Student
 from app.models.user_model import User
 from app.schemas.student_schema import StudentCreateSchema, StudentUpdateByAdminSchema
 from fastapi import HTTPException, Request, status
-from sqlalchemy.exc import IntegrityError
-from app.utils import check_existence
-from app.utils import delete_image_from_cloudinary
-from app.utils.mask_sensitive_data import sanitize_payload
+from app.utils import check_existence, check_existence_many
+from app.db.image_deletion_queue import image_deletion_worker, queue_image_deletion
 
 
 class StudentService:
@@ -37,15 +33,21 @@ class StudentService:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="User is not a student. Cannot create student")
 
-        # check if department exist
+        # check if department and semester exist
+        existence_checks = []
         if student_data.department_id:
-            await check_existence(Department, db, student_data.department_id, "Department")
+            existence_checks.append(
+                (Department, student_data.department_id, "Department"))
 
-        # check if semester exist
         if student_data.semester_id:
-            await check_existence(Semester, db, student_data.semester_id, "Semester")
+            existence_checks.append(
+                (Semester, student_data.semester_id, "Semester"))
 
-        try:
+        if existence_checks:
+            await check_existence_many(db, existence_checks)
+
+        async with integrity_errors(db, request, "creating student", student_data,
+                                    exclude={"user": {"password", "hashed_password"}}):
             # create user
             new_user_info = student_data.user.model_dump(mode="json")
             raw_password = new_user_info.pop("password")
@@ -73,43 +75,6 @@ class StudentService:
             return {
                 "message": f"Student created successfully. Name: {new_student.name}, Student ID: {new_student.id}, User ID: {new_student.user_id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while creating student: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if student_data:
-                    safe_data = sanitize_payload(
-                        student_data.model_dump(
-                            mode="json",
-                            exclude={
-                                "user": {
-                                    "password",
-                                    "hashed_password",
-                                }
-                            },
-                        )
-                    )
-                    payload["data"] = safe_data
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod  # get all student with minimal data for marks entry
     async def get_all_student_with_minimal_data(
@@ -117,7 +82,7 @@ class StudentService:
         search: str | None = None,
         request: Request | None = None
     ):
-        try:
+        async with integrity_errors(db, request, "fetching all students with minimal data"):
             query = select(Student).options(
                 selectinload(Student.department),
                 selectinload(Student.semester)
@@ -138,30 +103,6 @@ class StudentService:
 
             return all_teachers
 
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while fetching all teacher with minimal data: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # @staticmethod # get all students
     # async def get_students(
@@ -202,7 +143,8 @@ class StudentService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
 
-        try:
+        async with integrity_errors(db, request, "updating student", student_update_data, exclude_unset=True):
+            image_queued = False
             updated_student_data = student_update_data.model_dump(
                 exclude_unset=True)  # convert to dictionary
 
@@ -211,9 +153,9 @@ class StudentService:
                 old_public_id = student.photo_public_id
 
                 if old_public_id and old_public_id != new_public_id:
-                    await delete_image_from_cloudinary(old_public_id)
-                    logger.success(
-                        "Old studet profile picture deleted from Cloudinary")
+                    # deleted by the background worker after the commit, the update does not wait for Cloudinary
+                    queue_image_deletion(db, old_public_id)
+                    image_queued = True
 
             for key, value in updated_student_data.items():
                 # apply the updated data in the student object(from DB)
@@ -223,36 +165,12 @@ class StudentService:
             await db.refresh(student)
             logger.success("Student updated successfully")
 
+            if image_queued:
+                image_deletion_worker.wake()
+
             return {
                 "message": f"Student updated successfully. Student ID: {student.id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers 	the 	session from 'failed' state and puts it back in 'clean' state to 	save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while updating student: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if student_update_data:
-                    payload["data"] = student_update_data.model_dump(
-                        mode="json", exclude_unset=True)
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # @staticmethod
     # # update student (self)
@@ -289,7 +207,7 @@ class StudentService:
 
     #         # generally the PostgreSQL's error message will be in e.orig.args
     #         raw_error_message = str(e.orig) if e.orig else str(e)
-    #         readable_error = parse_integrity_error(raw_error_message)
+    #         readable_error = parse_integrity_error(e)
 
     #         logger.error(f"Integrity error while updating student(self): {e}")
     #         logger.error(f"Readable Error: {readable_error}")
@@ -335,7 +253,7 @@ class StudentService:
 
     #         # generally the PostgreSQL's error message will be in e.orig.args
     #         raw_error_message = str(e.orig) if e.orig else str(e)
-    #         readable_error = parse_integrity_error(raw_error_message)
+    #         readable_error = parse_integrity_error(e)
 
     #         logger.error(f"Integrity error while deleting student: {e}")
     #         logger.error(f"Readable Error: {readable_error}")
@@ -1,12 +1,11 @@
 import time
-from typing import Any
 from loguru import logger
-from sqlalchemy import and_, asc, desc, func, or_, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from app.core.error_handling import integrity_errors
 from app.models.department_model import Department
+from app.models.semester_model import Semester
 from app.models.subject_model import Subject
 from app.models.subject_offerings_model import SubjectOfferings
 from app.models.teacher_model import Teacher
@@ -14,8 +13,9 @@ from app.models.user_model import User
 from app.schemas.subject_offering_schema import SubjectOfferingCreateSchema, SubjectOfferingUpdateSchema
 from fastapi import HTTPException, Request, status
 from app.schemas.user_schema import UserOutSchema
-from app.utils import check_existence
-from sqlalchemy.exc import IntegrityError
+from app.db.reference_cache import reference_cache
+from app.utils import check_existence_many
+from app.utils.pagination import paginate
 
 
 class SubjectOfferingService:
@@ -27,14 +27,13 @@ class SubjectOfferingService:
         db: AsyncSession,
         request: Request | None = None
     ):
-        # validate teacher id and role
-        await check_existence(Teacher, db, sub_off_data.taught_by_id, "Teacher")
-
-        # validate department id
-        await check_existence(Department, db, sub_off_data.department_id, "Department")
-
-        # validate subject id
-        await check_existence(Subject, db, sub_off_data.subject_id, "Subject")
+        # validate teacher, department and subject id in one go
+        await check_existence_many(db, [
+            (Teacher, sub_off_data.taught_by_id, "Teacher"),
+            (Department, sub_off_data.department_id, "Department"),
+            (Subject, sub_off_data.subject_id, "Subject"),
+        ])
+        subject = await reference_cache.get(db, "subjects", sub_off_data.subject_id)
 
         #  check if same subject offering exists
         is_exists = await db.scalar(select(SubjectOfferings).where(
@@ -50,8 +49,9 @@ class SubjectOfferingService:
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Same subject offering already exists with this Teacher, Department and Subject.")
 
         # One semester can have maximum 7 subjects in a department
-        current_semester_id = await db.scalar(select(Subject.semester_id).where(Subject.id == sub_off_data.subject_id))
-        current_dept_id = await db.scalar(select(Department.id).where(Department.id == sub_off_data.department_id))
+        # subject and department are already validated above (reference data cache), no extra queries needed
+        current_semester_id = subject.semester_id
+        current_dept_id = sub_off_data.department_id
 
         if not current_semester_id or not current_dept_id:
             raise HTTPException(
@@ -71,7 +71,7 @@ class SubjectOfferingService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="This department already has 7 subjects in this semester. Cannot add more.")
 
-        try:
+        async with integrity_errors(db, request, "creating new subject offering", sub_off_data):
             offered_subject = SubjectOfferings(
                 **sub_off_data.model_dump()
             )
@@ -83,35 +83,6 @@ class SubjectOfferingService:
             return {
                 "message": f"Subject offering created successfully. ID: {offered_subject.id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while creating new subject offering: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if sub_off_data:
-                    payload["data"] = sub_off_data.model_dump(
-                        mode="json"
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # get single subject offering
     # @staticmethod
@@ -129,22 +100,24 @@ class SubjectOfferingService:
         db: AsyncSession,
         order_by_filter: str | None = None,
         filter_by_department: int | None = None,
-        search: str | None = None
+        search: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+        include_total: bool = False
     ):
+        # load only the columns used by AllSubjectOfferingsResponseSchema for the related rows
         query = select(SubjectOfferings).options(
-            selectinload(SubjectOfferings.department),
-            selectinload(SubjectOfferings.subject).selectinload(
-                Subject.semester),
-            selectinload(SubjectOfferings.taught_by).selectinload(
-                Teacher.department)
+            selectinload(SubjectOfferings.department).load_only(
+                Department.department_name),
+            selectinload(SubjectOfferings.subject).load_only(
+                Subject.subject_title, Subject.subject_code, Subject.credits,
+                Subject.is_general, Subject.semester_id
+            ).selectinload(Subject.semester).load_only(Semester.semester_name),
+            selectinload(SubjectOfferings.taught_by).load_only(
+                Teacher.name, Teacher.department_id
+            ).selectinload(Teacher.department).load_only(Department.department_name)
         )
 
-        if order_by_filter == "asc":
-            query = query.order_by(asc(SubjectOfferings.id))
-
-        if order_by_filter == "desc":
-            query = query.order_by(desc(SubjectOfferings.id))
-
         if filter_by_department is not None:
             query = query.where(
                 SubjectOfferings.department_id == filter_by_department)
@@ -159,25 +132,16 @@ class SubjectOfferingService:
                 )
             )
 
-        try:
-            result = await db.execute(query)
-            subject_offerings = result.scalars().unique().all()
-
-            return subject_offerings
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while creating new subject offering: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
+        async with integrity_errors(db, None, "fetching subject offerings"):
+            # keyset pagination on id (asc by default)
+            return await paginate(
+                db,
+                query,
+                key_columns=[SubjectOfferings.id],
+                cursor=cursor,
+                limit=limit,
+                descending=order_by_filter == "desc",
+                include_total=include_total
             )
 
     @staticmethod  # update subject offering
@@ -197,57 +161,35 @@ class SubjectOfferingService:
 
         updated_data = update_data.model_dump(exclude_unset=True)
 
+        existence_checks = []
+
         # check if taught_by exists
         if "taught_by_id" in updated_data and updated_data["taught_by_id"] is not None:
-            await check_existence(Teacher, db, updated_data["taught_by_id"], "Teacher")
+            existence_checks.append(
+                (Teacher, updated_data["taught_by_id"], "Teacher"))
 
         # check if department exists
         if "department_id" in updated_data:
-            await check_existence(Department, db, updated_data["department_id"], "Department")
+            existence_checks.append(
+                (Department, updated_data["department_id"], "Department"))
 
         # check if subject exists
         if "subject_id" in updated_data:
-            await check_existence(Subject, db, updated_data["subject_id"], "Subject")
+            existence_checks.append(
+                (Subject, updated_data["subject_id"], "Subject"))
+
+        if existence_checks:
+            await check_existence_many(db, existence_checks)
 
         for key, value in updated_data.items():
             setattr(subject_offering, key, value)
 
-        try:
+        async with integrity_errors(db, request, "updating subject offering", update_data, exclude_unset=True):
             db.add(subject_offering)
             await db.commit()
             await db.refresh(subject_offering)
 
             return subject_offering
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while updating subject offering: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if update_data:
-                    payload["data"] = update_data.model_dump(
-                        mode="json",
-                        exclude_unset=True,
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod  # delete subject offering
     async def delete_subject_offering(
@@ -255,7 +197,7 @@ class SubjectOfferingService:
         subject_offering_id: int,
         request: Request | None = None
     ):
-        try:
+        async with integrity_errors(db, request, "deleting subject offering"):
             subject_offering = await db.scalar(select(SubjectOfferings).where(SubjectOfferings.id == subject_offering_id))
 
             if not subject_offering:
@@ -269,30 +211,6 @@ class SubjectOfferingService:
             return {
                 "message": f"Subject offering deleted successfully. ID: {subject_offering.id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while deleting subject offering: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # get offered subjects for marking
     # admin -> use students current semester and department id to find the list of the subjects
@@ -1,16 +1,15 @@
-from typing import Any
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, asc, desc, select, or_
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from sqlalchemy import select, or_
+from app.core.error_handling import integrity_errors
+from app.db.reference_cache import reference_cache
 from app.models.semester_model import Semester
 from app.models.subject_model import Subject
 from app.models.subject_offerings_model import SubjectOfferings
 from app.schemas.subject_schema import SubjectCreateSchema, SubjectUpdateSchema
 from fastapi import HTTPException, Request, status
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import selectinload
+from app.utils.pagination import paginate
 
 
 class SubjectService:
@@ -30,43 +29,19 @@ class SubjectService:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Subject already exist")
 
-        try:
+        async with integrity_errors(db, request, "creating subject", subject_data):
             new_subject = Subject(
                 **subject_data.model_dump(exclude={"subject_code"}), subject_code=capitalized_subject_code)
 
             db.add(new_subject)
+            await reference_cache.publish_change(db, "subjects")
             await db.commit()
+            reference_cache.invalidate("subjects")
             await db.refresh(new_subject)
             logger.success("New subject created successfully")
             return {
                 "message": f"new_subject created successfully. ID: {new_subject.id}. Name: {new_subject.subject_title}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-           # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while creating subject: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if subject_data:
-                    payload["data"] = subject_data.model_dump(mode="json")
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # @staticmethod
     # async def get_subject(db: AsyncSession, subject_id: int):
@@ -84,16 +59,14 @@ class SubjectService:
         subject_credits: float | None = None,
         semester_id: int | None = None,
         search: str | None = None,
-        order_by_filter: str | None = None
+        order_by_filter: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+        include_total: bool = False
     ):
+        # only the columns used by MinimalSemesterResponseSchema are loaded for the semester
         query = select(Subject).options(selectinload(
-            Subject.semester))
-
-        if order_by_filter == "asc":
-            query = query.order_by(asc(Subject.id))
-
-        if order_by_filter == "desc":
-            query = query.order_by(desc(Subject.id))
+            Subject.semester).load_only(Semester.semester_name, Semester.semester_number))
 
         # Search by credits
         if subject_credits is not None:
@@ -115,10 +88,16 @@ class SubjectService:
                 )
             )
 
-        result = await db.execute(query)
-        subjects = result.scalars().unique().all()
-
-        return subjects
+        # keyset pagination on id (asc by default)
+        return await paginate(
+            db,
+            query,
+            key_columns=[Subject.id],
+            cursor=cursor,
+            limit=limit,
+            descending=order_by_filter == "desc",
+            include_total=include_total
+        )
 
     @staticmethod  # update single subject
     async def update_subject_by_admin(
@@ -133,46 +112,19 @@ class SubjectService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Subject not found")
 
-        try:
+        async with integrity_errors(db, request, "updating subject", subject_update_data, exclude_unset=True):
             update_data = subject_update_data.model_dump(exclude_unset=True)
 
             for key, value in update_data.items():
                 setattr(subject, key, value)
 
+            await reference_cache.publish_change(db, "subjects")
             await db.commit()
+            reference_cache.invalidate("subjects")
             await db.refresh(subject)
 
             logger.success("Subject updated successfully")
             return {"message": f"Subject: {subject.subject_title} updated successfully"}
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while updating subject: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if subject_update_data:
-                    payload["data"] = subject_update_data.model_dump(
-                        mode="json",
-                        exclude_unset=True,
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod  # delete single subject by super admin
     async def delete_subject(
@@ -186,34 +138,13 @@ class SubjectService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Subject not found")
 
-        try:
+        async with integrity_errors(db, request, "deleting subject"):
             await db.delete(subject)
+            await reference_cache.publish_change(db, "subjects")
             await db.commit()
+            reference_cache.invalidate("subjects")
             logger.success("Subject deleted successfully")
             return {"message": f"Subject: {subject.subject_title} deleted successfully"}
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while deleting subject: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # @staticmethod
     # async def get_subject_by_code(
@@ -1,9 +1,7 @@
-from typing import Any
 from loguru import logger
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from app.core.error_handling import integrity_errors
 from app.core.pw_hash import hash_password
 from app.models.user_model import User
 from app.models.teacher_model import Teacher
@@ -12,9 +10,7 @@ from app.schemas.teacher_schema import TeacherCreateSchema, TeacherUpdateByAdmin
 from app.utils import check_existence
 from fastapi import HTTPException, Request, status
 from sqlalchemy.orm import selectinload
-from sqlalchemy.exc import IntegrityError
-from app.utils import delete_image_from_cloudinary
-from app.utils.mask_sensitive_data import sanitize_payload
+from app.db.image_deletion_queue import image_deletion_worker, queue_image_deletion
 
 
 class TeacherService:
@@ -41,7 +37,8 @@ class TeacherService:
         if teacher_data.department_id:
             await check_existence(Department, db, teacher_data.department_id, "Department")
 
-        try:
+        async with integrity_errors(db, request, "creating teacher", teacher_data,
+                                    exclude={"user": {"password", "hashed_password"}}):
             # create user
             new_user_info = teacher_data.user.model_dump()
             raw_password = new_user_info.pop("password")
@@ -68,42 +65,6 @@ class TeacherService:
             return {
                 "message": f"Teacher created successfully. Name: {new_teacher.name}, Teacher ID: {new_teacher.id}, User ID: {new_user.id}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while creating teacher: {e}")
-            logger.error(readable_error)
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if teacher_data:
-                    safe_data = sanitize_payload(
-                        teacher_data.model_dump(
-                            mode="json",
-                            exclude={
-                                "user": {
-                                    "password",
-                                    "hashed_password",
-                                }
-                            },
-                        )
-                    )
-                    payload["data"] = safe_data
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # @staticmethod # get all teachers
     # async def get_teachers(db: AsyncSession):
@@ -144,7 +105,7 @@ class TeacherService:
         search: str | None = None,
         request: Request | None = None
     ):
-        try:
+        async with integrity_errors(db, request, "fetching all teachers with minimal data"):
             query = select(Teacher).options(
                 selectinload(Teacher.department)
             ).order_by(Teacher.name)
@@ -163,30 +124,6 @@ class TeacherService:
 
             return all_teachers
 
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(
-                f"Integrity error while fetching all teacher with minimal data: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod
     async def update_teacher_by_admin(
@@ -201,7 +138,8 @@ class TeacherService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found")
 
-        try:
+        async with integrity_errors(db, request, "updating teacher(admin)", teacher_update_data, exclude_unset=True):
+            image_queued = False
             updated_teacher_data = teacher_update_data.model_dump(
                 exclude_unset=True)
 
@@ -210,9 +148,9 @@ class TeacherService:
                 old_public_id = teacher.photo_public_id
 
                 if old_public_id and old_public_id != new_public_id:
-                    await delete_image_from_cloudinary(old_public_id)
-                    logger.success(
-                        "Old teacher profile picture deleted from Cloudinary")
+                    # deleted by the background worker after the commit, the update does not wait for Cloudinary
+                    queue_image_deletion(db, old_public_id)
+                    image_queued = True
 
             for key, value in updated_teacher_data.items():
                 setattr(teacher, key, value)
@@ -221,39 +159,13 @@ class TeacherService:
             await db.refresh(teacher)
             logger.success("Teacher updated successfully")
 
+            if image_queued:
+                image_deletion_worker.wake()
+
             return {
                 "message": "Teacher updated successfully."
             }
 
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while updating teacher(admin): {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if teacher_update_data:
-                    payload["data"] = teacher_update_data.model_dump(
-                        mode="json",
-                        exclude_unset=True,
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # update teacher (self)
 
@@ -287,7 +199,7 @@ class TeacherService:
 
     #         # generally the PostgreSQL's error message will be in e.orig.args
     #         raw_error_message = str(e.orig) if e.orig else str(e)
-    #         readable_error = parse_integrity_error(raw_error_message)
+    #         readable_error = parse_integrity_error(e)
 
     #         logger.error(f"Integrity error while updating teacher(self): {e}")
     #         logger.error(f"Readable Error: {readable_error}")
@@ -335,7 +247,7 @@ class TeacherService:
 
     #         # generally the PostgreSQL's error message will be in e.orig.args
     #         raw_error_message = str(e.orig) if e.orig else str(e)
-    #         readable_error = parse_integrity_error(raw_error_message)
+    #         readable_error = parse_integrity_error(e)
 
     #         logger.error(f"Integrity error while deleting teacher: {e}")
     #         logger.error(f"Readable Error: {readable_error}")
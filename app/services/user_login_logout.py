@@ -1,17 +1,14 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any
 from fastapi import HTTPException, status, Response, Request
 from jose import JWTError
 from loguru import logger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import verify_password, create_access_token
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from app.core.error_handling import integrity_errors
 from app.core.jwt import create_refresh_token, decode_refresh_token
 from app.models import User
 from app.core import settings
-from sqlalchemy.exc import IntegrityError
 
 
 async def login_user(
@@ -30,7 +27,7 @@ async def login_user(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Invalid credentials. Please check your credentials.")
 
-    try:
+    async with integrity_errors(db, request, "login"):
         # verify password
         is_valid = verify_password(password, user.hashed_password)
 
@@ -78,27 +75,6 @@ async def login_user(
             "message": "Login successful"
         }
 
-    except IntegrityError as e:
-        # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state to save the Audit Log
-        await db.rollback()
-
-        # generally the PostgreSQL's error message will be in e.orig.args
-        raw_error_message = str(e.orig) if e.orig else str(e)
-        readable_error = parse_integrity_error(raw_error_message)
-
-        logger.error(f"Error occurred while login: {e}")
-        logger.error(f"Readable Error: {readable_error}")
-
-        # attach audit payload safely
-        if request:
-            payload: dict[str, Any] = {
-                "raw_error": raw_error_message,
-                "readable_error": readable_error,
-            }
-            request.state.audit_payload = payload
-
-        raise DomainIntegrityError(
-            error_message=readable_error, raw_error=raw_error_message)
 
 
 async def refresh_access_token(request: Request, response: Response):
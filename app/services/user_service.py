@@ -1,9 +1,7 @@
-from typing import Any
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, asc, desc, select, or_
-from app.core.exceptions import DomainIntegrityError
-from app.core.integrity_error_parser import parse_integrity_error
+from sqlalchemy import and_, select, or_
+from app.core.error_handling import integrity_errors
 from app.core.pw_hash import verify_password
 from app.models import User
 from app.models.department_model import Department
@@ -12,9 +10,8 @@ from app.models.teacher_model import Teacher
 from app.schemas.user_schema import UserCreateSchema, UserPasswordUpdateSchema, UserUpdateSchemaByAdmin
 from app.core import hash_password
 from fastapi import HTTPException, Request, status
-from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
-from app.utils.mask_sensitive_data import sanitize_payload
+from app.utils.pagination import paginate
 
 
 class UserService:
@@ -36,7 +33,8 @@ class UserService:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="User already exist")
 
-        try:
+        async with integrity_errors(db, request, "creating new user", user_data,
+                                    exclude={"password", "hashed_password"}):
             # hash password
             hashed_pwd = hash_password(user_data.password)
 
@@ -52,48 +50,16 @@ class UserService:
             logger.success("New user created successfully")
 
             return {"message": f"User created successfully. ID: {new_user.id}, username: {new_user.username}"}
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Error occurred while creating new user: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if user_data:
-                    safe_data = sanitize_payload(
-                        user_data.model_dump(
-                            mode="json",
-                            exclude={
-                                "password",
-                                "hashed_password",
-                            },
-                        )
-                    )
-                    payload["data"] = safe_data
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     @staticmethod
     async def get_users(
         db: AsyncSession,
         user_role: str | None = None,
         department_search: str | None = None,
-        order_by_filter: str | None = None
+        order_by_filter: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+        include_total: bool = False
     ):
         query = (
             select(User)
@@ -120,16 +86,16 @@ class UserService:
                 )
             )
 
-        if order_by_filter == "asc":
-            query = query.order_by(asc(User.id))
-
-        if order_by_filter == "desc":
-            query = query.order_by(desc(User.id))
-
-        result = await db.execute(query)
-        all_users = result.scalars().unique().all()  # unique
-
-        return all_users
+        # keyset pagination on id (asc by default)
+        return await paginate(
+            db,
+            query,
+            key_columns=[User.id],
+            cursor=cursor,
+            limit=limit,
+            descending=order_by_filter == "desc",
+            include_total=include_total
+        )
 
     @staticmethod
     async def get_user(db: AsyncSession, user_id: int):
@@ -167,7 +133,7 @@ class UserService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-        try:
+        async with integrity_errors(db, request, "updating user", user_update_data_by_admin, exclude_unset=True):
             updated_user_data = user_update_data_by_admin.model_dump(
                 exclude_unset=True)
 
@@ -181,50 +147,6 @@ class UserService:
             return {
                 "message": f"User updated successfully for username: {user.username}, role: {user.role.value}"
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while updating user: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if user_update_data_by_admin:
-                    payload["data"] = user_update_data_by_admin.model_dump(
-                        mode="json",
-                        exclude_unset=True,
-                    )
-
-                request.state.audit_payload = payload
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                if user_update_data_by_admin:
-                    payload["data"] = user_update_data_by_admin.model_dump(
-                        mode="json",
-                        exclude_unset=True,
-                    )
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # TODO: create profile page to update the default password
     @staticmethod
@@ -253,7 +175,7 @@ class UserService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Current password is incorrect"
                 )
-        try:
+        async with integrity_errors(db, request, "updating password"):
             # hash the new password
             user.hashed_password = hash_password(
                 password_update_data.new_password)
@@ -263,29 +185,6 @@ class UserService:
             return {
                 "message": f"Password updated."
             }
-        except IntegrityError as e:
-            # Important: rollback as soon as an error occurs. It recovers the session from 'failed' state and puts it back in 'clean' state
-            await db.rollback()
-
-            # generally the PostgreSQL's error message will be in e.orig.args
-            raw_error_message = str(e.orig) if e.orig else str(e)
-            readable_error = parse_integrity_error(raw_error_message)
-
-            logger.error(f"Integrity error while updating password: {e}")
-            logger.error(f"Readable Error: {readable_error}")
-
-            # attach audit payload safely
-            if request:
-                payload: dict[str, Any] = {
-                    "raw_error": raw_error_message,
-                    "readable_error": readable_error,
-                }
-
-                request.state.audit_payload = payload
-
-            raise DomainIntegrityError(
-                error_message=readable_error, raw_error=raw_error_message
-            )
 
     # @staticmethod
     # async def delete_user(
@@ -313,7 +212,7 @@ class UserService:
 
     #         # generally the PostgreSQL's error message will be in e.orig.args
     #         raw_error_message = str(e.orig) if e.orig else str(e)
-    #         readable_error = parse_integrity_error(raw_error_message)
+    #         readable_error = parse_integrity_error(e)
 
     #         logger.error(f"Integrity error while deleting user: {e}")
     #         logger.error(f"Readable Error: {readable_error}")
@@ -1,4 +1,4 @@
-from .check_existence import check_existence
+from .check_existence import check_existence, check_existence_many
 from .audit_level_set import level_from_status
 from .mask_sensitive_data import sanitize_payload
 from .cloudinary import delete_image_from_cloudinary
@@ -1,6 +1,8 @@
-from sqlalchemy import select
+from typing import Any
+from sqlalchemy import Integer, literal_column, select, union_all
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.reference_cache import reference_cache
 
 
 async def check_existence(
@@ -9,10 +11,60 @@ async def check_existence(
         model_id: int,
         model_name: str
 ):
-    instance = await db.scalar(select(model).where(model.id == model_id))
+    # departments, semesters and subjects are answered from the reference data cache.
+    # NOTE: for those models the returned instance is a read-only schema, not an ORM object
+    cached_table = reference_cache.table_of(model)
+
+    if cached_table:
+        instance = await reference_cache.get(db, cached_table, model_id)
+    else:
+        instance = await db.scalar(select(model).where(model.id == model_id))
 
     if not instance:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"{model_name} not found")
 
-    return instance
\ No newline at end of file
+    return instance
+
+
+async def check_existence_many(
+        db: AsyncSession,
+        checks: list[tuple[Any, int, str]],
+        raise_on_missing: bool = True
+) -> list[str]:
+    """
+    Validate several (model, model_id, model_name) pairs at once.
+    Cached models are dictionary lookups, the rest go to the DB in a single
+    UNION ALL query that only touches the primary key indexes.
+    Returns the names of the missing ones (in the given order) or raises 404 for the first one.
+    """
+    found: set[int] = set()
+    db_checks = []
+
+    for index, (model, model_id, model_name) in enumerate(checks):
+        cached_table = reference_cache.table_of(model)
+
+        if cached_table:
+            if await reference_cache.get(db, cached_table, model_id):
+                found.add(index)
+        else:
+            # the position of the check is returned instead of the row, eg: SELECT 0 FROM students WHERE id = 5
+            db_checks.append(
+                select(literal_column(str(index), Integer).label("check_index"))
+                .select_from(model)
+                .where(model.id == model_id)
+            )
+
+    if db_checks:
+        statement = db_checks[0] if len(db_checks) == 1 else union_all(*db_checks)
+        result = await db.execute(statement)
+        found.update(result.scalars().all())
+
+    missing = [model_name for index, (_, _, model_name)
+               in enumerate(checks) if index not in found]
+
+    if missing and raise_on_missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"{missing[0]} not found")
+
+    return missing
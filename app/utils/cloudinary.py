@@ -1,8 +1,9 @@
+import asyncio
 import cloudinary
+import cloudinary.api
 import cloudinary.uploader
 from loguru import logger
 from app.core import settings
-from fastapi import HTTPException, status
 
 # Cloudinary Configuration
 cloudinary.config(
@@ -12,13 +13,43 @@ cloudinary.config(
     secure=True,
 )
 
+# statuses of delete_resources that mean the image is gone
+DELETED_STATUSES = ("deleted", "not_found")
 
-async def delete_image_from_cloudinary(public_id: str):
 
+class CloudinaryImageBackend:
+    # blocking http request, call it with asyncio.to_thread
+    def delete_many(self, public_ids: list[str]) -> dict[str, str]:
+        # one admin api call for up to 100 images, returns {public_id: "deleted" | "not_found" | ...}
+        result = cloudinary.api.delete_resources(public_ids)
+        return dict(result.get("deleted", {}))
+
+
+class StubImageBackend:
+    # local development and tests: remembers the deleted ids instead of calling Cloudinary
+    def __init__(self):
+        self.deleted: list[str] = []
+        self.fail_with: Exception | None = None
+
+    def delete_many(self, public_ids: list[str]) -> dict[str, str]:
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.deleted.extend(public_ids)
+        return {public_id: "deleted" for public_id in public_ids}
+
+
+def get_image_backend() -> CloudinaryImageBackend | StubImageBackend:
+    if settings.IMAGE_DELETION_BACKEND == "stub":
+        return StubImageBackend()
+    return CloudinaryImageBackend()
+
+
+async def delete_image_from_cloudinary(public_id: str):
+    # immediate single deletion, profile updates use the deletion queue (app/db/image_deletion_queue.py) instead
     try:
         if not public_id:
             return None
-        result = cloudinary.uploader.destroy(public_id)
+        result = await asyncio.to_thread(cloudinary.uploader.destroy, public_id)
         logger.success(f"Image deleted from Cloudinary: {public_id}")
         return result
     except Exception as e:
@@ -0,0 +1,55 @@
+import hashlib
+from typing import Any
+from fastapi import Request, Response, status
+
+
+def make_weak_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from anything that describes the state of a response.
+    example: ("departments", "3f2a...", "search=cse") -> 'W/"9b0c1d..."'
+    """
+    raw = "|".join(str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # weak comparison: W/"abc" and "abc" are the same validator
+    wanted = etag.removeprefix("W/")
+    candidates = (tag.strip().removeprefix("W/")
+                  for tag in if_none_match.split(","))
+
+    return wanted in candidates
+
+
+def cache_control_for_role(role: str | None) -> str:
+    # admins must always see fresh data (revalidate with the ETag on every request)
+    if role in ("super_admin", "admin"):
+        return "private, no-cache"
+
+    # students and teachers can reuse their copy for a minute before revalidating
+    if role in ("teacher", "student"):
+        return "private, max-age=60, must-revalidate"
+
+    # public endpoints (eg: semesters)
+    return "public, no-cache"
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
@@ -0,0 +1,172 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def clamp_page_size(limit: int | None) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _json_default(value: Any):
+    # datetime keys (eg: created_at) are stored as iso strings inside the cursor
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cursor value of type {type(value).__name__} is not serializable")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the key values of the last row of a page into an opaque url safe token.
+    example: [42] -> 'WzQyXQ'
+    """
+    raw = json.dumps(list(values), default=_json_default,
+                     separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    if not isinstance(values, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    return values
+
+
+def column_parser(column: Any) -> Callable[[Any], Any]:
+    """
+    Cursor value check for a key column without an explicit parser, based on the column's python type.
+    Raises ValueError/TypeError for a value that does not fit (eg: "abc" for an integer key).
+    """
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        python_type = None
+
+    def parse(value: Any) -> Any:
+        if value is None or isinstance(value, bool):
+            raise TypeError("Cursor value must not be null or boolean")
+        if python_type is None or isinstance(value, python_type):
+            return value
+        if python_type in (datetime, date):
+            return python_type.fromisoformat(value)
+        if python_type is float and isinstance(value, int):
+            return float(value)
+        if issubclass(python_type, Enum):
+            return python_type(value)
+        raise TypeError(f"Cursor value must be of type {python_type.__name__}")
+
+    return parse
+
+
+class Explain(Executable, ClauseElement):
+    # EXPLAIN (FORMAT JSON) <statement>, executed with the parameters of the statement
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """
+    Cheap row count using the planner estimate (EXPLAIN) instead of COUNT(*).
+    Accurate enough for "about N results" and it does not scan the table.
+    """
+    # bound parameters go through the type's bind processor, literal_binds cannot render every type (eg: JSONB)
+    result = await db.execute(Explain(query.order_by(None).limit(None)))
+    plan = result.scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (TypeError, KeyError, IndexError):
+        return 0
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    key_columns: Sequence[Any],
+    cursor: str | None = None,
+    limit: int | None = None,
+    descending: bool = False,
+    include_total: bool = False,
+    key_parsers: Sequence[Callable[[Any], Any]] | None = None,
+):
+    """
+    Keyset (seek) pagination over key_columns. The last column must be unique (eg: id)
+    so that the ordering is stable. Every page costs the same no matter how deep it is.
+    """
+    page_size = clamp_page_size(limit)
+
+    total_estimate = await estimate_count(db, query) if include_total else None
+
+    key = key_columns[0] if len(key_columns) == 1 else tuple_(*key_columns)
+
+    if cursor:
+        values = decode_cursor(cursor)
+
+        if len(values) != len(key_columns):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+        parsers = key_parsers or [column_parser(column) for column in key_columns]
+        try:
+            values = [parse(value) for parse, value in zip(parsers, values)]
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+        boundary = values[0] if len(values) == 1 else tuple_(*values)
+        query = query.where(key < boundary if descending else key > boundary)
+
+    ordering = [column.desc() if descending else column.asc()
+                for column in key_columns]
+
+    # fetch one extra row to know if there is a next page without counting
+    query = query.order_by(None).order_by(*ordering).limit(page_size + 1)
+
+    result = await db.execute(query)
+    rows = result.scalars().unique().all()
+
+    items = rows[:page_size]
+    next_cursor = None
+
+    if len(rows) > page_size:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            [getattr(last, column.key) for column in key_columns])
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "limit": page_size,
+        "total_estimate": total_estimate,
+    }
@@ -0,0 +1,211 @@
+"""
+Micro-benchmarks of the pure python hot paths, no database needed.
+
+Every case runs on fixed synthetic input. The best time of the rounds (the least noisy number
+on a busy machine) and the peak memory (tracemalloc) are compared with benchmarks/baseline_hot_paths.json, and the exit code is 1
+when a case is slower or allocates more than the threshold allows.
+The baseline is machine specific, save a new one on the machine that runs the comparison.
+
+run from the project folder:
+    python -m benchmarks.bench_hot_paths                    # compare with the baseline
+    python -m benchmarks.bench_hot_paths --save-baseline    # store the current numbers
+    python -m benchmarks.bench_hot_paths --cases jwt,result_pdf --threshold 0.5
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable
+from benchmarks.common import set_placeholder_env
+
+set_placeholder_env()
+
+from app.core.integrity_error_parser import parse_integrity_error  # noqa: E402
+from app.core.jwt import create_access_token, decode_access_token  # noqa: E402
+from app.services.marks_service import MarksService  # noqa: E402
+from app.utils.mask_sensitive_data import sanitize_payload  # noqa: E402
+
+
+BASELINE_PATH = "benchmarks/baseline_hot_paths.json"
+MIN_MEMORY_REGRESSION_KIB = 16
+
+
+def build_marks(count: int) -> list[SimpleNamespace]:
+    # ORM shaped marks spread over 4 departments, 8 semesters and 5 sessions
+    departments = [SimpleNamespace(id=i, department_name=f"Department {i}") for i in range(1, 5)]
+    semesters = [SimpleNamespace(id=i, semester_name=f"Semester {i}", semester_number=i) for i in range(1, 9)]
+    subjects = [SimpleNamespace(id=i, subject_title=f"Subject number {i}", subject_code=f"CSE-{100 + i}",
+                                credits=3.0) for i in range(1, 9)]
+    marks = []
+    for i in range(count):
+        department = departments[i % 4]
+        semester = semesters[(i // 4) % 8]
+        student = SimpleNamespace(id=i // 8, name=f"Student {i // 8}", registration=f"{2020000000 + i // 8}",
+                                  session=f"20{20 + i % 5}-{21 + i % 5}", department_id=department.id,
+                                  department=department)
+        marks.append(SimpleNamespace(
+            assignment_mark=float(i % 20), class_test_mark=float((i * 7) % 20),
+            midterm_mark=float((i * 3) % 20), final_exam_mark=float((i * 11) % 80),
+            total_mark=None, GPA=None, semester_id=semester.id, semester=semester,
+            subject=subjects[i % 8], student=student,
+        ))
+    return marks
+
+
+def build_payload(width: int, depth: int) -> dict:
+    # request body shaped payload with secrets at every level
+    if depth == 0:
+        return {"password": "secret", "name": "value", "count": 1}
+    return {
+        **{f"field_{i}": f"value {i}" for i in range(width)},
+        "token": "abc",
+        "items": [build_payload(width, depth - 1) for _ in range(3)],
+        "nested": build_payload(width, depth - 1),
+    }
+
+
+INTEGRITY_ERRORS = [
+    'duplicate key value violates unique constraint "students_registration_key"\nDETAIL:  Key (registration)=(2020000001) already exists.',
+    'duplicate key value violates unique constraint "users_email_key"\nDETAIL:  Key (email)=(a@b.c) already exists.',
+    'duplicate key value violates unique constraint "subjects_subject_code_key"\nDETAIL:  Key (subject_code)=(CSE-101) already exists.',
+    'duplicate key value violates unique constraint "unique_mark_record"',
+    'insert or update on table "marks" violates foreign key constraint "marks_student_id_fkey"',
+]
+
+
+def case_compute_total_marks_and_gpa() -> Callable[[], object]:
+    marks = build_marks(10_000)
+
+    def run():
+        for mark in marks:
+            MarksService.compute_total_marks_and_gpa(mark)
+    return run
+
+
+def case_group_marks_by_category() -> Callable[[], object]:
+    marks = build_marks(10_000)
+    return lambda: MarksService.group_marks_by_category(marks)
+
+
+def case_sanitize_payload() -> Callable[[], object]:
+    payload = build_payload(width=20, depth=4)
+    return lambda: sanitize_payload(payload)
+
+
+def case_parse_integrity_error() -> Callable[[], object]:
+    messages = INTEGRITY_ERRORS * 200
+
+    def run():
+        for message in messages:
+            parse_integrity_error(message)
+    return run
+
+
+def case_jwt() -> Callable[[], object]:
+    def run():
+        for i in range(200):
+            decode_access_token(create_access_token(f"user{i}@example.com"))
+    return run
+
+
+def case_result_pdf() -> Callable[[], object]:
+    marks = build_marks(8)
+    for mark in marks:
+        MarksService.compute_total_marks_and_gpa(mark)
+    first = marks[0]
+    return lambda: MarksService.build_result_pdf(first.student, first.semester, first.student.department, marks)
+
+
+CASES: dict[str, Callable[[], Callable[[], object]]] = {
+    "compute_total_marks_and_gpa": case_compute_total_marks_and_gpa,
+    "group_marks_by_category": case_group_marks_by_category,
+    "sanitize_payload": case_sanitize_payload,
+    "parse_integrity_error": case_parse_integrity_error,
+    "jwt": case_jwt,
+    "result_pdf": case_result_pdf,
+}
+
+
+def measure(run: Callable[[], object], rounds: int) -> dict:
+    run()  # warm up (imports, caches, font loading)
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    # separate run for memory, tracemalloc slows everything down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": round(timings[len(timings) // 2] * 1000, 4),
+        "best_ms": round(timings[0] * 1000, 4),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("cases", {}).get(name)
+        if not before:
+            print(f"  {name:<30} no baseline")
+            continue
+        for key in ("best_ms", "peak_kib"):
+            change = (result[key] - before[key]) / before[key] if before[key] else 0.0
+            flag = ""
+            # a few KiB more is noise (eg: a cached regex), not a regression
+            if change > threshold and (key != "peak_kib" or result[key] - before[key] > MIN_MEMORY_REGRESSION_KIB):
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {key}")
+            print(f"  {name:<30} {key:<10} {before[key]:>12} -> {result[key]:>12} ({change * 100:+.1f}%){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=",".join(CASES), help="comma separated")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slow down / extra memory, 0.25 = 25%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    for name in [name.strip() for name in args.cases.split(",") if name.strip()]:
+        results[name] = measure(CASES[name](), args.rounds)
+        print(f"{name:<30} median {results[name]['median_ms']:>10} ms   "
+              f"best {results[name]['best_ms']:>10} ms   peak {results[name]['peak_kib']:>10} KiB")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "cases": results}, file, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline}, run with --save-baseline first")
+        return
+
+    print(f"\nCompared to the baseline (python {baseline.get('python')}, threshold {args.threshold * 100:.0f}%):")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
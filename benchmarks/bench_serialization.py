@@ -0,0 +1,126 @@
+"""
+Serialization benchmark for the biggest response of the api (get_all_marks_with_filters).
+
+Compares the default FastAPI path (validate -> python dict -> json) with the
+orjson default response class and the single pass fast_json_response path.
+
+run from the project folder:
+    python -m benchmarks.bench_serialization --marks 10000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from benchmarks.common import set_placeholder_env
+
+set_placeholder_env()
+
+import orjson  # noqa: E402
+from app.core.serialization import fast_json_response, get_type_adapter  # noqa: E402
+from app.models import ResultChallengeStatus, ResultStatus  # noqa: E402
+from app.schemas.marks_schema import SemesterWiseAllSubjectsMarksWithPopulatedDataResponseSchema  # noqa: E402
+
+
+RESPONSE_TYPE = list[SemesterWiseAllSubjectsMarksWithPopulatedDataResponseSchema]
+
+
+def build_marks(count: int, students_per_group: int = 50, subjects: int = 8):
+    """
+    ORM shaped objects (attribute access, nested relationships) grouped the same way
+    as MarksService.group_marks_by_category does.
+    """
+    now = datetime.now(timezone.utc)
+    department = SimpleNamespace(id=1, department_name="Computer Science and Engineering")
+    semester = SimpleNamespace(id=1, semester_name="First", semester_number=1)
+    subject_list = [
+        SimpleNamespace(id=i, subject_title=f"Subject {i}", subject_code=f"CSE-{100 + i}", credits=3.0)
+        for i in range(1, subjects + 1)
+    ]
+
+    groups: dict[str, list] = {}
+    for i in range(count):
+        student_index = i // subjects
+        session = f"20{20 + (student_index // students_per_group) % 5}-{21 + (student_index // students_per_group) % 5}"
+        student = SimpleNamespace(
+            id=student_index, user_id=student_index, name=f"Student {student_index}",
+            registration=f"{2020000000 + student_index}", session=session,
+            department_id=1, department=department, semester_id=1, semester=semester,
+        )
+        subject = subject_list[i % subjects]
+        groups.setdefault(session, []).append(SimpleNamespace(
+            id=i, assignment_mark=8.0, class_test_mark=9.0, midterm_mark=25.0, final_exam_mark=40.0,
+            student_id=student.id, subject_id=subject.id, semester_id=1,
+            total_mark=82.0, GPA=4.0,
+            result_status=ResultStatus.PUBLISHED, result_challenge_status=ResultChallengeStatus.NONE,
+            result_challenge_payment_status=None, challenged_at=None,
+            challenge_payment_time=None, challenge_resolved_at=None,
+            semester=semester, subject=subject, student=student,
+            created_at=now, updated_at=now,
+        ))
+
+    return [
+        {"department_id": 1, "department_name": department.department_name, "semester_id": 1,
+         "semester_name": semester.semester_name, "session": session, "marks": marks}
+        for session, marks in groups.items()
+    ]
+
+
+def fastapi_default(data):
+    # what FastAPI does for response_model: validate, serialize to python, then json.dumps
+    adapter = get_type_adapter(RESPONSE_TYPE)
+    validated = adapter.validate_python(data, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def fastapi_orjson(data):
+    # same as above with ORJSONResponse as the default response class
+    adapter = get_type_adapter(RESPONSE_TYPE)
+    validated = adapter.validate_python(data, from_attributes=True)
+    return orjson.dumps(adapter.dump_python(validated, mode="json"))
+
+
+def fast_path(data):
+    return fast_json_response(RESPONSE_TYPE, data).body
+
+
+def fast_path_trusted(validated):
+    return fast_json_response(RESPONSE_TYPE, validated, trusted=True).body
+
+
+def measure(label: str, func, data, rounds: int):
+    func(data)  # warm up (builds the cached TypeAdapter)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = func(data)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print(f"{label:<28} median {median * 1000:8.2f} ms   best {timings[0] * 1000:8.2f} ms   {len(body) / 1024:8.0f} KiB")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--marks", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    data = build_marks(args.marks)
+    validated = get_type_adapter(RESPONSE_TYPE).validate_python(data, from_attributes=True)
+
+    print(f"Serializing {args.marks} marks, {args.rounds} rounds\n")
+    baseline = measure("fastapi default (json)", fastapi_default, data, args.rounds)
+    for label, func, payload in (
+        ("fastapi + ORJSONResponse", fastapi_orjson, data),
+        ("fast_json_response", fast_path, data),
+        ("fast_json_response trusted", fast_path_trusted, validated),
+    ):
+        median = measure(label, func, payload, args.rounds)
+        print(f"{'':<28} {baseline / median:.1f}x faster than the default")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Query plan regression check of the key service queries against a seeded local database.
+
+Every case calls a real service method (MarksService, SubjectOfferingService, StudentService),
+the SELECT statements it sends are captured with their parameters and explained with
+EXPLAIN (FORMAT JSON). A case fails when a plan scans a large table sequentially (the table has
+at least --min-rows rows according to pg_class) or when an index it is expected to use is missing.
+The exit code is 1 when any case fails, so it can guard a migration or a query change.
+
+run from the project folder (needs the real DATABASE_URL):
+    python -m app.db.seed_dataset
+    python -m benchmarks.check_query_plans
+    python -m benchmarks.check_query_plans --cases results,student --min-rows 50000 --verbose
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.marks_service import MarksService
+from app.services.student_service import StudentService
+from app.services.subject_offering_service import SubjectOfferingService
+from app.db.db import AsyncSessionLocal, engine
+from app.models import Student, UserRole
+
+
+# tables that grow with the number of students, a sequential scan on them does not scale
+LARGE_TABLES = ("marks", "students", "users", "teachers", "subject_offerings")
+
+_SELECT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[AsyncSession], Awaitable[Any]]
+    # at least one plan of the case must use each of these indexes
+    expected_indexes: tuple[str, ...] = ()
+    # known and accepted sequential scans (eg: a leading wildcard ILIKE can not use a btree index)
+    allowed_seq_scans: tuple[str, ...] = ()
+
+
+@dataclass
+class CaseResult:
+    name: str
+    statements: int = 0
+    problems: list[str] = field(default_factory=list)
+    indexes: set[str] = field(default_factory=set)
+
+
+def build_cases(manifest: dict) -> dict[str, Case]:
+    # a student with a published result (first semester students have none)
+    student = next(student for student in manifest["students"] if "result_semester_id" in student)
+    # any role other than teacher skips the teacher lookup
+    admin = SimpleNamespace(id=0, role=UserRole.ADMIN)
+
+    async def get_student(db: AsyncSession):
+        user_id = await db.scalar(
+            select(Student.user_id).where(Student.registration == student["registration"]))
+        return await StudentService.get_student(db, user_id)
+
+    cases = [
+        Case("marks_filters",
+             lambda db: MarksService.get_all_marks_with_filters(
+                 db, admin, student["result_semester_id"], student["department_id"], student["session"])),
+        Case("marks_filters_published",
+             lambda db: MarksService.get_all_marks_with_filters(
+                 db, admin, student["result_semester_id"], student["department_id"], student["session"],
+                 result_status="published")),
+        Case("results",
+             lambda db: MarksService.generate_results(
+                 db, student["registration"], student["result_semester_id"], student["department_id"]),
+             expected_indexes=("ix_students_registration",)),
+        Case("results_etag",
+             lambda db: MarksService.get_results_etag(
+                 db, student["registration"], student["result_semester_id"], student["department_id"]),
+             expected_indexes=("ix_students_registration",)),
+        Case("challenge_queue",
+             lambda db: MarksService.get_challenge_queue(db, admin, limit=50),
+             expected_indexes=("ix_marks_open_challenges",)),
+        Case("subject_offerings",
+             lambda db: SubjectOfferingService.get_subject_offerings(
+                 db, filter_by_department=student["department_id"], limit=20)),
+        Case("student_search",
+             lambda db: StudentService.get_all_student_with_minimal_data(
+                 db, search=student["registration"]),
+             allowed_seq_scans=("students",)),
+        Case("student", get_student),
+    ]
+    return {case.name: case for case in cases}
+
+
+def walk_plan(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+async def table_sizes(db: AsyncSession) -> dict[str, tuple[str, float]]:
+    # relation -> (table, rows). Partitions (eg: marks_semester_3) are checked on their own size.
+    # planner statistics, fresh after the ANALYZE at the end of the seeding
+    result = await db.execute(
+        text("""
+            SELECT relation.relname, COALESCE(parent.relname, relation.relname), relation.reltuples
+            FROM pg_class relation
+            LEFT JOIN pg_inherits ON pg_inherits.inhrelid = relation.oid
+            LEFT JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            WHERE relation.relkind = 'r' AND COALESCE(parent.relname, relation.relname) = ANY(:names)
+        """),
+        {"names": list(LARGE_TABLES)},
+    )
+    return {relation: (table, rows) for relation, table, rows in result.all()}
+
+
+async def run_case(case: Case, sizes: dict[str, tuple[str, float]], args: argparse.Namespace) -> CaseResult:
+    outcome = CaseResult(case.name)
+    captured: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if _SELECT.match(statement):
+            captured.append((statement, parameters))
+
+    async with AsyncSessionLocal() as db:
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await case.run(db)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        connection = await db.connection()
+        for statement, parameters in captured:
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            outcome.statements += 1
+            if args.verbose:
+                print(f"\n-- {case.name}\n{statement}\n{json.dumps(plan, indent=2)}")
+
+            for node in walk_plan(plan[0]["Plan"]):
+                if "Index Name" in node:
+                    outcome.indexes.add(node["Index Name"])
+
+                relation = node.get("Relation Name")
+                if node["Node Type"] != "Seq Scan" or relation not in sizes:
+                    continue
+                table, rows = sizes[relation]
+                if table in case.allowed_seq_scans:
+                    continue
+                if rows >= args.min_rows:
+                    outcome.problems.append(
+                        f"Seq Scan on {relation} ({rows:.0f} rows, {node.get('Plan Rows')} estimated)")
+
+        await db.rollback()
+
+    for index in case.expected_indexes:
+        if index not in outcome.indexes:
+            outcome.problems.append(f"index {index} is not used")
+
+    return outcome
+
+
+async def run(args: argparse.Namespace) -> int:
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+
+    available = build_cases(manifest)
+    selected = [name.strip() for name in args.cases.split(",") if name.strip()] or list(available)
+
+    async with AsyncSessionLocal() as db:
+        sizes = await table_sizes(db)
+
+    small = [name for name, (_, rows) in sizes.items() if rows < args.min_rows]
+    if small:
+        print(f"warning: {', '.join(small)} below {args.min_rows} rows, their sequential scans are not checked")
+
+    failed = 0
+    for name in selected:
+        outcome = await run_case(available[name], sizes, args)
+        status = "FAIL" if outcome.problems else "ok"
+        print(f"{status:<5} {name:<25} {outcome.statements} statements, "
+              f"indexes: {', '.join(sorted(outcome.indexes)) or '-'}")
+        for problem in outcome.problems:
+            print(f"        {problem}")
+        failed += bool(outcome.problems)
+
+    await engine.dispose()
+    print(f"\n{len(selected) - failed} passed, {failed} failed")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default="benchmarks/seed_manifest.json")
+    parser.add_argument("--cases", default="", help="comma separated, defaults to all")
+    parser.add_argument("--min-rows", type=int, default=10_000,
+                        help="tables with fewer rows may be scanned sequentially")
+    parser.add_argument("--verbose", action="store_true", help="print every statement and plan")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
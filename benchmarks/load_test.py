@@ -0,0 +1,237 @@
+"""
+Load test of the key endpoints against a running server seeded with app/db/seed_dataset.py.
+
+Every scenario is run by --concurrency threads for --duration seconds. Throughput and
+p50/p95/p99 latencies are printed and saved as JSON (with the git commit) so that runs
+of different commits can be compared.
+
+run from the project folder (stdlib only, the server can be anywhere):
+    python -m app.db.seed_dataset
+    python -m benchmarks.load_test --base-url http://localhost:8000
+    python -m benchmarks.load_test --compare benchmarks/results/<older run>.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+
+class Client:
+    # one keep-alive connection per thread
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection_class(parts.netloc, timeout=timeout)
+        self.token: str | None = None
+
+    def request(self, method: str, path: str, body: bytes | None = None, headers: dict | None = None):
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", "gzip")
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # reconnect on the next request
+            self.connection.close()
+            raise
+        return response, data
+
+    def login(self, username: str, password: str) -> int:
+        body = urlencode({"username": username, "password": password}).encode()
+        response, _ = self.request("POST", "/api/auth/login", body,
+                                   {"Content-Type": "application/x-www-form-urlencoded"})
+        # the api sets the access token as an httponly cookie
+        cookie = SimpleCookie()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            cookie.load(header)
+        if "access_token" in cookie:
+            self.token = cookie["access_token"].value
+        return response.status
+
+
+def scenarios(manifest: dict) -> dict:
+    students = manifest["students"]
+    # students with a published result (not the ones in their first semester)
+    result_students = [student for student in students if "result_semester_id" in student]
+    password = manifest["password"]
+
+    def login(client: Client, rng: random.Random):
+        username = rng.choice(manifest["student_usernames"])
+        return client.login(username, password)
+
+    def marks_filters(client: Client, rng: random.Random):
+        student = rng.choice(result_students)
+        query = urlencode({"semester_id": student["result_semester_id"],
+                           "department_id": student["department_id"],
+                           "session": student["session"]})
+        return client.request("GET", f"/api/marks/get_all_marks_with_filters?{query}")[0].status
+
+    def results_pdf(client: Client, rng: random.Random):
+        student = rng.choice(result_students)
+        query = urlencode({"registration": student["registration"],
+                           "semester_id": student["result_semester_id"],
+                           "department_id": student["department_id"]})
+        return client.request("GET", f"/api/marks/results?{query}")[0].status
+
+    def batch_publish(client: Client, rng: random.Random):
+        # publishing twice is a no-op for the data, the queries still run
+        student = rng.choice(students)
+        body = json.dumps({"semester_id": student["semester_id"],
+                           "department_id": student["department_id"],
+                           "session": student["session"]}).encode()
+        return client.request("PATCH", "/api/marks/batch_publish", body,
+                              {"Content-Type": "application/json"})[0].status
+
+    def dashboard_counts(client: Client, rng: random.Random):
+        return client.request("GET", "/api/adminDashboard/allTableDataCount")[0].status
+
+    return {
+        "login": login,
+        "marks_filters": marks_filters,
+        "results_pdf": results_pdf,
+        "batch_publish": batch_publish,
+        "dashboard_counts": dashboard_counts,
+    }
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(name: str, action, args: argparse.Namespace, manifest: dict) -> dict:
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        client = Client(args.base_url, args.timeout)
+        if name != "login":
+            client.login(manifest["admin_username"], manifest["password"])
+
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = action(client, rng)
+            except Exception:
+                status = "error"
+            elapsed = time.perf_counter() - start
+
+            with lock:
+                latencies.append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if status == "error" or int(status) >= 400:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / wall_time, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+    print(f"{name:<18} {result['throughput_rps']:>8} req/s   p50 {result['p50_ms']:>8} ms   "
+          f"p95 {result['p95_ms']:>8} ms   p99 {result['p99_ms']:>8} ms   errors {errors}")
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, previous_path: str):
+    with open(previous_path) as file:
+        previous = json.load(file)
+
+    print(f"\nCompared to {previous.get('commit')} ({previous_path}):")
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before[key]:
+                change = (result[key] - before[key]) / before[key] * 100
+                print(f"  {name:<18} {key:<15} {before[key]:>10} -> {result[key]:>10} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default="benchmarks/seed_manifest.json")
+    parser.add_argument("--scenarios", default="login,marks_filters,results_pdf,batch_publish,dashboard_counts",
+                        help="comma separated")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output-dir", default="benchmarks/results")
+    parser.add_argument("--compare", default="", help="previous result file")
+    args = parser.parse_args()
+
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+
+    available = scenarios(manifest)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+
+    print(f"{args.base_url}, {args.concurrency} threads, {args.duration:.0f}s per scenario, "
+          f"dataset {manifest['tag']} ({manifest['counts']['marks']} marks)\n")
+
+    results = {name: run_scenario(name, available[name], args, manifest) for name in selected}
+
+    commit = git_commit()
+    output = {
+        "commit": commit,
+        "time": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "dataset": {"tag": manifest["tag"], **manifest["counts"]},
+        "scenarios": results,
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir,
+                        f"load_{commit}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w") as file:
+        json.dump(output, file, indent=2)
+    print(f"\nSaved to {path}")
+
+    if args.compare:
+        compare(output, args.compare)
+
+
+if __name__ == "__main__":
+    main()